@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Auto Select 30 Words from final_word_list.txt
+从 final_word_list.txt 自动选择30个词汇，满足音素分布要求
+"""
+
+from phoneme_tracker_clean import PhonemeTracker
+from candidate_ranker import score_counts
+from concurrent.futures import ProcessPoolExecutor
+import math
+import time
+import numpy as np
+
+
+def build_phoneme_matrix(tracker, word_list):
+    """把候选词汇转换为 (词汇数 x 39) 的音素计数矩阵和目标向量"""
+    phoneme_index = {p: i for i, p in enumerate(tracker.phoneme_order)}
+    words = []
+    rows = []
+    seen = set()
+    
+    for word in word_list:
+        if word in seen:
+            continue
+        phonemes = tracker.get_word_phonemes(word)
+        if not phonemes:
+            continue
+        seen.add(word)
+        row = np.zeros(len(phoneme_index), dtype=np.int32)
+        for phoneme in phonemes:
+            row[phoneme_index[phoneme]] += 1
+        words.append(word)
+        rows.append(row)
+    
+    matrix = np.array(rows, dtype=np.int32).reshape(len(rows), len(phoneme_index))
+    target = np.array([tracker.target_distribution[p] for p in tracker.phoneme_order], dtype=np.int32)
+    return words, matrix, target
+
+
+def anneal_selection(matrix, target, k, seed, iterations=20000, start_temp=5.0, end_temp=0.05):
+    """单个种子：随机初始化 k 个词汇，再用交换式模拟退火搜索，返回 (最佳得分, 词汇下标)"""
+    rng = np.random.default_rng(seed)
+    n = matrix.shape[0]
+    k = min(k, n)
+    
+    selected = rng.choice(n, size=k, replace=False)
+    in_set = np.zeros(n, dtype=bool)
+    in_set[selected] = True
+    counts = matrix[selected].sum(axis=0)
+    score = int(score_counts(counts, target))
+    best_score, best_selected = score, selected.copy()
+    
+    if k == 0 or k == n:
+        return best_score, sorted(best_selected.tolist())
+    
+    cooling = (end_temp / start_temp) ** (1 / max(iterations - 1, 1))
+    temp = start_temp
+    
+    for _ in range(iterations):
+        slot = rng.integers(k)
+        candidate = rng.integers(n)
+        if not in_set[candidate]:
+            old = selected[slot]
+            new_counts = counts - matrix[old] + matrix[candidate]
+            new_score = int(score_counts(new_counts, target))
+            delta = new_score - score
+            
+            if delta >= 0 or rng.random() < math.exp(delta / temp):
+                in_set[old] = False
+                in_set[candidate] = True
+                selected[slot] = candidate
+                counts = new_counts
+                score = new_score
+                if score > best_score:
+                    best_score, best_selected = score, selected.copy()
+        
+        temp *= cooling
+    
+    return best_score, sorted(best_selected.tolist())
+
+
+# 进程池中每个 worker 只接收一次矩阵，避免每个任务重复序列化
+_worker_state = {}
+
+
+def _init_worker(matrix, target):
+    _worker_state['matrix'] = matrix
+    _worker_state['target'] = target
+
+
+def _run_seed(args):
+    seed, k, iterations = args
+    return anneal_selection(_worker_state['matrix'], _worker_state['target'], k, seed, iterations)
+
+
+def parallel_anneal(matrix, target, k, n_seeds=32, iterations=20000, workers=None, base_seed=0):
+    """在进程池上运行多个独立种子，返回得分最高的 (得分, 词汇下标)"""
+    tasks = [(base_seed + i, k, iterations) for i in range(n_seeds)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(matrix, target)) as pool:
+        results = list(pool.map(_run_seed, tasks))
+    
+    # 同分时取种子编号最小的结果，保证可复现
+    return max(results, key=lambda result: result[0])
+
+
+class AutoWordSelector:
+    def __init__(self):
+        self.tracker = PhonemeTracker()
+        self.target_words = 30
+        
+        # 加载 final_word_list.txt
+        try:
+            with open('/Users/terry/Downloads/video2speech.github.io/video2speech.github.io/final_word_list.txt', 'r') as f:
+                self.word_list = [line.strip() for line in f if line.strip()]
+            print(f"📚 加载了 {len(self.word_list)} 个候选词汇")
+        except FileNotFoundError:
+            print("❌ 找不到 final_word_list.txt 文件")
+            self.word_list = []
+    
+    def calculate_score(self):
+        """计算当前选择的得分（越高越好），由追踪器增量维护"""
+        return self.tracker.current_score()
+    
+    def should_keep_word(self, word):
+        """判断是否应该保留这个词汇"""
+        new_score = self.tracker.score_if_added(word)
+        if new_score is None:
+            return False
+        
+        # 如果新得分更好，保留
+        return new_score > self.calculate_score()
+    
+    def auto_select(self):
+        """自动选择30个词汇"""
+        print("🎯 开始自动选择30个词汇...")
+        print("=" * 50)
+        
+        # 清空现有选择（可选）
+        confirm = input("是否清空当前已选择的词汇？(y/N): ")
+        if confirm.lower() in ['y', 'yes']:
+            self.tracker.replace_words([])
+            print("✅ 已清空现有词汇")
+        
+        print(f"📝 当前已有 {len(self.tracker.selected_words)} 个词汇")
+        print(f"🎯 目标：选择 {self.target_words} 个词汇")
+        
+        added_count = 0
+        skipped_count = 0
+        
+        for i, word in enumerate(self.word_list):
+            if len(self.tracker.selected_words) >= self.target_words:
+                break
+            
+            # 跳过已存在的词汇
+            if word in self.tracker.selected_words:
+                continue
+            
+            # 尝试添加词汇
+            phonemes = self.tracker.get_cached_phonemes(word)
+            if not phonemes:
+                skipped_count += 1
+                continue
+            
+            # 判断是否应该保留
+            if self.should_keep_word(word):
+                self.tracker.add_word(word)
+                added_count += 1
+                
+                # 显示进度
+                current_count = len(self.tracker.selected_words)
+                print(f"✅ [{current_count:2d}/{self.target_words}] 添加: {word:15s} -> /{' '.join(phonemes)}/")
+                
+                # 每5个词显示一次状态
+                if current_count % 5 == 0:
+                    self.show_brief_status()
+            else:
+                skipped_count += 1
+                if skipped_count % 20 == 0:  # 每跳过20个显示一次
+                    print(f"⏭️  已跳过 {skipped_count} 个不合适的词汇...")
+        
+        print(f"\n🎉 自动选择完成!")
+        print(f"   📝 最终选择: {len(self.tracker.selected_words)} 个词汇")
+        print(f"   ✅ 新增: {added_count} 个")
+        print(f"   ⏭️  跳过: {skipped_count} 个")
+        
+        # 显示最终状态
+        self.tracker.display_status()
+        
+        return self.tracker.selected_words
+    
+    def show_brief_status(self):
+        """显示简要状态"""
+        current_dist, _ = self.tracker.get_current_phoneme_distribution()
+        achieved = sum(1 for p in self.tracker.target_distribution 
+                      if current_dist.get(p, 0) == self.tracker.target_distribution[p])
+        score = self.calculate_score()
+        
+        print(f"   📊 达标音素: {achieved}/39 ({achieved/39*100:.1f}%) | 得分: {score}")
+    
+    def optimize_selection(self):
+        """优化当前选择（移除得分较低的词汇）"""
+        print("\n🔧 优化词汇选择...")
+        
+        if len(self.tracker.selected_words) <= self.target_words:
+            print("✅ 词汇数量已达标，无需优化")
+            return
+        
+        # 计算每个词汇的贡献度
+        word_contributions = {}
+        
+        old_score = self.calculate_score()
+        for word in self.tracker.selected_words:
+            # 计算移除这个词汇后的得分变化
+            new_score = self.tracker.score_if_removed(word)
+            
+            # 贡献度 = 移除后得分下降程度
+            contribution = old_score - new_score
+            word_contributions[word] = contribution
+        
+        # 移除贡献度最低的词汇
+        while len(self.tracker.selected_words) > self.target_words:
+            # 找到贡献度最低的词汇
+            worst_word = min(word_contributions.keys(), key=lambda w: word_contributions[w])
+            
+            print(f"🗑️  移除贡献度最低的词汇: {worst_word} (贡献度: {word_contributions[worst_word]})")
+            self.tracker.remove_word(worst_word)
+            del word_contributions[worst_word]
+        
+        print(f"✅ 优化完成，保留 {len(self.tracker.selected_words)} 个词汇")
+    
+    def parallel_select(self, n_seeds=32, iterations=20000, workers=None):
+        """并行随机重启 + 模拟退火选择词汇，结果直接替换当前选择"""
+        words, matrix, target = build_phoneme_matrix(self.tracker, self.word_list)
+        if len(words) < self.target_words:
+            print(f"❌ 有效候选词汇不足: {len(words)} < {self.target_words}")
+            return self.tracker.selected_words
+        
+        print(f"🎲 并行优化: {n_seeds} 个种子 x {iterations} 次迭代, 候选词汇 {len(words)} 个")
+        start = time.time()
+        best_score, best_indices = parallel_anneal(matrix, target, self.target_words,
+                                                   n_seeds=n_seeds, iterations=iterations,
+                                                   workers=workers)
+        
+        self.tracker.replace_words([words[i] for i in best_indices])
+        print(f"✅ 最佳得分: {best_score} (耗时 {time.time() - start:.1f} 秒)")
+        
+        self.tracker.display_status()
+        return self.tracker.selected_words
+
+def main():
+    """主函数"""
+    selector = AutoWordSelector()
+    
+    if not selector.word_list:
+        return
+    
+    print("🎯 自动词汇选择器")
+    print("=" * 30)
+    print("功能：")
+    print("1. 从 final_word_list.txt 按顺序添加词汇")
+    print("2. 自动判断词汇是否改善音素分布")
+    print("3. 选择30个最优词汇")
+    print("4. 自动优化选择结果")
+    print("5. 可选：多进程随机重启 + 模拟退火全局优化")
+    
+    # 显示当前状态
+    selector.tracker.display_status()
+    
+    mode = input("选择模式 [1] 顺序贪心 (默认) / [2] 并行随机重启 + 模拟退火: ").strip()
+    if mode == '2':
+        selector.parallel_select()
+    else:
+        # 开始自动选择
+        selected_words = selector.auto_select()
+        
+        # 如果超过30个，进行优化
+        if len(selected_words) > selector.target_words:
+            selector.optimize_selection()
+    
+    print(f"\n🎉 最终结果：")
+    print(f"📝 选中词汇 ({len(selector.tracker.selected_words)}):")
+    for i, word in enumerate(selector.tracker.selected_words, 1):
+        phonemes = selector.tracker.get_word_phonemes(word)
+        if phonemes:
+            print(f"   {i:2d}. {word:15s} -> /{' '.join(phonemes)}/")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Build Cache - 基于内容哈希的报告构建缓存
+每个阶段声明自己的输入文件（selected_words.json、句子文件、脚本本身……）、
+依赖版本（CMUdict）和参数。阶段键 = 这些内容的 SHA-256：
+  - 键与上次运行相同且输出文件未被改动：跳过
+  - 键在缓存中存在（例如输入改回了旧版本）：从 .build_cache/objects/<键>/ 恢复输出
+  - 否则运行该阶段，并把输出保存到缓存中
+
+用法:
+    python build_cache.py                 # 构建所有过期的报告
+    python build_cache.py phoneme_frequency sentence_report
+    python build_cache.py --list          # 查看每个阶段是否为最新
+    python build_cache.py --force         # 忽略缓存重新构建
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+
+CACHE_DIR = '.build_cache'
+
+
+def sha256_file(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cmudict_version():
+    """CMUdict 数据文件的内容哈希"""
+    import nltk
+    return sha256_file(os.path.join(nltk.data.find('corpora/cmudict'), 'cmudict'))
+
+
+# 可在阶段中声明的依赖版本
+VERSIONS = {
+    'cmudict': cmudict_version,
+}
+
+
+class BuildStage:
+    def __init__(self, name, run, inputs, outputs, versions=(), params=None):
+        """
+        run: 以 params 为关键字参数调用的函数，生成 outputs 中的所有文件
+        inputs / outputs: 文件路径列表
+        versions: VERSIONS 中的依赖名称
+        params: 传给 run 的参数，同时计入阶段键
+        """
+        self.name = name
+        self.run = run
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.versions = list(versions)
+        self.params = params or {}
+
+
+class BuildCache:
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.hash_file = os.path.join(cache_dir, 'file_hashes.json')
+        os.makedirs(os.path.join(cache_dir, 'stages'), exist_ok=True)
+        os.makedirs(os.path.join(cache_dir, 'objects'), exist_ok=True)
+
+        # (大小, 修改时间) 未变的文件不重新计算哈希
+        self.file_hashes = {}
+        if os.path.exists(self.hash_file):
+            with open(self.hash_file, 'r', encoding='utf-8') as f:
+                self.file_hashes = json.load(f)
+        self.version_cache = {}
+
+    def file_digest(self, path):
+        """文件内容哈希；文件不存在时返回 None"""
+        if not os.path.exists(path):
+            return None
+        stat = os.stat(path)
+        key = os.path.abspath(path)
+        cached = self.file_hashes.get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = sha256_file(path)
+        self.file_hashes[key] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def version(self, name):
+        if name not in self.version_cache:
+            self.version_cache[name] = VERSIONS[name]()
+        return self.version_cache[name]
+
+    def stage_key(self, stage):
+        """阶段键：名称、输入内容、依赖版本和参数的哈希"""
+        missing = [path for path in stage.inputs if not os.path.exists(path)]
+        if missing:
+            raise FileNotFoundError(f"{stage.name}: missing inputs {', '.join(missing)}")
+        description = {
+            'stage': stage.name,
+            'inputs': {path: self.file_digest(path) for path in stage.inputs},
+            'versions': {name: self.version(name) for name in stage.versions},
+            'params': stage.params,
+            'outputs': stage.outputs,
+        }
+        return hashlib.sha256(json.dumps(description, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _record_path(self, stage):
+        return os.path.join(self.cache_dir, 'stages', f'{stage.name}.json')
+
+    def _object_dir(self, key):
+        return os.path.join(self.cache_dir, 'objects', key)
+
+    def _load_record(self, stage):
+        path = self._record_path(stage)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _stored_name(self, i, path):
+        return f'{i}_{os.path.basename(path)}'
+
+    def status(self, stage):
+        """'up-to-date'、'cached'（可从缓存恢复）或 'stale'"""
+        key = self.stage_key(stage)
+        record = self._load_record(stage)
+        if record and record['key'] == key and all(
+                self.file_digest(path) == digest for path, digest in record['outputs'].items()):
+            return 'up-to-date', key
+        if os.path.exists(os.path.join(self._object_dir(key), 'outputs.json')):
+            return 'cached', key
+        return 'stale', key
+
+    def restore(self, stage, key):
+        object_dir = self._object_dir(key)
+        for i, path in enumerate(stage.outputs):
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            shutil.copy2(os.path.join(object_dir, self._stored_name(i, path)), path)
+
+    def store(self, stage, key):
+        missing = [path for path in stage.outputs if not os.path.exists(path)]
+        if missing:
+            raise FileNotFoundError(f"{stage.name}: outputs not produced {', '.join(missing)}")
+        object_dir = self._object_dir(key)
+        os.makedirs(object_dir, exist_ok=True)
+        for i, path in enumerate(stage.outputs):
+            shutil.copy2(path, os.path.join(object_dir, self._stored_name(i, path)))
+        with open(os.path.join(object_dir, 'outputs.json'), 'w', encoding='utf-8') as f:
+            json.dump(stage.outputs, f, indent=2)
+
+    def build(self, stage, force=False):
+        """构建一个阶段，返回 'skipped'、'restored' 或 'built'"""
+        state, key = ('stale', self.stage_key(stage)) if force else self.status(stage)
+        if state == 'up-to-date':
+            result = 'skipped'
+        elif state == 'cached':
+            self.restore(stage, key)
+            result = 'restored'
+        else:
+            start = time.time()
+            stage.run(**stage.params)
+            self.store(stage, key)
+            print(f"   ⏱  {stage.name}: {time.time() - start:.1f}s")
+            result = 'built'
+
+        record = {
+            'key': key,
+            'outputs': {path: self.file_digest(path) for path in stage.outputs},
+            'built': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        with open(self._record_path(stage), 'w', encoding='utf-8') as f:
+            json.dump(record, f, indent=2)
+        self.save()
+        return result
+
+    def save(self):
+        with open(self.hash_file, 'w', encoding='utf-8') as f:
+            json.dump(self.file_hashes, f)
+
+
+# ---------------------------------------------------------------- 报告阶段
+
+def _sentence_report(max_sentences, min_word_coverage, shuffle_seed):
+    from complete_sentence_processor import CompleteSentenceProcessor
+    processor = CompleteSentenceProcessor(output_dir='newset', seed=shuffle_seed)
+    processor.run_complete_process(max_sentences=max_sentences, min_word_coverage=min_word_coverage)
+
+
+def _improved_visualizer(shuffle_seed):
+    from improved_sentence_visualizer import ImprovedSentenceVisualizer
+    ImprovedSentenceVisualizer(seed=shuffle_seed).run_all_tasks()
+
+
+def _phoneme_frequency():
+    import phoneme_frequency_analyzer
+    phoneme_frequency_analyzer.main()
+
+
+def _phoneme_coverage():
+    import phoneme_coverage_analysis
+    phoneme_coverage_analysis.main()
+
+
+_SETS = ['selected_50', 'remaining_300', 'all_350']
+
+REPORT_STAGES = [
+    BuildStage(
+        'sentence_report', _sentence_report,
+        inputs=['selected_words.json', 'selected_sentences_analyzer.json',
+                'complete_sentence_processor.py', 'word_tokenizer.py'],
+        outputs=[os.path.join('newset', f'{name}_sentences.txt') for name in _SETS]
+                + [os.path.join('newset', f'{name}_{kind}_distribution.png')
+                   for name in _SETS for kind in ['word', 'phoneme']]
+                + [os.path.join('newset', 'selected_50_sentences.json')],
+        versions=['cmudict'],
+        params={'max_sentences': 50, 'min_word_coverage': 2, 'shuffle_seed': 42}),
+    BuildStage(
+        'improved_visualizer', _improved_visualizer,
+        inputs=['selected_50_sentences.json', 'selected_sentences_analyzer.json',
+                'improved_sentence_visualizer.py', 'word_tokenizer.py'],
+        outputs=[f'{name}_sentences_shuffled.txt' for name in _SETS]
+                + [f'{name}_{kind}_distribution_full.png' for name in _SETS for kind in ['word', 'phoneme']],
+        versions=['cmudict'],
+        params={'shuffle_seed': 42}),
+    BuildStage(
+        'phoneme_frequency', _phoneme_frequency,
+        inputs=['selected_sentences.txt', 'phoneme_frequency_analyzer.py', 'token_corpus.py', 'word_tokenizer.py'],
+        outputs=['phoneme_frequency_histogram.png', 'phoneme_frequency_histogram.pdf',
+                 'phoneme_frequency_report.txt'],
+        versions=['cmudict']),
+    BuildStage(
+        'phoneme_coverage', _phoneme_coverage,
+        inputs=['materials/2_2_spokenvwritten.txt', 'phoneme_coverage_analysis.py', 'word_table.py'],
+        outputs=['minimal_phoneme_coverage_words.txt', 'phoneme_words_mapping.txt',
+                 'minimal_coverage_summary.txt'],
+        versions=['cmudict']),
+]
+
+
+def main():
+    args = sys.argv[1:]
+    force = '--force' in args
+    names = [a for a in args if not a.startswith('--')]
+    stages = [s for s in REPORT_STAGES if not names or s.name in names]
+    unknown = set(names) - {s.name for s in REPORT_STAGES}
+    if unknown:
+        print(f"❌ Unknown stages: {', '.join(sorted(unknown))}")
+        print(f"   Available: {', '.join(s.name for s in REPORT_STAGES)}")
+        return
+
+    cache = BuildCache()
+    if '--list' in args:
+        for stage in stages:
+            try:
+                state, key = cache.status(stage)
+                print(f"   {stage.name:22s} {state:12s} {key[:12]}")
+            except FileNotFoundError as e:
+                print(f"   {stage.name:22s} {'missing':12s} {e}")
+        cache.save()
+        return
+
+    results = {}
+    for stage in stages:
+        print(f"\n🔨 {stage.name}")
+        try:
+            results[stage.name] = cache.build(stage, force)
+        except FileNotFoundError as e:
+            print(f"❌ {e}")
+            results[stage.name] = 'failed'
+            continue
+        print(f"   {results[stage.name]}")
+
+    print("\n📋 Build summary:")
+    for name, result in results.items():
+        print(f"   {name:22s} {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Candidate Ranker - 候选词汇/句子排序
+预先把所有候选项转换为计数矩阵，针对当前的音素/词汇缺口一次性向量化打分，
+返回收益最高的前 k 个候选项。
+"""
+
+import numpy as np
+
+from phoneme_tracker_clean import HIT_BONUS, MISSING_PENALTY, EXCESS_PENALTY
+
+
+def score_counts(counts, target):
+    """无状态打分：counts 可以是单个音素计数向量，也可以是按行排列的一批向量"""
+    diff = np.asarray(counts) - target
+    penalty = np.where(diff < 0, -MISSING_PENALTY * diff, EXCESS_PENALTY * diff)
+    return HIT_BONUS * (diff == 0).sum(axis=-1) - penalty.sum(axis=-1)
+
+
+class CandidateRanker:
+    def __init__(self, candidates, feature_lists, features):
+        """
+        candidates: 候选项文本列表（词汇或句子）
+        feature_lists: 每个候选项对应的特征列表（音素或词汇，可重复）
+        features: 特征顺序，决定矩阵的列
+        """
+        self.candidates = list(candidates)
+        self.features = list(features)
+        self.feature_index = {f: i for i, f in enumerate(self.features)}
+        self.candidate_index = {c: i for i, c in enumerate(self.candidates)}
+
+        self.matrix = np.zeros((len(self.candidates), len(self.features)), dtype=np.int32)
+        for row, items in enumerate(feature_lists):
+            for item in items:
+                col = self.feature_index.get(item)
+                if col is not None:
+                    self.matrix[row, col] += 1
+
+    def vector(self, counter):
+        """把 {特征: 数量} 转换为与矩阵列对齐的向量"""
+        vec = np.zeros(len(self.features), dtype=np.int32)
+        for feature, count in counter.items():
+            col = self.feature_index.get(feature)
+            if col is not None:
+                vec[col] = count
+        return vec
+
+    def target_gain(self, current, target):
+        """每个候选项加入后目标分布得分的变化（与 PhonemeTracker 的打分规则一致）"""
+        current = self.vector(current)
+        target = self.vector(target)
+        return score_counts(self.matrix + current, target) - score_counts(current, target)
+
+    def coverage_gain(self, current, target):
+        """每个候选项能填补的缺口数量：sum(min(候选计数, max(目标 - 当前, 0)))"""
+        deficit = np.maximum(self.vector(target) - self.vector(current), 0)
+        return np.minimum(self.matrix, deficit).sum(axis=1)
+
+    def top_k(self, gains, k=10, exclude=()):
+        """返回 [(候选项, 收益), ...]，按收益降序，排除已选择的候选项"""
+        gains = np.asarray(gains, dtype=np.float64).copy()
+        for item in exclude:
+            idx = self.candidate_index.get(item)
+            if idx is not None:
+                gains[idx] = -np.inf
+
+        k = min(k, int(np.isfinite(gains).sum()))
+        if k <= 0:
+            return []
+
+        top = np.argpartition(-gains, k - 1)[:k]
+        top = top[np.lexsort((top, -gains[top]))]
+        return [(self.candidates[i], float(gains[i])) for i in top]
+
+
+def load_candidate_lines(path):
+    """读取候选文件（每行一个词汇或句子）"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip()]
+    except FileNotFoundError:
+        print(f"❌ 找不到候选文件: {path}")
+        return []
@@ -7,6 +7,7 @@ import re
 import random
 import matplotlib.pyplot as plt
 from collections import defaultdict, Counter
+from word_tokenizer import surface_words, tokenize
 import nltk
 try:
     from nltk.corpus import cmudict
@@ -21,8 +22,10 @@ except:
 plt.rcParams['font.family'] = ['DejaVu Sans', 'Arial', 'sans-serif']
 plt.rcParams['axes.unicode_minus'] = False
 
+OUTPUT_DIR = "/Users/terry/Downloads/video2speech.github.io/video2speech.github.io/newset"
+
 class CompleteSentenceProcessor:
-    def __init__(self):
+    def __init__(self, output_dir=OUTPUT_DIR, seed=42):
         # CMU phoneme set (39 phonemes)
         self.cmu_phonemes = {
             # Vowels (15)
@@ -36,11 +39,11 @@ class CompleteSentenceProcessor:
         self.all_sentences = self.load_all_sentences()
         
         # Create output directory
-        self.output_dir = "/Users/terry/Downloads/video2speech.github.io/video2speech.github.io/newset"
+        self.output_dir = output_dir
         os.makedirs(self.output_dir, exist_ok=True)
         
         # Set random seed for reproducible shuffling
-        random.seed(42)
+        random.seed(seed)
         
     def load_target_words(self):
         """Load target words from selected_words.json"""
@@ -64,16 +67,12 @@ class CompleteSentenceProcessor:
             return []
     
     def clean_sentence(self, sentence):
-        """Clean sentence"""
-        sentence = sentence.lower()
-        sentence = re.sub(r'[^\w\s]', '', sentence)
-        sentence = re.sub(r'\s+', ' ', sentence).strip()
-        return sentence
+        """Clean sentence (lowercase, no punctuation, contractions kept as written)"""
+        return ' '.join(word.lower() for word in surface_words(sentence))
     
     def extract_words_from_sentence(self, sentence):
-        """Extract words from sentence"""
-        clean_text = self.clean_sentence(sentence)
-        return set(clean_text.split())
+        """Extract words from sentence (contractions expanded for matching)"""
+        return set(tokenize(sentence))
     
     def build_word_sentence_mapping(self):
         """Build word-sentence mapping"""
@@ -205,7 +204,7 @@ class CompleteSentenceProcessor:
         phoneme_counter = Counter()
         
         for sentence in sentences:
-            words = self.clean_sentence(sentence).split()
+            words = tokenize(sentence)
             for word in words:
                 word_counter[word] += 1
                 phonemes = self.get_word_phonemes(word)
@@ -331,7 +330,7 @@ class CompleteSentenceProcessor:
         
         return results
     
-    def run_complete_process(self):
+    def run_complete_process(self, max_sentences=50, min_word_coverage=2):
         """Run the complete sentence processing workflow"""
         print("🎯 Complete Sentence Processor")
         print("="*80)
@@ -355,7 +354,8 @@ class CompleteSentenceProcessor:
         word_sentence_map = self.build_word_sentence_mapping()
         
         # 2. Select optimal 50 sentences
-        selected_indices, word_coverage = self.greedy_sentence_selection(word_sentence_map)
+        selected_indices, word_coverage = self.greedy_sentence_selection(
+            word_sentence_map, max_sentences=max_sentences, min_word_coverage=min_word_coverage)
         
         # 3. Save selection results
         results = self.save_selection_results(selected_indices, word_coverage)
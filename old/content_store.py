@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Content Store - 按内容寻址的视频存储
+每个视频按 SHA-256 只保存一份：uploads/objects/<前两位>/<sha256>
+文件名到摘要的对应关系保存在目录数据库（recording_catalog）中，
+同一段视频重复上传（重试、换名）不再占用新的磁盘空间；
+分块上传初始化时给出的摘要已存在时，服务器直接确认，不需要再传输数据。
+
+用法:
+    python content_store.py gc [--uploads uploads]    删除目录中已没有文件名引用的对象
+"""
+
+import os
+import re
+import sys
+
+_DIGEST = re.compile(r'^[0-9a-f]{64}$')
+
+
+class ContentStore:
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, digest):
+        if not _DIGEST.match(digest or ''):
+            raise ValueError(f'无效的SHA-256: {digest}')
+        return os.path.join(self.root, digest[:2], digest)
+
+    def exists(self, digest, size=None):
+        """对象已存在（给出 size 时还要求大小一致）"""
+        try:
+            stat = os.stat(self.path(digest))
+        except (FileNotFoundError, ValueError):
+            return False
+        return size is None or stat.st_size == size
+
+    def put(self, temp_path, digest):
+        """把已算好摘要的临时文件放入存储，返回 (对象路径, 是否为新对象)；已存在时删除临时文件"""
+        path = self.path(digest)
+        if os.path.exists(path):
+            os.remove(temp_path)
+            return path, False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(temp_path, path)
+        return path, True
+
+    def digests(self):
+        for prefix in os.listdir(self.root):
+            directory = os.path.join(self.root, prefix)
+            if len(prefix) == 2 and os.path.isdir(directory):
+                for name in os.listdir(directory):
+                    if _DIGEST.match(name):
+                        yield name
+
+    def gc(self, referenced):
+        """删除不在 referenced 中的对象，返回 (删除数, 释放字节数)"""
+        removed = freed = 0
+        for digest in list(self.digests()):
+            if digest not in referenced:
+                path = self.path(digest)
+                freed += os.path.getsize(path)
+                os.remove(path)
+                removed += 1
+        return removed, freed
+
+
+def main():
+    from recording_catalog import RecordingCatalog
+
+    args = sys.argv[1:]
+    options = {'--uploads': 'uploads'}
+    for name in options:
+        if name in args:
+            i = args.index(name)
+            options[name] = args[i + 1]
+            del args[i:i + 2]
+    if args[:1] != ['gc']:
+        print("用法: python content_store.py gc [--uploads uploads]")
+        return
+
+    uploads_dir = options['--uploads']
+    catalog = RecordingCatalog(os.path.join(uploads_dir, 'catalog.db'))
+    store = ContentStore(os.path.join(uploads_dir, 'objects'))
+    removed, freed = store.gc(catalog.digests())
+    print(f"🧹 删除 {removed} 个未引用的对象，释放 {freed / 1024 / 1024:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Coverage Curves - 词汇量与覆盖率曲线
+一次向量化计算，得到每个词汇量 k 的：
+  - token 覆盖率：前 k 个词覆盖的 token 比例
+  - 句子覆盖率：只用前 k 个词就能完整表达的句子比例（句子中最大词排名 < k）
+基于 token 语料（token_corpus），每个句子的最大词排名用 np.maximum.reduceat 求得，
+比较 50 / 150 / 1000 词的词汇表只需查询曲线，不需要为每个大小运行一次脚本。
+
+用法:
+    python coverage_curves.py [句子文件] [--rank corpus|spoken|written|<词汇表文件>] [--sizes 50,150,1000]
+    curves = CoverageCurves(load_corpus('selected_sentences.txt'))
+    curves.query([50, 150, 1000])
+"""
+
+import sys
+import numpy as np
+
+from token_corpus import load_corpus
+
+
+UNRANKED = -1
+
+
+def ranking_from_words(corpus, ranked_words):
+    """按给定顺序的词汇 -> 每个 token ID 的排名（不在列表中的词为 UNRANKED，永远不被覆盖）"""
+    ranks = np.full(len(corpus.vocab), UNRANKED, dtype=np.int64)
+    for rank, word in enumerate(ranked_words):
+        token_id = corpus.word_to_id.get(word)
+        if token_id is not None and ranks[token_id] == UNRANKED:
+            ranks[token_id] = rank
+    return ranks
+
+
+def corpus_ranking(corpus):
+    """按语料自身词频排名（同频时按 token ID，保证稳定）"""
+    order = np.argsort(-corpus.word_counts(), kind='stable')
+    ranks = np.empty(len(corpus.vocab), dtype=np.int64)
+    ranks[order] = np.arange(len(order))
+    return ranks
+
+
+def table_ranking(corpus, column='freq_spoken'):
+    """按 word_table 中的频率列排名"""
+    from word_table import load_word_table
+    table = load_word_table()
+    return ranking_from_words(corpus, table.words[table.by_frequency(column)].tolist())
+
+
+class CoverageCurves:
+    def __init__(self, corpus, ranks=None, min_words=1):
+        """
+        ranks: 每个 token ID 的排名（0 为最常用），默认按语料词频
+        min_words: 少于该词数的句子不计入句子覆盖率
+        """
+        self.corpus = corpus
+        self.ranks = corpus_ranking(corpus) if ranks is None else np.asarray(ranks)
+
+        # 曲线覆盖 k = 0 .. max_k；未排名的词视为排名 max_k，不会被任何 k 覆盖
+        max_k = int(self.ranks.max()) + 1 if len(self.ranks) else 0
+        token_ranks = self.ranks[np.asarray(corpus.tokens)]
+        token_ranks[token_ranks == UNRANKED] = max_k
+
+        # token 覆盖率：第 k 项 = 排名 < k 的 token 比例
+        rank_counts = np.bincount(token_ranks, minlength=max_k + 1)[:max_k]
+        self.token_coverage = np.concatenate([[0], np.cumsum(rank_counts)]) / max(len(token_ranks), 1)
+
+        # 句子覆盖率：第 k 项 = 最大排名 < k 的句子比例
+        # reduceat 的分段以下一个起点为终点，因此先对所有非空句子求最大值，再按词数过滤
+        lengths = corpus.sentence_lengths()
+        nonempty = lengths > 0
+        starts = np.asarray(corpus.offsets[:-1])[nonempty]
+        max_ranks = np.maximum.reduceat(token_ranks, starts) if len(starts) else np.zeros(0, dtype=np.int64)
+        self.max_ranks = max_ranks[lengths[nonempty] >= min_words]
+        self.num_sentences = len(self.max_ranks)
+        sentence_counts = np.bincount(self.max_ranks, minlength=max_k + 1)[:max_k]
+        self.sentence_coverage = np.concatenate([[0], np.cumsum(sentence_counts)]) / max(self.num_sentences, 1)
+
+    def __len__(self):
+        """曲线长度：k = 0 .. len - 1"""
+        return len(self.token_coverage)
+
+    def _clip(self, k):
+        return min(int(k), len(self) - 1)
+
+    def query(self, sizes):
+        """[{'size', 'token_coverage', 'sentence_coverage', 'sentences'}, ...]"""
+        return [{
+            'size': int(k),
+            'token_coverage': float(self.token_coverage[self._clip(k)]),
+            'sentence_coverage': float(self.sentence_coverage[self._clip(k)]),
+            'sentences': int(round(self.sentence_coverage[self._clip(k)] * self.num_sentences)),
+        } for k in sizes]
+
+    def size_for(self, fraction, curve='sentence'):
+        """达到给定覆盖率所需的最小词汇量；达不到时返回 None"""
+        values = self.sentence_coverage if curve == 'sentence' else self.token_coverage
+        k = int(np.searchsorted(values, fraction - 1e-12))
+        return k if k < len(values) else None
+
+
+def main():
+    args = sys.argv[1:]
+    options = {'--rank': 'corpus', '--sizes': '50,150,500,1000'}
+    for name in options:
+        if name in args:
+            i = args.index(name)
+            options[name] = args[i + 1]
+            del args[i:i + 2]
+    sentence_file = args[0] if args else 'selected_sentences.txt'
+
+    corpus = load_corpus(sentence_file)
+    rank = options['--rank']
+    if rank == 'corpus':
+        ranks = corpus_ranking(corpus)
+    elif rank in ('spoken', 'written', 'total'):
+        ranks = table_ranking(corpus, f'freq_{rank}')
+    else:
+        with open(rank, 'r', encoding='utf-8') as f:
+            ranks = ranking_from_words(corpus, [line.strip().lower() for line in f if line.strip()])
+
+    curves = CoverageCurves(corpus, ranks, min_words=3)
+    print(f"\n📊 {corpus.meta['num_tokens']:,} tokens, {curves.num_sentences:,} sentences (≥3 words), ranking: {rank}")
+    print(f"{'Size':>8} {'Token coverage':>16} {'Sentence coverage':>19} {'Sentences':>10}")
+    for row in curves.query(int(k) for k in options['--sizes'].split(',')):
+        print(f"{row['size']:>8} {row['token_coverage'] * 100:>15.2f}% "
+              f"{row['sentence_coverage'] * 100:>18.2f}% {row['sentences']:>10,}")
+    for fraction in (0.5, 0.8, 0.9):
+        print(f"   {fraction * 100:.0f}% of sentences need {curves.size_for(fraction)} words")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Curate Corpus - 语料整理流水线
+把原来由中间文件串起来的脚本（过滤电影台词 -> 去重 -> 按词数过滤 -> 合并）合成一次流式运行：
+
+    读取语料（.tsv/.jsonl/.txt/.srt/.vtt）-> 分句 -> 词汇表过滤（进程池）-> 按词数过滤 -> 指纹去重 -> 写出
+
+用法:
+    python curate_corpus.py [语料文件 ...] [--vocab 词汇表] [--output 输出文件] [--workers N]
+多个语料文件按顺序合并；输出文件旁边会生成 <输出文件>.manifest.json 和重复组报告。
+"""
+
+import json
+import os
+import sys
+from dialogue_readers import read_all
+from fingerprint_dedup import FingerprintSet, dedupe_stage
+from pipeline import MapStage, Pipeline, Stage
+from sentence_splitter import split_stage
+from word_tokenizer import tokenize
+
+MOVIE_FILE = 'materials/movie_lines.tsv'
+VOCAB_FILE = 'final_word_list.txt'
+OUTPUT_FILE = 'curated_sentences.txt'     # 不要直接覆盖现有的句子池 selected_sentences.txt
+
+
+_vocabulary = set()
+
+
+def _load_vocabulary(vocab_file):
+    with open(vocab_file, 'r', encoding='utf-8') as f:
+        _vocabulary.update(line.strip().lower() for line in f if line.strip())
+
+
+def check_vocabulary(record):
+    """所有词都在词汇表中时输出 (line_id, 说话人, 句子, 词数)"""
+    line_id, speaker, sentence = record
+    words = tokenize(sentence)
+    if words and all(word in _vocabulary for word in words):
+        return [(line_id, speaker, sentence, len(words))]
+    return []
+
+
+def filter_word_count(records, min_words=3, max_words=None):
+    for record in records:
+        if record[3] >= min_words and (max_words is None or record[3] <= max_words):
+            yield record
+
+
+def dedupe(records, seen=None):
+    """按清理后句子的 64 位指纹去重，保留第一次出现；重复组记录在 seen 中"""
+    return dedupe_stage(records, key=lambda record: record[2], line_id=lambda record: record[0], seen=seen)
+
+
+def build_pipeline(vocab_file=VOCAB_FILE, workers=0, min_words=3, max_words=None, seen=None):
+    return Pipeline('curate_corpus', [
+        Stage('split', split_stage, buffer_size=1000),
+        MapStage('vocabulary', check_vocabulary, workers=workers, chunk_size=2000,
+                 initializer=_load_vocabulary, initargs=(vocab_file,)),
+        Stage('word_count', filter_word_count, min_words=min_words, max_words=max_words),
+        Stage('dedupe', dedupe, seen=seen),
+    ], params={'vocab_file': vocab_file, 'min_words': min_words, 'max_words': max_words})
+
+
+def main():
+    args = sys.argv[1:]
+    options = {'--vocab': VOCAB_FILE, '--output': OUTPUT_FILE, '--workers': '0'}
+    for name in options:
+        if name in args:
+            i = args.index(name)
+            options[name] = args[i + 1]
+            del args[i:i + 2]
+    sources = args or [MOVIE_FILE]
+    vocab_file, output_file, workers = options['--vocab'], options['--output'], int(options['--workers'])
+    if os.path.abspath(output_file) in {os.path.abspath(path) for path in sources + [vocab_file]}:
+        print(f"❌ Output file {output_file} would overwrite an input file")
+        sys.exit(1)
+
+    seen = FingerprintSet()
+    pipeline = build_pipeline(vocab_file, workers, seen=seen)
+    try:
+        count = pipeline.run_to_file(read_all(sources, workers), output_file,
+                                     format_item=lambda record: record[2],
+                                     inputs=sources + [vocab_file])
+    except FileNotFoundError as e:
+        print(f"❌ File not found: {e}")
+        return
+
+    duplicates_file = output_file + '.duplicates.json'
+    with open(duplicates_file, 'w', encoding='utf-8') as f:
+        json.dump(seen.groups(), f)
+
+    pipeline.summary()
+    print(f"\n✅ {count} sentences written to {output_file}")
+    print(f"   Duplicate groups (line IDs): {duplicates_file}")
+    print(f"   Manifest: {output_file}.manifest.json")
+
+
+if __name__ == "__main__":
+    main()
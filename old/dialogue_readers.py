@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Dialogue Readers - 可插拔的对话语料读取层
+不同格式的语料统一输出 (source_id, speaker, text) 记录，交给同一个过滤流水线：
+
+    .tsv    每行一条，默认 Cornell movie_lines 列：line_id, 用户, 电影, 说话人, 台词
+    .jsonl  每行一个 JSON 对象，默认字段 id / speaker / text
+    .txt    每行一条；"NAME: text" 形式时拆出说话人
+    .srt / .vtt   字幕，每个字幕块一条；去掉时间轴、<i> 等标签，识别 <v 说话人> 和 "- " 对话
+
+    for source_id, speaker, text in read_records('materials/movie_lines.tsv'): ...
+    read_parallel(paths, workers=4)      大文件按字节范围分块在进程池中读取，输出顺序不变
+    register_reader('.csv', my_reader)   添加新格式
+"""
+
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+CHUNK_BYTES = 8 << 20
+
+# ---------------------------------------------------------------- 行格式
+
+_SPEAKER_PREFIX = re.compile(r'^([A-Z][A-Z .\'-]{0,30}):\s+(.+)$')
+
+
+def parse_tsv_line(line, id_column=0, speaker_column=3, text_column=4):
+    """TSV 行 -> (id, 说话人, 文本)；列数不足时返回 None"""
+    parts = line.rstrip('\r\n').split('\t')
+    if len(parts) <= text_column or not parts[text_column].strip():
+        return None
+    speaker = parts[speaker_column] if speaker_column is not None and speaker_column < len(parts) else ''
+    source_id = parts[id_column] if id_column is not None else None
+    return source_id, speaker, parts[text_column]
+
+
+def parse_jsonl_line(line, id_key='id', speaker_key='speaker', text_key='text'):
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        obj = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    text = obj.get(text_key)
+    if not isinstance(text, str) or not text.strip():
+        return None
+    source_id = obj.get(id_key)
+    return (str(source_id) if source_id is not None else None), str(obj.get(speaker_key) or ''), text
+
+
+def parse_text_line(line):
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    match = _SPEAKER_PREFIX.match(line)
+    if match:
+        return None, match.group(1).strip(), match.group(2)
+    return None, '', line
+
+
+LINE_PARSERS = {
+    '.tsv': parse_tsv_line,
+    '.jsonl': parse_jsonl_line,
+    '.txt': parse_text_line,
+}
+
+
+def _parse_lines(lines, parser, options, first_line=1):
+    """行 -> (本地行号, id, 说话人, 文本)"""
+    for line_num, line in enumerate(lines, first_line):
+        record = parser(line, **options)
+        if record is not None:
+            yield (line_num,) + record
+
+
+def _with_ids(name, records):
+    """没有显式 id 的记录使用 <文件名>:<行号>"""
+    for line_num, source_id, speaker, text in records:
+        yield (source_id if source_id is not None else f'{name}:{line_num}'), speaker, text
+
+
+def read_lines(path, **options):
+    """逐行格式的流式读取"""
+    parser = LINE_PARSERS[os.path.splitext(path)[1].lower()]
+    with open(path, 'r', encoding='utf-8', errors='ignore', newline='\n') as f:
+        yield from _with_ids(os.path.basename(path), _parse_lines(f, parser, options))
+
+
+# ---------------------------------------------------------------- 字幕
+
+_TIMING = re.compile(r'^\s*(?:\d{1,2}:)?\d{1,2}:\d{2}[.,]\d{3}\s*-->')
+_VOICE = re.compile(r'<v(?:\.[\w.-]+)?\s+([^>]+)>')
+_TAG = re.compile(r'<[^>]+>|\{\\[^}]*\}')
+
+
+def _subtitle_cue(cue_lines):
+    """字幕块的文本行 -> [(说话人, 文本), ...]；"- " 开头的行是不同说话人的对话"""
+    speaker = ''
+    turns = []
+    for line in cue_lines:
+        voice = _VOICE.search(line)
+        if voice:
+            speaker = voice.group(1).strip()
+        text = _TAG.sub('', line).strip()
+        if not text:
+            continue
+        if text.startswith('- ') or not turns:
+            turns.append([speaker, text.lstrip('- ').strip()])
+        else:
+            turns[-1][1] += ' ' + text
+    return [tuple(turn) for turn in turns if turn[1]]
+
+
+def read_subtitles(path):
+    """.srt / .vtt：每个字幕块（或块内每段 "- " 对话）一条记录，id 为 <文件名>:<块号>"""
+    name = os.path.basename(path)
+    cue_num = 0
+    cue_lines = []
+    in_cue = False
+
+    def flush():
+        for i, (speaker, text) in enumerate(_subtitle_cue(cue_lines)):
+            yield (f'{name}:{cue_num}' if i == 0 else f'{name}:{cue_num}.{i}'), speaker, text
+
+    with open(path, 'r', encoding='utf-8-sig', errors='ignore') as f:
+        for line in f:
+            line = line.rstrip('\r\n')
+            if _TIMING.match(line):
+                cue_num += 1
+                in_cue = True
+                cue_lines = []
+            elif not line.strip():
+                if in_cue:
+                    yield from flush()
+                in_cue = False
+                cue_lines = []
+            elif in_cue:
+                cue_lines.append(line)
+        if in_cue:
+            yield from flush()
+
+
+# ---------------------------------------------------------------- 注册表
+
+READERS = {
+    '.tsv': read_lines,
+    '.jsonl': read_lines,
+    '.txt': read_lines,
+    '.srt': read_subtitles,
+    '.vtt': read_subtitles,
+}
+
+
+def register_reader(extension, reader, line_parser=None):
+    """
+    注册新格式：reader(path, **options) 输出 (source_id, speaker, text)
+    逐行格式也可以只提供 line_parser(line, **options) -> (id 或 None, 说话人, 文本) 或 None，
+    这样同样支持分块并行读取
+    """
+    extension = extension.lower()
+    if line_parser is not None:
+        LINE_PARSERS[extension] = line_parser
+        reader = reader or read_lines
+    READERS[extension] = reader
+
+
+def read_records(path, **options):
+    """按扩展名选择读取器"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in READERS:
+        raise ValueError(f"No reader for {extension} files (supported: {', '.join(sorted(READERS))})")
+    return READERS[extension](path, **options)
+
+
+# ---------------------------------------------------------------- 并行读取
+
+def chunk_ranges(path, chunk_bytes=CHUNK_BYTES):
+    """把文件按字节切分为若干段，每段边界对齐到换行符"""
+    size = os.path.getsize(path)
+    ranges = []
+    with open(path, 'rb') as f:
+        start = 0
+        while start < size:
+            end = min(start + chunk_bytes, size)
+            if end < size:
+                f.seek(end)
+                f.readline()
+                end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def read_chunk(args):
+    """工作进程：读取一段字节范围，返回 (行数, 记录)"""
+    path, start, end, options = args
+    parser = LINE_PARSERS[os.path.splitext(path)[1].lower()]
+    with open(path, 'rb') as f:
+        f.seek(start)
+        lines = f.read(end - start).decode('utf-8', errors='ignore').split('\n')
+    if lines and not lines[-1]:
+        lines.pop()
+    return len(lines), list(_parse_lines(lines, parser, options, first_line=0))
+
+
+def _read_file(args):
+    path, options = args
+    return list(read_records(path, **options))
+
+
+def read_parallel(paths, workers=4, chunk_bytes=CHUNK_BYTES, max_pending=None, **options):
+    """
+    在进程池中读取多个文件，输出顺序与串行读取相同
+    逐行格式按字节范围分块；字幕等其他格式按文件并行
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    max_pending = max_pending or 2 * workers
+
+    def tasks():
+        for path in paths:
+            extension = os.path.splitext(path)[1].lower()
+            if READERS.get(extension) is read_lines and extension in LINE_PARSERS:
+                for start, end in chunk_ranges(path, chunk_bytes):
+                    yield path, 'chunk', (path, start, end, options)
+            else:
+                yield path, 'file', (path, options)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        line_base = {}
+
+        def collect(item):
+            path, kind, future = item
+            if kind == 'file':
+                yield from future.result()
+                return
+            num_lines, records = future.result()
+            base = line_base.get(path, 1)
+            line_base[path] = base + num_lines
+            yield from _with_ids(os.path.basename(path),
+                                 ((base + n, source_id, speaker, text)
+                                  for n, source_id, speaker, text in records))
+
+        for path, kind, args in tasks():
+            func = read_chunk if kind == 'chunk' else _read_file
+            pending.append((path, kind, pool.submit(func, args)))
+            if len(pending) >= max_pending:
+                yield from collect(pending.pop(0))
+        for item in pending:
+            yield from collect(item)
+
+
+def read_all(paths, workers=0, **options):
+    """读取多个文件；workers > 0 时并行"""
+    if isinstance(paths, str):
+        paths = [paths]
+    if workers:
+        yield from read_parallel(paths, workers, **options)
+        return
+    for path in paths:
+        yield from read_records(path, **options)
+
+
+if __name__ == "__main__":
+    import sys
+    from collections import Counter
+    for path in sys.argv[1:]:
+        speakers = Counter()
+        count = 0
+        for source_id, speaker, text in read_records(path):
+            if count < 3:
+                print(f"   {source_id:>12s} {speaker[:12]:12s} {text[:60]}")
+            speakers[speaker] += 1
+            count += 1
+        print(f"📁 {path}: {count} records, {len(speakers)} speakers")
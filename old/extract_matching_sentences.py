@@ -7,6 +7,8 @@
 import re
 import string
 
+from sentence_splitter import split_sentences, split_stage
+
 def load_pick_words():
     """加载PICK.txt中的词汇"""
     with open('/Users/terry/Downloads/video2speech.github.io/video2speech.github.io/PICK.txt', 'r', encoding='utf-8') as f:
@@ -18,20 +20,23 @@ def load_pick_words():
         return words
 
 def clean_and_split_text(text):
-    """清理文本并分割成句子"""
+    """清理文本并分割成句子（去掉句末标点）"""
     # 移除引号和其他标点符号，但保留句子分隔符
     text = text.replace('"', '').replace("'", "'")
-    
-    # 按句子分隔符分割
-    sentences = re.split(r'[.!?]+', text)
-    
-    cleaned_sentences = []
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if sentence:
-            cleaned_sentences.append(sentence)
-    
-    return cleaned_sentences
+    return [s.rstrip('.!?').strip() for s in split_sentences(text) if s.rstrip('.!?').strip()]
+
+
+def dialogue_lines(f, counts=None):
+    """
+    逐行读取 TSV，输出 (行号, 对话内容)；格式：L1045	u0	m0	BIANCA	They do not!
+    counts['lines'] 记录已读取的行数（包括没有对话内容、没有产生句子的行）
+    """
+    for line_num, line in enumerate(f, 1):
+        if counts is not None:
+            counts['lines'] = line_num
+        parts = line.strip().split('\t')
+        if len(parts) >= 5:
+            yield line_num, parts[4].replace('"', '')
 
 def extract_words_from_sentence(sentence):
     """从句子中提取单词"""
@@ -79,35 +84,33 @@ def process_movie_lines():
     
     matching_sentences = []
     seen_sentences = set()  # 用于去重
-    total_lines = 0
+    counts = {'lines': 0}
+    last_line = 0
     total_sentences = 0
     
     # 处理movie_lines.tsv
     with open('/Users/terry/Downloads/video2speech.github.io/video2speech.github.io/materials/movie_lines.tsv', 'r', encoding='utf-8', errors='ignore') as f:
-        for line_num, line in enumerate(f, 1):
-            total_lines += 1
-            
-            if line_num % 10000 == 0:
-                print(f"📊 处理进度: {line_num} 行, 找到 {len(matching_sentences)} 个匹配句子")
-            
-            # 解析TSV格式：L1045	u0	m0	BIANCA	They do not!
-            parts = line.strip().split('\t')
-            if len(parts) >= 5:
-                dialogue = parts[4]  # 对话内容
-                
-                # 分割成句子
-                sentences = clean_and_split_text(dialogue)
-                total_sentences += len(sentences)
-                
-                for sentence in sentences:
-                    # 检查是否符合条件
-                    if check_sentence_matches(sentence, pick_words):
-                        # 去重检查
-                        sentence_lower = sentence.lower().strip()
-                        if sentence_lower not in seen_sentences:
-                            seen_sentences.add(sentence_lower)
-                            matching_sentences.append(sentence.strip())
-    
+        # 逐行读取 -> 分句（生成器阶段）-> 检查
+        for line_num, sentence in split_stage(dialogue_lines(f, counts)):
+            if line_num > last_line:
+                last_line = line_num
+                if line_num % 10000 == 0:
+                    print(f"📊 处理进度: {line_num} 行, 找到 {len(matching_sentences)} 个匹配句子")
+
+            sentence = sentence.rstrip('.!?').strip()
+            if not sentence:
+                continue
+            total_sentences += 1
+
+            # 检查是否符合条件
+            if check_sentence_matches(sentence, pick_words):
+                # 去重检查
+                sentence_lower = sentence.lower().strip()
+                if sentence_lower not in seen_sentences:
+                    seen_sentences.add(sentence_lower)
+                    matching_sentences.append(sentence.strip())
+    
+    total_lines = counts['lines']
     print(f"\n📈 处理完成:")
     print(f"   总行数: {total_lines:,}")
     print(f"   总句子数: {total_sentences:,}")
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Fingerprint Dedup - 基于 64 位指纹的流式精确去重
+不再把每个规范化后的句子字符串放在内存中，只保存 64 位指纹（BLAKE2b）和首次出现的行号：
+  - 最近的指纹放在字典中，满 buffer_size 后排序压缩为 uint64 数组（指纹 8 字节 + 行号）
+  - 指定 spill_dir 时，压缩后的数组写入磁盘并以 mmap 方式查询；数组过多时在磁盘上分块归并
+  - 记录重复组：按指纹分组，[首次出现的行号, 重复出现的行号, ...]
+    （同一行拆出的多个句子共用行号，所以分组不能以行号为键）
+
+用法:
+    python fingerprint_dedup.py input.txt [output.txt] [--spill DIR]
+    for record in dedupe_stage(records, key=lambda r: r[2], line_id=lambda r: r[0]): ...
+"""
+
+import hashlib
+import json
+import os
+import sys
+import numpy as np
+
+from word_tokenizer import clean_sentence
+
+
+def fingerprint(text, normalize=clean_sentence):
+    """规范化文本的 64 位指纹"""
+    digest = hashlib.blake2b(normalize(text).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class FingerprintSet:
+    def __init__(self, buffer_size=100000, max_runs=8, spill_dir=None):
+        self.buffer_size = buffer_size
+        self.max_runs = max_runs
+        self.spill_dir = spill_dir
+        self.recent = {}     # 指纹 -> 首次出现的行号
+        self.runs = []       # [(排序后的指纹数组, 对应的行号数组), ...]
+        self.run_paths = []  # 每个数组在磁盘上的文件前缀（未写入磁盘时为 None）
+        self.duplicates = {} # 指纹 -> [首次出现的行号, 重复的行号, ...]
+        self.count = 0
+        self._spilled = 0
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def __len__(self):
+        return self.count
+
+    def first_seen(self, fp):
+        """指纹首次出现的行号，未出现过时返回 None"""
+        if fp in self.recent:
+            return self.recent[fp]
+        key = np.uint64(fp)
+        for fps, ids in self.runs:
+            i = np.searchsorted(fps, key)
+            if i < len(fps) and fps[i] == key:
+                return ids[i].item()
+        return None
+
+    def add(self, fp, line_id):
+        """加入指纹；是新指纹时返回 True，重复时记录重复组并返回 False"""
+        first = self.first_seen(fp)
+        if first is not None:
+            self.duplicates.setdefault(fp, [first]).append(line_id)
+            return False
+        self.recent[fp] = line_id
+        self.count += 1
+        if len(self.recent) >= self.buffer_size:
+            self.flush()
+        return True
+
+    def flush(self):
+        """把最近的指纹压缩为排序数组；数组过多时合并"""
+        if not self.recent:
+            return
+        fps = np.fromiter(self.recent.keys(), dtype=np.uint64, count=len(self.recent))
+        ids = np.array(list(self.recent.values()))
+        self.recent = {}
+        order = np.argsort(fps, kind='stable')
+        if self.spill_dir:
+            self.runs.append(self._spill(fps[order], ids[order]))
+        else:
+            self.runs.append((fps[order], ids[order]))
+            self.run_paths.append(None)
+
+        if len(self.runs) > self.max_runs:
+            if self.spill_dir:
+                self._merge_spilled()
+            else:
+                fps = np.concatenate([run[0] for run in self.runs])
+                ids = np.concatenate([run[1] for run in self.runs])
+                order = np.argsort(fps, kind='stable')
+                self.runs = [(fps[order], ids[order])]
+                self.run_paths = [None]
+
+    def _next_path(self):
+        path = os.path.join(self.spill_dir, f'run_{self._spilled:04d}')
+        self._spilled += 1
+        return path
+
+    def _spill(self, fps, ids):
+        """写入磁盘，以 mmap 方式重新打开"""
+        path = self._next_path()
+        np.save(path + '_fps.npy', fps)
+        np.save(path + '_ids.npy', ids)
+        self.run_paths.append(path)
+        return np.load(path + '_fps.npy', mmap_mode='r'), np.load(path + '_ids.npy', mmap_mode='r')
+
+    def _merge_two(self, a, b, block_size):
+        """在磁盘上归并两个已排序的数组，每次只读入 block_size 项；返回新文件前缀"""
+        (a_fps, a_ids), (b_fps, b_ids) = a, b
+        path = self._next_path()
+        total = len(a_fps) + len(b_fps)
+        out_fps = np.lib.format.open_memmap(path + '_fps.npy', mode='w+', dtype=np.uint64, shape=(total,))
+        out_ids = np.lib.format.open_memmap(path + '_ids.npy', mode='w+',
+                                            dtype=np.result_type(a_ids.dtype, b_ids.dtype), shape=(total,))
+        i = j = k = 0
+        while i < len(a_fps) or j < len(b_fps):
+            fa, fb = a_fps[i:i + block_size], b_fps[j:j + block_size]
+            # 两块中都能确定位置的部分：不超过两块末尾较小值的项（一方已用完时取另一方整块）
+            if len(fa) and len(fb):
+                cut = min(fa[-1], fb[-1])
+                na = int(np.searchsorted(fa, cut, side='right'))
+                nb = int(np.searchsorted(fb, cut, side='right'))
+            else:
+                na, nb = len(fa), len(fb)
+            fps = np.concatenate([fa[:na], fb[:nb]])
+            ids = np.concatenate([a_ids[i:i + na], b_ids[j:j + nb]])
+            order = np.argsort(fps, kind='stable')
+            out_fps[k:k + na + nb] = fps[order]
+            out_ids[k:k + na + nb] = ids[order]
+            i, j, k = i + na, j + nb, k + na + nb
+        out_fps.flush()
+        out_ids.flush()
+        del out_fps, out_ids
+        return path
+
+    def _merge_spilled(self, block_size=1 << 20):
+        """逐对归并磁盘上的数组，删除被取代的文件，最后只保留一个 mmap 数组"""
+        runs, paths = self.runs, self.run_paths
+        while len(runs) > 1:
+            merged = self._merge_two(runs[0], runs[1], block_size)
+            for old in paths[:2]:
+                if old is not None:
+                    os.remove(old + '_fps.npy')
+                    os.remove(old + '_ids.npy')
+            merged_run = (np.load(merged + '_fps.npy', mmap_mode='r'), np.load(merged + '_ids.npy', mmap_mode='r'))
+            runs = [merged_run] + runs[2:]
+            paths = [merged] + paths[2:]
+        self.runs, self.run_paths = runs, paths
+
+    def memory_bytes(self):
+        """估计的内存占用（不含已写入磁盘的数组）"""
+        in_memory = sum(fps.nbytes + ids.nbytes for fps, ids in self.runs
+                        if not isinstance(fps, np.memmap))
+        return in_memory + sys.getsizeof(self.recent) + 64 * len(self.recent)
+
+    def groups(self):
+        """重复组 [[首次行号, 重复行号, ...], ...]"""
+        return [list(group) for group in self.duplicates.values()]
+
+
+def dedupe_stage(items, key=lambda item: item, line_id=None, seen=None, normalize=clean_sentence):
+    """
+    生成器阶段：只输出第一次出现的项
+    key(item) 为比较的文本，line_id(item) 为报告中使用的行号（默认按输入顺序编号）；
+    传入 seen (FingerprintSet) 可在运行结束后取得重复组
+    """
+    seen = seen if seen is not None else FingerprintSet()
+    for i, item in enumerate(items):
+        if seen.add(fingerprint(key(item), normalize), line_id(item) if line_id else i):
+            yield item
+    seen.flush()
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    spill_dir = None
+    if '--spill' in sys.argv:
+        spill_dir = sys.argv[sys.argv.index('--spill') + 1]
+        args.remove(spill_dir)
+    if not args:
+        print("Usage: python fingerprint_dedup.py input.txt [output.txt] [--spill DIR]")
+        return
+    input_file = args[0]
+    base, extension = os.path.splitext(input_file)
+    output_file = args[1] if len(args) > 1 else f'{base}_dedup{extension or ".txt"}'
+    report_file = os.path.splitext(output_file)[0] + '_duplicates.json'
+    for path in (output_file, report_file):
+        if os.path.abspath(path) == os.path.abspath(input_file):
+            print(f"❌ Output file {path} would overwrite the input file")
+            sys.exit(1)
+
+    seen = FingerprintSet(spill_dir=spill_dir)
+    with open(input_file, 'r', encoding='utf-8') as f:
+        lines = ((line_num, line.rstrip('\n')) for line_num, line in enumerate(f, 1) if line.strip())
+        with open(output_file, 'w', encoding='utf-8') as out:
+            for _, sentence in dedupe_stage(lines, key=lambda r: r[1], line_id=lambda r: r[0], seen=seen):
+                out.write(sentence + '\n')
+
+    groups = seen.groups()
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump({'input': input_file, 'unique': len(seen),
+                   'duplicate_lines': sum(len(g) - 1 for g in groups),
+                   'groups': groups}, f, indent=2)
+
+    print(f"✅ {len(seen)} unique sentences -> {output_file}")
+    print(f"   {len(groups)} duplicate groups ({sum(len(g) - 1 for g in groups)} lines removed) -> {report_file}")
+    print(f"   Fingerprint memory: {seen.memory_bytes() / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
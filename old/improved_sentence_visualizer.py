@@ -8,6 +8,7 @@ import random
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
 from collections import defaultdict, Counter
+from word_tokenizer import clean_sentence
 import nltk
 try:
     from nltk.corpus import cmudict
@@ -23,7 +24,7 @@ plt.rcParams['font.family'] = ['DejaVu Sans', 'Arial', 'sans-serif']
 plt.rcParams['axes.unicode_minus'] = False
 
 class ImprovedSentenceVisualizer:
-    def __init__(self):
+    def __init__(self, seed=42):
         # CMU phoneme set (39 phonemes)
         self.cmu_phonemes = {
             # Vowels (15)
@@ -37,7 +38,7 @@ class ImprovedSentenceVisualizer:
         self.all_sentences = self.load_all_sentences()
         
         # Set random seed for reproducible shuffling
-        random.seed(42)
+        random.seed(seed)
         
     def load_selected_data(self):
         """Load selected 50 sentences data"""
@@ -59,10 +60,7 @@ class ImprovedSentenceVisualizer:
     
     def clean_sentence(self, sentence):
         """Clean sentence"""
-        sentence = sentence.lower()
-        sentence = re.sub(r'[^\w\s]', '', sentence)
-        sentence = re.sub(r'\s+', ' ', sentence).strip()
-        return sentence
+        return clean_sentence(sentence)
     
     def get_word_phonemes(self, word):
         """Get phonemes of a word"""
@@ -4,91 +4,28 @@ Improved vocabulary comparison with proper contraction splitting.
 Split contractions like "action's" into "action" + "'s"
 """
 
-import re
 from collections import Counter
+from word_tokenizer import tokenize
+from token_corpus import load_corpus
 
 def split_contractions(text):
     """
-    Split contractions and possessives properly.
+    Split contractions and possessives properly (Treebank style).
     Examples:
     - "action's" -> ["action", "'s"]
     - "don't" -> ["do", "n't"]
-    - "I'll" -> ["I", "'ll"]
+    - "I'll" -> ["i", "'ll"]
     - "you're" -> ["you", "'re"]
     """
-    tokens = []
-    
-    # First, find all word-like tokens
-    word_tokens = re.findall(r"\b\w+(?:'\w+)?\b", text.lower())
-    
-    for token in word_tokens:
-        if "'" in token:
-            # Split contractions
-            if token.endswith("'s"):
-                # Possessive: "action's" -> ["action", "'s"]
-                base = token[:-2]
-                if base:  # Make sure base is not empty
-                    tokens.extend([base, "'s"])
-            elif token.endswith("n't"):
-                # Negative: "don't" -> ["do", "n't"]
-                base = token[:-3]
-                if base:
-                    tokens.extend([base, "n't"])
-            elif token.endswith("'ll"):
-                # Will: "I'll" -> ["I", "'ll"]
-                base = token[:-3]
-                if base:
-                    tokens.extend([base, "'ll"])
-            elif token.endswith("'re"):
-                # Are: "you're" -> ["you", "'re"]
-                base = token[:-3]
-                if base:
-                    tokens.extend([base, "'re"])
-            elif token.endswith("'ve"):
-                # Have: "I've" -> ["I", "'ve"]
-                base = token[:-3]
-                if base:
-                    tokens.extend([base, "'ve"])
-            elif token.endswith("'d"):
-                # Would/Had: "I'd" -> ["I", "'d"]
-                base = token[:-2]
-                if base:
-                    tokens.extend([base, "'d"])
-            elif token.endswith("'m"):
-                # Am: "I'm" -> ["I", "'m"]
-                base = token[:-2]
-                if base:
-                    tokens.extend([base, "'m"])
-            else:
-                # Other contractions, keep as is for now
-                tokens.append(token)
-        else:
-            # Regular word
-            tokens.append(token)
-    
-    return tokens
+    return list(tokenize(text, expand=False))
 
 def extract_vocabulary_from_sentences_improved(filename):
     """Extract all unique words from sentences file with proper contraction splitting."""
     print(f"Extracting vocabulary from {filename} with contraction splitting...")
-    vocabulary = set()
-    word_count = Counter()
-    
-    with open(filename, 'r', encoding='utf-8') as f:
-        for line_num, line in enumerate(f, 1):
-            if line_num % 10000 == 0:
-                print(f"Processed {line_num} lines...")
-            
-            sentence = line.strip()
-            if not sentence:
-                continue
-            
-            # Split contractions properly
-            tokens = split_contractions(sentence)
-            
-            for token in tokens:
-                vocabulary.add(token)
-                word_count[token] += 1
+    # Token-ID corpus with Treebank-style contraction splitting (see split_contractions)
+    corpus = load_corpus(filename, mode='split')
+    word_count = Counter(corpus.counter())
+    vocabulary = set(word_count)
     
     print(f"Found {len(vocabulary)} unique words/tokens in sentences")
     return vocabulary, word_count
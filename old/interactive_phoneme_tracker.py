@@ -28,6 +28,11 @@ class PhonemeTracker:
         self.selected_words = []
         self.save_file = "selected_words.json"
         
+        # Candidate ranking (built lazily on first suggest)
+        self.candidate_file = "final_word_list.txt"
+        self.ranker = None
+        self.last_suggestions = []
+        
         # Target phoneme distribution (from our calculation)
         self.target_distribution = {
             'AH': 3, 'T': 3, 'N': 3, 'S': 3,
@@ -217,6 +222,42 @@ class PhonemeTracker:
         if excess:
             print(f"{Fore.YELLOW}  超出: {', '.join(excess)}")
     
+    def build_ranker(self):
+        """Precompute the (candidate words x phonemes) count matrix."""
+        from candidate_ranker import CandidateRanker, load_candidate_lines
+        
+        words = []
+        phoneme_lists = []
+        seen = set()
+        for word in load_candidate_lines(self.candidate_file):
+            phonemes = self.get_word_phonemes(word)
+            if phonemes and word not in seen:
+                seen.add(word)
+                words.append(word)
+                phoneme_lists.append(phonemes)
+        
+        self.ranker = CandidateRanker(words, phoneme_lists, self.phoneme_order)
+    
+    def suggest_words(self, k=10):
+        """Rank unused candidate words by score gain against the current distribution."""
+        if self.ranker is None:
+            self.build_ranker()
+        current_dist, _ = self.get_current_phoneme_distribution()
+        gains = self.ranker.target_gain(current_dist, self.target_distribution)
+        self.last_suggestions = self.ranker.top_k(gains, k, exclude=self.selected_words)
+        return self.last_suggestions
+    
+    def display_suggestions(self, k=10):
+        """Display the top-k suggested words."""
+        suggestions = self.suggest_words(k)
+        print(f"\n{Style.BRIGHT}推荐词汇:")
+        if not suggestions:
+            print("  (无可推荐词汇)")
+        for i, (word, gain) in enumerate(suggestions, 1):
+            color = Fore.GREEN if gain > 0 else Fore.YELLOW
+            phonemes = self.get_word_phonemes(word)
+            print(f"  {i:2d}. {word:15s} {color}{gain:+4.0f}{Style.RESET_ALL}  /{' '.join(phonemes)}/")
+    
     def get_status_color(self, current, target):
         """Get color code based on current vs target."""
         if current == target:
@@ -239,7 +280,9 @@ class PhonemeTracker:
             print("3. show          - 显示当前状态")
             print("4. list          - 列出所有选中词汇")
             print("5. clear         - 清空所有词汇")
-            print("6. quit          - 退出程序")
+            print("6. suggest [k]   - 推荐下一个词汇")
+            print("7. pick <编号>    - 添加推荐列表中的词汇")
+            print("8. quit          - 退出程序")
             
             try:
                 command = input(f"\n{Fore.CYAN}请输入命令: {Style.RESET_ALL}").strip()
@@ -265,6 +308,18 @@ class PhonemeTracker:
                 elif cmd == 'show':
                     self.display_phoneme_status()
                 
+                elif cmd == 'suggest':
+                    k = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 10
+                    self.display_suggestions(k)
+                
+                elif cmd == 'pick' and len(parts) > 1 and parts[1].isdigit():
+                    index = int(parts[1]) - 1
+                    if 0 <= index < len(self.last_suggestions):
+                        self.add_word(self.last_suggestions[index][0])
+                        self.display_phoneme_status()
+                    else:
+                        print(f"{Fore.RED}❌ 编号无效: {parts[1]}，请先运行 suggest")
+                
                 elif cmd == 'list':
                     print(f"\n{Style.BRIGHT}当前选中词汇 ({len(self.selected_words)}):")
                     if self.selected_words:
@@ -282,7 +337,7 @@ class PhonemeTracker:
                         self.display_phoneme_status()
                 
                 else:
-                    print(f"{Fore.RED}❌ 无效命令. 请使用 add/remove/show/list/clear/quit")
+                    print(f"{Fore.RED}❌ 无效命令. 请使用 add/remove/show/list/clear/suggest/pick/quit")
             
             except KeyboardInterrupt:
                 print(f"\n{Fore.GREEN}👋 再见!")
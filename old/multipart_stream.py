@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Multipart Stream - 流式 multipart/form-data 解析
+替代 cgi.FieldStorage：请求体按固定大小的块读取，文件部分边读边写入磁盘并计算 SHA-256，
+普通字段保存在内存中（有大小限制）。内存占用只与块大小有关，与上传文件大小无关。
+
+    fields, files = parse_multipart(self.rfile, content_type, content_length, 'uploads', max_size=1 << 30)
+    files['video'].path / .filename / .size / .sha256
+"""
+
+import hashlib
+import os
+import uuid
+
+CHUNK_SIZE = 64 * 1024
+MAX_HEADER_BYTES = 16 * 1024
+MAX_FIELD_BYTES = 1024 * 1024
+
+
+class MultipartError(ValueError):
+    """请求体格式错误"""
+
+
+class UploadTooLarge(MultipartError):
+    """文件或请求体超过大小限制"""
+
+
+class UploadedFile:
+    def __init__(self, name, filename, content_type, path):
+        self.name = name
+        self.filename = filename
+        self.content_type = content_type
+        self.path = path
+        self.size = 0
+        self.sha256 = None
+
+
+def parse_options_header(value):
+    """'form-data; name="video"; filename="a.webm"' -> ('form-data', {'name': 'video', 'filename': 'a.webm'})"""
+    parts = _split_params(value or '')
+    main = parts[0].strip().lower() if parts else ''
+    params = {}
+    for part in parts[1:]:
+        key, _, val = part.partition('=')
+        val = val.strip()
+        if len(val) >= 2 and val[0] == val[-1] == '"':
+            val = val[1:-1].replace('\\"', '"').replace('\\\\', '\\')
+        params[key.strip().lower()] = val
+    return main, params
+
+
+def _split_params(value):
+    """按分号切分，忽略引号中的分号"""
+    parts, current, quoted = [], [], False
+    for i, char in enumerate(value):
+        if char == '"' and (i == 0 or value[i - 1] != '\\'):
+            quoted = not quoted
+        if char == ';' and not quoted:
+            parts.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append(''.join(current))
+    return parts
+
+
+class _BodyReader:
+    """最多读取 content_length 字节"""
+
+    def __init__(self, rfile, content_length, chunk_size):
+        self.rfile = rfile
+        self.remaining = content_length
+        self.chunk_size = chunk_size
+
+    def read(self):
+        if self.remaining <= 0:
+            return b''
+        data = self.rfile.read(min(self.chunk_size, self.remaining))
+        if not data:
+            raise MultipartError('连接中断，请求体不完整')
+        self.remaining -= len(data)
+        return data
+
+    def drain(self):
+        """丢弃剩余的请求体，使连接保持可用"""
+        while self.remaining > 0:
+            if not self.read():
+                break
+
+
+def parse_multipart(rfile, content_type, content_length, upload_dir, max_size=None,
+                    chunk_size=CHUNK_SIZE, max_field_size=MAX_FIELD_BYTES):
+    """
+    解析 multipart/form-data 请求体，返回 (普通字段 {名称: 值}, 文件 {名称: UploadedFile})
+    文件写入 upload_dir 下的临时文件（.part-*），由调用方移动或删除。
+    max_size 限制单个文件大小，超过时删除已写入的部分并抛出 UploadTooLarge。
+    """
+    main, params = parse_options_header(content_type)
+    boundary = params.get('boundary')
+    if main != 'multipart/form-data' or not boundary:
+        raise MultipartError('需要multipart/form-data格式')
+    if content_length is None:
+        raise MultipartError('缺少Content-Length')
+
+    os.makedirs(upload_dir, exist_ok=True)
+    reader = _BodyReader(rfile, content_length, chunk_size)
+    delimiter = b'--' + boundary.encode('latin-1')
+    separator = b'\r\n' + delimiter
+    fields, files = {}, {}
+    buffer = bytearray()
+
+    def fill(minimum):
+        """读取直到缓冲区至少有 minimum 字节；请求体结束时返回 False"""
+        while len(buffer) < minimum:
+            data = reader.read()
+            if not data:
+                return False
+            buffer.extend(data)
+        return True
+
+    try:
+        # 跳过前导内容，直到第一个分隔符
+        while True:
+            i = buffer.find(delimiter)
+            if i >= 0:
+                del buffer[:i + len(delimiter)]
+                break
+            del buffer[:max(0, len(buffer) - len(delimiter))]
+            if not fill(len(buffer) + 1):
+                raise MultipartError('找不到multipart分隔符')
+
+        while True:
+            # 分隔符后为 "--"（结束）或 CRLF（下一个部分）
+            if not fill(2):
+                raise MultipartError('请求体不完整')
+            if buffer[:2] == b'--':
+                break
+            if buffer[:2] != b'\r\n':
+                raise MultipartError('multipart分隔符格式错误')
+            del buffer[:2]
+
+            # 部分头
+            while True:
+                end = buffer.find(b'\r\n\r\n')
+                if end >= 0:
+                    break
+                if len(buffer) > MAX_HEADER_BYTES or not fill(len(buffer) + 1):
+                    raise MultipartError('multipart头格式错误')
+            headers = {}
+            for line in bytes(buffer[:end]).decode('utf-8', errors='replace').split('\r\n'):
+                key, _, value = line.partition(':')
+                headers[key.strip().lower()] = value.strip()
+            del buffer[:end + 4]
+
+            _, disposition = parse_options_header(headers.get('content-disposition'))
+            name = disposition.get('name', '')
+            filename = disposition.get('filename')
+
+            upload = None
+            if filename is not None:
+                # 同名文件字段会覆盖前一个并留下它的临时文件
+                if name in files:
+                    raise MultipartError(f'重复的文件字段: {name}')
+                upload = UploadedFile(name, filename, headers.get('content-type', 'application/octet-stream'),
+                                      os.path.join(upload_dir, f'.part-{uuid.uuid4().hex}'))
+                files[name] = upload
+                sink = open(upload.path, 'wb')
+                digest = hashlib.sha256()
+            else:
+                value = bytearray()
+
+            # 部分内容：写出缓冲区中不可能属于分隔符的部分，保留末尾
+            try:
+                while True:
+                    i = buffer.find(separator)
+                    if i >= 0:
+                        data, rest = buffer[:i], buffer[i + len(separator):]
+                    else:
+                        keep = len(separator) - 1
+                        data, rest = buffer[:max(0, len(buffer) - keep)], buffer[max(0, len(buffer) - keep):]
+
+                    if data:
+                        if upload is not None:
+                            upload.size += len(data)
+                            if max_size is not None and upload.size > max_size:
+                                raise UploadTooLarge(f'文件超过大小限制 ({max_size} 字节)')
+                            sink.write(data)
+                            digest.update(data)
+                        else:
+                            if len(value) + len(data) > max_field_size:
+                                raise UploadTooLarge(f'字段 {name} 超过大小限制')
+                            value.extend(data)
+                    buffer = bytearray(rest)
+
+                    if i >= 0:
+                        break
+                    if not fill(len(buffer) + 1):
+                        raise MultipartError('请求体不完整')
+            finally:
+                if upload is not None:
+                    sink.close()
+
+            if upload is not None:
+                upload.sha256 = digest.hexdigest()
+            else:
+                fields[name] = value.decode('utf-8', errors='replace')
+
+        reader.drain()
+        return fields, files
+
+    except Exception:
+        for upload in files.values():
+            if os.path.exists(upload.path):
+                os.remove(upload.path)
+        raise
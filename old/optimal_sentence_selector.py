@@ -5,6 +5,7 @@ import json
 import os
 import re
 from collections import defaultdict, Counter
+from word_tokenizer import clean_sentence
 import nltk
 try:
     from nltk.corpus import cmudict
@@ -53,10 +54,7 @@ class OptimalSentenceSelector:
     
     def clean_sentence(self, sentence):
         """清理句子"""
-        sentence = sentence.lower()
-        sentence = re.sub(r'[^\w\s]', '', sentence)
-        sentence = re.sub(r'\s+', ' ', sentence).strip()
-        return sentence
+        return clean_sentence(sentence)
     
     def extract_words_from_sentence(self, sentence):
         """从句子中提取词汇"""
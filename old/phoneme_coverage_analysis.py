@@ -15,39 +15,54 @@ except LookupError:
     print("Downloading CMUdict...")
     nltk.download('cmudict')
 
-def load_word_frequencies(filename):
-    """Load words and their frequencies from the spoken/written file."""
+def open_word_table(filename):
+    """Load the precomputed word table for filename (None when numpy is not available)."""
+    try:
+        from word_table import load_word_table
+    except ImportError:
+        return None
+    return load_word_table(freq_file=filename)
+
+def load_word_frequencies(filename, table=None):
+    """Load words and their frequencies from the spoken/written file (or its word table)."""
+    if table is not None:
+        order = table.by_frequency()
+        word_freq = [(str(table.words[i]), int(table.freq_total[i])) for i in order
+                     if table.freq_total[i] > 0]
+        print(f"Loaded {len(word_freq)} words from word table")
+        return word_freq
+    
     print(f"Loading word frequencies from {filename}...")
-    word_freq = []
+    # Same parsing as word_table.parse_frequency_file: PoS rows of one word are merged
+    freqs = {}
     
     with open(filename, 'r', encoding='utf-8') as f:
-        for line_num, line in enumerate(f, 1):
-            if line_num <= 2:  # Skip header lines
-                continue
-                
-            line = line.strip()
-            if not line:
+        for line in f:
+            # Format: <tab>Word<tab>PoS<tab>FrSp<tab>+/-<tab>LL<tab>FrWr
+            parts = line.rstrip('\n').split('\t')
+            if len(parts) < 7:
                 continue
-                
-            parts = line.split('\t')
-            if len(parts) >= 6:  # Format: Word, PoS, FrSp, +/-, LL, FrWr
-                word = parts[1].lower().strip()  # Word is in column 1
-                try:
-                    spoken_freq = int(parts[2])  # FrSp is in column 2
-                    written_freq = int(parts[5])  # FrWr is in column 5
-                    total_freq = spoken_freq + written_freq
-                    if word and total_freq > 0:
-                        word_freq.append((word, total_freq))
-                except (ValueError, IndexError):
-                    continue
+            word = parts[1].strip().lower()
+            try:
+                total_freq = int(parts[3]) + int(parts[6])
+            except ValueError:
+                continue  # header
+            if word:
+                freqs[word] = freqs.get(word, 0) + total_freq
     
     # Sort by frequency (descending)
-    word_freq.sort(key=lambda x: x[1], reverse=True)
+    word_freq = sorted(((word, freq) for word, freq in freqs.items() if freq > 0),
+                       key=lambda x: x[1], reverse=True)
     print(f"Loaded {len(word_freq)} words with frequencies")
     return word_freq
 
-def get_word_phonemes(word):
+def get_word_phonemes(word, table=None):
     """Get CMUdict phonemes for a word, removing stress markers."""
+    if table is not None:
+        i = table.index(word)
+        if i is not None:
+            return table.phoneme_set_at(i) if table.in_cmu[i] else set()
+    
     cmu_dict = cmudict.dict()
     
     if word in cmu_dict:
@@ -72,7 +87,7 @@ def get_all_cmu_phonemes():
     }
     return phonemes
 
-def find_minimal_phoneme_coverage(word_freq_list):
+def find_minimal_phoneme_coverage(word_freq_list, table=None):
     """Find the minimal k words that cover all 39 CMUdict phonemes."""
     print("Finding minimal phoneme coverage...")
     
@@ -85,7 +100,7 @@ def find_minimal_phoneme_coverage(word_freq_list):
     print(f"Phonemes to cover: {sorted(target_phonemes)}")
     
     for i, (word, freq) in enumerate(word_freq_list):
-        word_phonemes = get_word_phonemes(word)
+        word_phonemes = get_word_phonemes(word, table)
         
         if word_phonemes:  # Only consider words with known pronunciations
             # Check if this word adds new phonemes
@@ -195,11 +210,13 @@ def main():
     print("🔍 MINIMAL PHONEME COVERAGE ANALYSIS")
     print("="*50)
     
-    # Load word frequencies
-    word_freq_list = load_word_frequencies('materials/2_2_spokenvwritten.txt')
+    # Load word frequencies (from the precomputed word table when available)
+    freq_file = 'materials/2_2_spokenvwritten.txt'
+    table = open_word_table(freq_file)
+    word_freq_list = load_word_frequencies(freq_file, table)
     
     # Find minimal coverage
-    selected_words, word_phoneme_map, covered_phonemes = find_minimal_phoneme_coverage(word_freq_list)
+    selected_words, word_phoneme_map, covered_phonemes = find_minimal_phoneme_coverage(word_freq_list, table)
     
     # Remove duplicates while preserving order
     unique_words = []
@@ -9,6 +9,7 @@ import re
 from collections import Counter
 import matplotlib.pyplot as plt
 import numpy as np
+from token_corpus import load_corpus
 
 def install_package(package):
     """Install a package using pip"""
@@ -53,12 +54,6 @@ def get_cmu_phonemes(word, cmu_dict):
         return [p.rstrip('012') for p in phonemes]
     return []
 
-def tokenize_sentence(sentence):
-    """Tokenize a sentence into words, preserving contractions."""
-    # Split on whitespace and punctuation, but keep contractions together
-    tokens = re.findall(r"\b\w+(?:'\w+)?\b|\S", sentence)
-    return tokens
-
 def process_sentences(filename):
     """Process all sentences and extract phonemes."""
     print(f"Loading CMUdict...")
@@ -66,31 +61,24 @@ def process_sentences(filename):
     
     print(f"Processing sentences from {filename}...")
     
-    phoneme_counter = Counter()
-    total_sentences = 0
-    processed_sentences = 0
+    # Token-ID corpus: tokenized once, then counted per vocabulary entry.
+    # Surface tokens (lowercased, punctuation stripped) keep contractions and
+    # possessives as spoken, so "don't" and "dog's" are looked up as written.
+    corpus = load_corpus(filename, mode='surface')
+    word_counts = corpus.word_counts()
+    vocab_phonemes = [get_cmu_phonemes(word, cmu_dict) for word in corpus.vocab]
     
-    with open(filename, 'r', encoding='utf-8') as f:
-        for line_num, line in enumerate(f, 1):
-            if line_num % 10000 == 0:
-                print(f"Processed {line_num} lines...")
-            
-            sentence = line.strip()
-            if not sentence:
-                continue
-                
-            total_sentences += 1
-            words = tokenize_sentence(sentence)
-            sentence_phonemes = []
-            
-            for word in words:
-                phonemes = get_cmu_phonemes(word, cmu_dict)
-                sentence_phonemes.extend(phonemes)
-            
-            if sentence_phonemes:
-                processed_sentences += 1
-                for phoneme in sentence_phonemes:
-                    phoneme_counter[phoneme] += 1
+    phoneme_counter = Counter()
+    for token_id in np.flatnonzero(word_counts):
+        for phoneme in vocab_phonemes[token_id]:
+            phoneme_counter[phoneme] += int(word_counts[token_id])
+    
+    # A sentence counts as processed when any of its tokens has phonemes
+    has_phonemes = np.array([bool(p) for p in vocab_phonemes], dtype=bool)
+    phoneme_tokens = np.bincount(corpus.sentence_index(), weights=has_phonemes[corpus.tokens],
+                                 minlength=len(corpus))
+    total_sentences = len(corpus)
+    processed_sentences = int(np.count_nonzero(phoneme_tokens))
     
     print(f"Total sentences: {total_sentences}")
     print(f"Sentences with phonemes: {processed_sentences}")
@@ -18,12 +18,29 @@ except LookupError:
 
 from nltk.corpus import cmudict
 
+# 打分规则：恰好达标加分，缺少和超出按实例数扣分
+HIT_BONUS = 10
+MISSING_PENALTY = 2
+EXCESS_PENALTY = 3
+
 class PhonemeTracker:
     def __init__(self):
         self.cmu_dict = cmudict.dict()
         self.selected_words = []
         self.save_file = "selected_words.json"
         
+        # 增量维护的状态：每次增删词汇只更新该词汇包含的音素
+        self.word_phonemes_cache = {}
+        self.phoneme_counts = Counter()
+        self.hit_count = 0        # 恰好达标的音素数
+        self.missing_total = 0    # 低于目标的实例总数
+        self.excess_total = 0     # 超出目标的实例总数
+        
+        # 候选词汇排序（首次使用 suggest 时构建）
+        self.candidate_file = "final_word_list.txt"
+        self.ranker = None
+        self.last_suggestions = []
+        
         # 标准39个英语音素 (ARPAbet格式)
         self.standard_phonemes = {
             # 元音 (15个)
@@ -86,6 +103,126 @@ class PhonemeTracker:
         
         return None
     
+    def get_cached_phonemes(self, word):
+        """带缓存的 get_word_phonemes，避免重复查询 CMU 词典"""
+        if word not in self.word_phonemes_cache:
+            self.word_phonemes_cache[word] = self.get_word_phonemes(word)
+        return self.word_phonemes_cache[word]
+    
+    def phoneme_deviation(self, phoneme, count):
+        """单个音素对 (达标, 缺少, 超出) 的贡献"""
+        target = self.target_distribution.get(phoneme, 0)
+        if count == target:
+            return 1, 0, 0
+        if count < target:
+            return 0, target - count, 0
+        return 0, 0, count - target
+    
+    def score_delta(self, phonemes, sign):
+        """计算增加 (sign=1) 或移除 (sign=-1) 一组音素后 (达标, 缺少, 超出) 的变化量"""
+        d_hit = d_missing = d_excess = 0
+        for phoneme, n in Counter(phonemes).items():
+            count = self.phoneme_counts[phoneme]
+            old_hit, old_missing, old_excess = self.phoneme_deviation(phoneme, count)
+            new_hit, new_missing, new_excess = self.phoneme_deviation(phoneme, count + sign * n)
+            d_hit += new_hit - old_hit
+            d_missing += new_missing - old_missing
+            d_excess += new_excess - old_excess
+        return d_hit, d_missing, d_excess
+    
+    def apply_word(self, word, sign):
+        """把一个词汇的音素计入 (sign=1) 或移出 (sign=-1) 当前统计"""
+        phonemes = self.get_cached_phonemes(word)
+        if not phonemes:
+            return
+        d_hit, d_missing, d_excess = self.score_delta(phonemes, sign)
+        self.hit_count += d_hit
+        self.missing_total += d_missing
+        self.excess_total += d_excess
+        for phoneme in phonemes:
+            self.phoneme_counts[phoneme] += sign
+            if self.phoneme_counts[phoneme] == 0:
+                del self.phoneme_counts[phoneme]
+    
+    def rebuild_counts(self):
+        """根据 selected_words 重新计算全部统计（加载或整体替换词汇时使用）"""
+        self.phoneme_counts = Counter()
+        self.hit_count = 0
+        self.missing_total = sum(self.target_distribution.values())
+        self.excess_total = 0
+        for phoneme, target in self.target_distribution.items():
+            if target == 0:
+                self.hit_count += 1
+        for word in self.selected_words:
+            self.apply_word(word, 1)
+    
+    def score_from_totals(self, hit_count, missing_total, excess_total):
+        return HIT_BONUS * hit_count - MISSING_PENALTY * missing_total - EXCESS_PENALTY * excess_total
+    
+    def current_score(self):
+        """当前选择的得分（越高越好）"""
+        return self.score_from_totals(self.hit_count, self.missing_total, self.excess_total)
+    
+    def score_if_added(self, word):
+        """不修改状态，返回添加该词汇后的得分；无有效音素时返回 None"""
+        phonemes = self.get_cached_phonemes(word)
+        if not phonemes:
+            return None
+        d_hit, d_missing, d_excess = self.score_delta(phonemes, 1)
+        return self.score_from_totals(self.hit_count + d_hit, self.missing_total + d_missing,
+                                      self.excess_total + d_excess)
+    
+    def score_if_removed(self, word):
+        """不修改状态，返回移除该词汇后的得分"""
+        phonemes = self.get_cached_phonemes(word)
+        if word not in self.selected_words or not phonemes:
+            return self.current_score()
+        d_hit, d_missing, d_excess = self.score_delta(phonemes, -1)
+        return self.score_from_totals(self.hit_count + d_hit, self.missing_total + d_missing,
+                                      self.excess_total + d_excess)
+    
+    def replace_words(self, words):
+        """整体替换选中词汇并保存"""
+        self.selected_words = list(words)
+        self.rebuild_counts()
+        self.save_selected_words()
+    
+    def build_ranker(self):
+        """从候选文件预计算 (候选词汇 x 39音素) 计数矩阵"""
+        from candidate_ranker import CandidateRanker, load_candidate_lines
+        
+        words = []
+        phoneme_lists = []
+        seen = set()
+        for word in load_candidate_lines(self.candidate_file):
+            phonemes = self.get_cached_phonemes(word)
+            if phonemes and word not in seen:
+                seen.add(word)
+                words.append(word)
+                phoneme_lists.append(phonemes)
+        
+        self.ranker = CandidateRanker(words, phoneme_lists, self.phoneme_order)
+        print(f"📚 候选词汇矩阵: {len(words)} 个词汇")
+    
+    def suggest_words(self, k=10):
+        """返回加入后得分提升最大的前 k 个未选词汇 [(词汇, 得分变化), ...]"""
+        if self.ranker is None:
+            self.build_ranker()
+        gains = self.ranker.target_gain(self.phoneme_counts, self.target_distribution)
+        self.last_suggestions = self.ranker.top_k(gains, k, exclude=self.selected_words)
+        return self.last_suggestions
+    
+    def display_suggestions(self, k=10):
+        """显示推荐词汇"""
+        suggestions = self.suggest_words(k)
+        print(f"\n💡 推荐词汇 (当前得分: {self.current_score()}):")
+        if not suggestions:
+            print("   (无可推荐词汇)")
+        for i, (word, gain) in enumerate(suggestions, 1):
+            phonemes = self.get_cached_phonemes(word)
+            print(f"   {i:2d}. {word:15s} {gain:+4.0f}  /{' '.join(phonemes)}/")
+        print("   💡 输入 'pick <编号>' 添加推荐词汇")
+    
     def save_selected_words(self):
         """保存选中的词汇到文件"""
         with open(self.save_file, 'w', encoding='utf-8') as f:
@@ -103,6 +240,7 @@ class PhonemeTracker:
                 self.selected_words = []
         else:
             self.selected_words = []
+        self.rebuild_counts()
     
     def add_word(self, word):
         """添加词汇到选中列表"""
@@ -114,9 +252,10 @@ class PhonemeTracker:
             print(f"⚠️  词汇已存在: {word}")
             return False
         
-        phonemes = self.get_word_phonemes(word)
+        phonemes = self.get_cached_phonemes(word)
         if phonemes:
             self.selected_words.append(word)
+            self.apply_word(word, 1)
             self.save_selected_words()
             print(f"✅ 添加成功: {word} -> /{' '.join(phonemes)}/")
             return True
@@ -128,6 +267,7 @@ class PhonemeTracker:
         """从选中列表移除词汇"""
         if word in self.selected_words:
             self.selected_words.remove(word)
+            self.apply_word(word, -1)
             self.save_selected_words()
             print(f"🗑️  移除成功: {word}")
             return True
@@ -136,18 +276,15 @@ class PhonemeTracker:
             return False
     
     def get_current_phoneme_distribution(self):
-        """计算当前选中词汇的音素分布"""
-        phoneme_counter = Counter()
+        """返回当前选中词汇的音素分布（由增量统计直接给出）"""
         word_phonemes_map = {}
         
         for word in self.selected_words:
-            phonemes = self.get_word_phonemes(word)
+            phonemes = self.get_cached_phonemes(word)
             if phonemes:
                 word_phonemes_map[word] = phonemes
-                for phoneme in phonemes:
-                    phoneme_counter[phoneme] += 1
         
-        return phoneme_counter, word_phonemes_map
+        return Counter(self.phoneme_counts), word_phonemes_map
     
     def display_status(self):
         """显示当前音素分布状态"""
@@ -246,6 +383,8 @@ class PhonemeTracker:
         print("   - 'show' 显示状态")
         print("   - 'list' 列出所有词汇")
         print("   - 'clear' 清空所有词汇")
+        print("   - 'suggest [数量]' 推荐下一个词汇")
+        print("   - 'pick <编号>' 添加推荐列表中的词汇")
         print("   - 'quit' 退出程序")
         
         # 显示初始状态
@@ -272,6 +411,18 @@ class PhonemeTracker:
                 elif cmd == 'show':
                     self.display_status()
                 
+                elif cmd == 'suggest':
+                    k = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 10
+                    self.display_suggestions(k)
+                
+                elif cmd == 'pick' and len(parts) > 1 and parts[1].isdigit():
+                    index = int(parts[1]) - 1
+                    if 0 <= index < len(self.last_suggestions):
+                        self.add_word(self.last_suggestions[index][0])
+                        self.display_status()
+                    else:
+                        print(f"❌ 编号无效: {parts[1]}，请先运行 suggest")
+                
                 elif cmd == 'list':
                     print(f"\n📝 当前选中词汇 ({len(self.selected_words)}):")
                     if self.selected_words:
@@ -283,8 +434,7 @@ class PhonemeTracker:
                 elif cmd == 'clear':
                     confirm = input("⚠️  确认清空所有词汇? (y/N): ")
                     if confirm.lower() in ['y', 'yes']:
-                        self.selected_words = []
-                        self.save_selected_words()
+                        self.replace_words([])
                         print("✅ 已清空所有词汇")
                         self.display_status()
                 
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Pipeline - 流式处理框架
+语料整理的各个步骤（过滤台词、分句、去重、按词数过滤、合并、选择）写成可组合的生成器阶段，
+一次流式运行完成，不再需要中间文件，内存占用与语料大小无关。
+
+    Stage('split', split_stage)                        生成器阶段：func(items) -> 可迭代对象
+    MapStage('filter', keep_if_valid, workers=4)       逐项阶段：func(item, **params) -> 输出列表（空列表即过滤掉），
+                                                       workers > 0 时分块在进程池上运行
+    pipeline = Pipeline('curate', [stage, ...])
+    for item in pipeline.run(source): ...
+    pipeline.write_manifest('output.manifest.json')
+
+相邻阶段之间可以加有界缓冲（后台线程预取，buffer_size 控制队列长度），
+每次运行生成一个 manifest：输入文件、参数、每个阶段的输入/输出数量和耗时（有缓冲线程时为近似值）。
+"""
+
+import json
+import os
+import platform
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+
+_DONE = object()
+
+
+def buffered(items, size):
+    """后台线程预取，最多缓冲 size 项"""
+    buffer = queue.Queue(maxsize=size)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put((_DONE, e))
+            return
+        put((_DONE, None))
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            item = buffer.get()
+            if type(item) is tuple and len(item) == 2 and item[0] is _DONE:
+                if item[1] is not None:
+                    raise item[1]
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+def chunked(items, size):
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Stage:
+    """生成器阶段：func(items, **params) 返回输出的可迭代对象"""
+
+    def __init__(self, name, func, buffer_size=0, **params):
+        self.name = name
+        self.func = func
+        self.buffer_size = buffer_size
+        self.params = params
+
+    def __call__(self, items):
+        return self.func(items, **self.params)
+
+    def describe(self):
+        return {
+            'name': self.name,
+            'type': type(self).__name__,
+            'func': getattr(self.func, '__name__', repr(self.func)),
+            'params': {k: repr(v) if not isinstance(v, (int, float, str, bool, type(None))) else v
+                       for k, v in self.params.items()},
+        }
+
+
+_worker_state = {}
+
+
+def _init_worker(func, params, initializer, initargs):
+    _worker_state['func'] = func
+    _worker_state['params'] = params
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def _run_chunk(chunk):
+    func, params = _worker_state['func'], _worker_state['params']
+    return [output for item in chunk for output in func(item, **params)]
+
+
+class MapStage(Stage):
+    """
+    逐项阶段：func(item, **params) 返回该项的输出列表（过滤时返回空列表，分句等一对多时返回多项）
+    workers > 0 时按 chunk_size 分块提交到进程池，最多 max_pending 个块同时在途，输出保持输入顺序。
+    func 和 initializer 必须是模块级函数；initializer(*initargs) 在每个工作进程中运行一次。
+    """
+
+    def __init__(self, name, func, workers=0, chunk_size=1000, max_pending=None,
+                 initializer=None, initargs=(), buffer_size=0, **params):
+        super().__init__(name, func, buffer_size, **params)
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending or max(2, 2 * workers)
+        self.initializer = initializer
+        self.initargs = initargs
+
+    def __call__(self, items):
+        if not self.workers:
+            if self.initializer is not None:
+                self.initializer(*self.initargs)
+            for item in items:
+                yield from self.func(item, **self.params)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self.func, self.params, self.initializer, self.initargs)) as pool:
+            pending = []
+            for chunk in chunked(items, self.chunk_size):
+                pending.append(pool.submit(_run_chunk, chunk))
+                if len(pending) >= self.max_pending:
+                    yield from pending.pop(0).result()
+            for future in pending:
+                yield from future.result()
+
+    def describe(self):
+        info = super().describe()
+        info.update(workers=self.workers, chunk_size=self.chunk_size)
+        return info
+
+
+class _Counter:
+    """统计经过的项数和在 next() 中花费的累计时间"""
+
+    def __init__(self, items):
+        self.items = iter(items)
+        self.count = 0
+        self.elapsed = 0.0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            item = next(self.items)
+        finally:
+            self.elapsed += time.perf_counter() - start
+        self.count += 1
+        return item
+
+
+def file_info(path):
+    """manifest 中记录的输入/输出文件信息"""
+    if not os.path.exists(path):
+        return {'path': path, 'exists': False}
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': stat.st_size,
+            'mtime': datetime.fromtimestamp(stat.st_mtime).isoformat()}
+
+
+class Pipeline:
+    def __init__(self, name, stages, params=None):
+        self.name = name
+        self.stages = list(stages)
+        self.params = params or {}
+        self.manifest = None
+
+    def run(self, source, inputs=()):
+        """流式运行所有阶段，逐项输出结果；迭代结束后 self.manifest 完整"""
+        started = datetime.now()
+        counters = [_Counter(source)]
+        for stage in self.stages:
+            items = stage(counters[-1])
+            if stage.buffer_size:
+                items = buffered(items, stage.buffer_size)
+            counters.append(_Counter(items))
+
+        self.manifest = {
+            'pipeline': self.name,
+            'started': started.isoformat(),
+            'finished': None,
+            'status': 'running',
+            'python': platform.python_version(),
+            'params': self.params,
+            'inputs': [file_info(path) for path in inputs],
+            'outputs': [],
+            'stages': [],
+        }
+
+        try:
+            yield from counters[-1]
+            self.manifest['status'] = 'completed'
+        except GeneratorExit:
+            self.manifest['status'] = 'stopped'
+            raise
+        except BaseException as e:
+            self.manifest['status'] = f'failed: {type(e).__name__}: {e}'
+            raise
+        finally:
+            self.manifest['finished'] = datetime.now().isoformat()
+            # 每个阶段的耗时 = 其输出的累计 next() 时间减去上游的累计时间
+            for i, stage in enumerate(self.stages):
+                info = stage.describe()
+                info.update(items_in=counters[i].count, items_out=counters[i + 1].count,
+                            seconds=round(max(0.0, counters[i + 1].elapsed - counters[i].elapsed), 3))
+                self.manifest['stages'].append(info)
+            self.manifest['stages'].insert(0, {'name': 'source', 'items_out': counters[0].count,
+                                               'seconds': round(counters[0].elapsed, 3)})
+
+    def run_to_file(self, source, output_file, format_item=str, inputs=(), header=None):
+        """
+        运行并逐行写出结果，manifest 保存为 <output_file>.manifest.json
+        先写到 <output_file>.tmp，成功后再替换 output_file；运行失败时原文件保持不变
+        """
+        count = 0
+        temp_file = output_file + '.tmp'
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                if header:
+                    f.write(header)
+                for item in self.run(source, inputs):
+                    f.write(format_item(item) + '\n')
+                    count += 1
+        except BaseException:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            raise
+        os.replace(temp_file, output_file)
+        self.manifest['outputs'].append(dict(file_info(output_file), items=count))
+        self.write_manifest(output_file + '.manifest.json')
+        return count
+
+    def write_manifest(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+
+    def summary(self):
+        """打印每个阶段的数量和耗时"""
+        print(f"\n📋 Pipeline '{self.name}' ({self.manifest['status']})")
+        for info in self.manifest['stages']:
+            items_in = info.get('items_in', '')
+            print(f"   {info['name']:15s} {str(items_in):>10s} -> {info['items_out']:>10d}  {info['seconds']:8.2f}s")
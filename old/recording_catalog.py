@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Recording Catalog - 上传视频的 SQLite 目录
+上传完成时写入一行（表单字段 sentence / index / timestamp 以及附带的元数据），
+/videos 直接查询带索引的表，不再每次请求都扫描 uploads 目录：
+
+    catalog = RecordingCatalog('uploads/catalog.db')
+    catalog.add('a.webm', size, sha256, {'sentence': ..., 'index': '3'}, metadata)
+    total, videos = catalog.list(limit=100, offset=0, sentence_set='set_a', participant='p01')
+
+每次写入递增 generation，用作 /videos 的 ETag。
+视频内容按 SHA-256 保存在 content_store 中，这里的 sha256 列即文件名到内容的对应关系；
+旧版直接保存在 uploads/<文件名> 的视频仍按文件名读取（补录时 sha256 为空）。
+
+录制工具为每个视频生成的元数据 JSON（buildRecordingMetadata：质量档位、帧率、音量 RMS/峰值/削波、
+媒体设置、句子）在上传时展开写入 recording_metadata 表，质检直接用聚合查询：
+
+    catalog.add_metadata('a.webm', metadata)
+    catalog.clipping_by_session()      每个会话的削波率分布
+    catalog.clips_by_sentence()        每个句子序号的视频数、重录数、音量警告数
+
+用法:
+    python recording_catalog.py ingest 目录或JSON文件 [...] [--db uploads/catalog.db]
+    python recording_catalog.py stats [--db uploads/catalog.db]
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+
+VIDEO_EXTENSIONS = ('.mp4', '.webm')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS recordings (
+    filename       TEXT PRIMARY KEY,
+    size           INTEGER NOT NULL,
+    sha256         TEXT,
+    sentence       TEXT,
+    sentence_index INTEGER,
+    sentence_set   TEXT,
+    participant    TEXT,
+    timestamp      TEXT,
+    created        TEXT NOT NULL,
+    modified       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS recordings_created ON recordings (created);
+CREATE INDEX IF NOT EXISTS recordings_set ON recordings (sentence_set, created);
+CREATE INDEX IF NOT EXISTS recordings_participant ON recordings (participant, created);
+CREATE INDEX IF NOT EXISTS recordings_index ON recordings (sentence_index, created);
+CREATE INDEX IF NOT EXISTS recordings_sha256 ON recordings (sha256);
+CREATE TABLE IF NOT EXISTS recording_metadata (
+    filename         TEXT PRIMARY KEY,
+    session          TEXT,
+    participant      TEXT,
+    sentence_set     TEXT,
+    sentence_index   INTEGER,
+    sentence         TEXT,
+    phase            TEXT,
+    position         INTEGER,
+    redo             INTEGER,
+    app_version      TEXT,
+    mime_type        TEXT,
+    quality_label    TEXT,
+    video_bps        INTEGER,
+    fps              REAL,
+    audio_mode       TEXT,
+    width            INTEGER,
+    height           INTEGER,
+    actual_fps       REAL,
+    sample_rate      INTEGER,
+    rms              REAL,
+    peak             REAL,
+    clipping_rate    REAL,
+    clipping_samples INTEGER,
+    sample_count     INTEGER,
+    clipping_threshold REAL,
+    audio_warning    TEXT,
+    requires_retry   INTEGER,
+    started_at       TEXT,
+    created_at       TEXT,
+    user_agent       TEXT,
+    raw              TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS metadata_session ON recording_metadata (session);
+CREATE INDEX IF NOT EXISTS metadata_sentence ON recording_metadata (sentence_set, sentence_index);
+CREATE TABLE IF NOT EXISTS catalog_state (
+    key   TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO catalog_state VALUES ('generation', 0);
+'''
+
+COLUMNS = ('filename', 'size', 'sha256', 'sentence', 'sentence_index', 'sentence_set',
+           'participant', 'timestamp', 'created', 'modified')
+
+FILTERS = ('sentence_set', 'participant', 'sentence_index')
+
+
+# 削波率分布的区间上界（最后一个区间为 >= 最后一个值）
+CLIPPING_BUCKETS = (0.0, 0.0001, 0.001, 0.01)
+DEFAULT_CLIPPING_THRESHOLD = 0.001
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _get(obj, *keys):
+    """按路径取嵌套字段，中途缺失时返回 None"""
+    for key in keys:
+        if not isinstance(obj, dict):
+            return None
+        obj = obj.get(key)
+    return obj
+
+
+def metadata_row(filename, metadata, fields=None):
+    """元数据 JSON -> recording_metadata 的一行
+    会话依次取 session / sessionId / participant / sentenceSet"""
+    fields = fields or {}
+    audio = metadata.get('audioQuality') or {}
+    media = metadata.get('mediaAtSave') or metadata.get('mediaAtStart') or {}
+    participant = fields.get('participant') or metadata.get('participant')
+    sentence_set = fields.get('sentence_set') or metadata.get('sentenceSet')
+    session = (fields.get('session') or metadata.get('session') or metadata.get('sessionId')
+               or participant or sentence_set)
+    return {
+        'filename': filename,
+        'session': session,
+        'participant': participant,
+        'sentence_set': sentence_set,
+        'sentence_index': _to_int(metadata.get('sentenceIndex', fields.get('index'))),
+        'sentence': metadata.get('sentence') or fields.get('sentence'),
+        'phase': metadata.get('phase'),
+        'position': _to_int(metadata.get('position')),
+        'redo': int(bool(metadata.get('redo'))),
+        'app_version': metadata.get('appVersion'),
+        'mime_type': metadata.get('mimeType'),
+        'quality_label': _get(metadata, 'quality', 'label'),
+        'video_bps': _to_int(_get(metadata, 'quality', 'videoBitsPerSecond')),
+        'fps': _to_float(_get(metadata, 'frameRate', 'fps')),
+        'audio_mode': _get(metadata, 'audioMode', 'mode'),
+        'width': _to_int(_get(media, 'video', 'settings', 'width')),
+        'height': _to_int(_get(media, 'video', 'settings', 'height')),
+        'actual_fps': _to_float(_get(media, 'video', 'settings', 'frameRate')),
+        'sample_rate': _to_int(_get(media, 'audio', 'settings', 'sampleRate')),
+        'rms': _to_float(audio.get('rms')),
+        'peak': _to_float(audio.get('peak')),
+        'clipping_rate': _to_float(audio.get('clippingRate')),
+        'clipping_samples': _to_int(audio.get('clippingSamples')),
+        'sample_count': _to_int(audio.get('sampleCount')),
+        'clipping_threshold': _to_float(_get(audio, 'thresholds', 'clippingRate')),
+        'audio_warning': metadata.get('audioQualityWarning'),
+        'requires_retry': int(bool(metadata.get('requiresRetry'))),
+        'started_at': metadata.get('startedAt'),
+        'created_at': metadata.get('createdAt'),
+        'user_agent': _get(metadata, 'browser', 'userAgent'),
+        'raw': json.dumps(metadata, ensure_ascii=False),
+    }
+
+
+class RecordingCatalog:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        # 单个连接由锁保护，供线程池中的所有请求共用
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def _bump(self):
+        self.conn.execute("UPDATE catalog_state SET value = value + 1 WHERE key = 'generation'")
+
+    def generation(self):
+        with self.lock:
+            return self.conn.execute("SELECT value FROM catalog_state WHERE key = 'generation'").fetchone()[0]
+
+    def add(self, filename, size, sha256, fields, metadata=None):
+        """记录一次上传；同名文件覆盖原记录"""
+        metadata = metadata or {}
+        now = datetime.now().isoformat()
+        row = {
+            'filename': filename,
+            'size': size,
+            'sha256': sha256,
+            'sentence': fields.get('sentence') or metadata.get('sentence'),
+            'sentence_index': _to_int(fields.get('index', metadata.get('sentenceIndex'))),
+            'sentence_set': fields.get('sentence_set') or metadata.get('sentenceSet'),
+            'participant': fields.get('participant') or metadata.get('participant'),
+            'timestamp': fields.get('timestamp') or metadata.get('createdAt') or now,
+            'created': now,
+            'modified': now,
+        }
+        with self.lock, self.conn:
+            self.conn.execute(
+                f"INSERT INTO recordings ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))}) "
+                "ON CONFLICT(filename) DO UPDATE SET "
+                + ', '.join(f'{column} = excluded.{column}' for column in COLUMNS if column not in ('filename', 'created')),
+                [row[column] for column in COLUMNS])
+            self._bump()
+        return row
+
+    def remove(self, filename):
+        with self.lock, self.conn:
+            if self.conn.execute('DELETE FROM recordings WHERE filename = ?', (filename,)).rowcount:
+                self._bump()
+
+    def get(self, filename):
+        with self.lock:
+            row = self.conn.execute('SELECT * FROM recordings WHERE filename = ?', (filename,)).fetchone()
+        return dict(row) if row else None
+
+    def add_metadata(self, filename, metadata, fields=None):
+        """写入元数据；对应的视频已登记时补全其句子集、参与者和序号"""
+        row = metadata_row(filename, metadata, fields)
+        columns = list(row)
+        with self.lock, self.conn:
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO recording_metadata ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})", [row[column] for column in columns])
+            if self.conn.execute(
+                    'UPDATE recordings SET sentence_set = COALESCE(sentence_set, ?), '
+                    'participant = COALESCE(participant, ?), sentence_index = COALESCE(sentence_index, ?), '
+                    'sentence = COALESCE(sentence, ?) WHERE filename = ?',
+                    (row['sentence_set'], row['participant'], row['sentence_index'],
+                     row['sentence'], filename)).rowcount:
+                self._bump()
+        return row
+
+    def get_metadata(self, filename):
+        with self.lock:
+            row = self.conn.execute('SELECT raw FROM recording_metadata WHERE filename = ?', (filename,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _query(self, sql, params=()):
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(sql, params).fetchall()]
+
+    def clipping_by_session(self):
+        """每个会话：视频数、平均/最大削波率、超过阈值的视频数，以及削波率分布"""
+        bounds = CLIPPING_BUCKETS
+        buckets = [f'SUM(clipping_rate <= {bounds[0]}) AS "<={bounds[0]}"']
+        buckets += [f'SUM(clipping_rate > {low} AND clipping_rate <= {high}) AS "<={high}"'
+                    for low, high in zip(bounds, bounds[1:])]
+        buckets.append(f'SUM(clipping_rate > {bounds[-1]}) AS ">{bounds[-1]}"')
+        rows = self._query(f'''
+            SELECT session, COUNT(*) AS clips, COUNT(clipping_rate) AS measured,
+                   AVG(clipping_rate) AS mean_clipping_rate, MAX(clipping_rate) AS max_clipping_rate,
+                   SUM(clipping_rate >= COALESCE(clipping_threshold, ?)) AS over_threshold,
+                   {', '.join(buckets)}
+            FROM recording_metadata GROUP BY session ORDER BY session''', (DEFAULT_CLIPPING_THRESHOLD,))
+        for row in rows:
+            row['distribution'] = {key: row.pop(key) or 0 for key in list(row) if key[0] in '<>'}
+        return rows
+
+    def clips_by_sentence(self, sentence_set=None):
+        """每个 (句子集, 句子序号)：视频数、重录数、需要重录（音量警告）数、平均 RMS"""
+        clause, params = ('WHERE sentence_set = ?', (sentence_set,)) if sentence_set is not None else ('', ())
+        return self._query(f'''
+            SELECT sentence_set, sentence_index, MIN(sentence) AS sentence, COUNT(*) AS clips,
+                   SUM(redo) AS redos, SUM(requires_retry) AS warnings, AVG(rms) AS mean_rms
+            FROM recording_metadata {clause}
+            GROUP BY sentence_set, sentence_index ORDER BY sentence_set, sentence_index''', params)
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM recordings').fetchone()[0]
+
+    def digests(self):
+        """所有被文件名引用的内容摘要"""
+        with self.lock:
+            return {row[0] for row in self.conn.execute('SELECT DISTINCT sha256 FROM recordings WHERE sha256 IS NOT NULL')}
+
+    @staticmethod
+    def _where(filters):
+        where, params = [], []
+        for column in FILTERS:
+            value = filters.get(column)
+            if value is not None:
+                where.append(f'{column} = ?')
+                params.append(value)
+        return where, params
+
+    def list(self, limit=100, offset=0, **filters):
+        """按上传时间倒序分页，返回 (符合条件的总数, 当前页)；filters 可用 sentence_set / participant / sentence_index"""
+        where, params = self._where(filters)
+        clause = f"WHERE {' AND '.join(where)}" if where else ''
+        with self.lock:
+            total = self.conn.execute(f'SELECT COUNT(*) FROM recordings {clause}', params).fetchone()[0]
+            rows = self.conn.execute(
+                f'SELECT * FROM recordings {clause} ORDER BY created DESC, filename LIMIT ? OFFSET ?',
+                params + [limit, offset]).fetchall()
+        return total, [dict(row) for row in rows]
+
+    def iter_recordings(self, batch_size=500, **filters):
+        """按文件名顺序逐批读取符合条件的记录（键集分页，不会一次载入全部结果）"""
+        where, params = self._where(filters)
+        last = ''
+        while True:
+            clause = ' AND '.join(where + ['filename > ?'])
+            with self.lock:
+                rows = self.conn.execute(f'SELECT * FROM recordings WHERE {clause} ORDER BY filename LIMIT ?',
+                                         params + [last, batch_size]).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield dict(row)
+            last = rows[-1]['filename']
+
+    def sync_directory(self, uploads_dir, store=None):
+        """
+        启动时同步：补录 uploads 目录中已有但未登记的视频（旧版按文件名保存的文件，sha256 为空），
+        删除 uploads/<文件名> 和内容存储中的对象都已不存在的记录
+        """
+        on_disk = {}
+        if os.path.exists(uploads_dir):
+            for filename in os.listdir(uploads_dir):
+                if filename.endswith(VIDEO_EXTENSIONS):
+                    on_disk[filename] = os.stat(os.path.join(uploads_dir, filename))
+        with self.lock, self.conn:
+            rows = self.conn.execute('SELECT filename, sha256 FROM recordings').fetchall()
+            known = {filename for filename, _ in rows}
+            added = [name for name in on_disk if name not in known]
+            removed = [filename for filename, sha256 in rows
+                       if filename not in on_disk and not (sha256 and store is not None and store.exists(sha256))]
+            self.conn.executemany(
+                'INSERT INTO recordings (filename, size, created, modified) VALUES (?, ?, ?, ?)',
+                [(name, on_disk[name].st_size,
+                  datetime.fromtimestamp(on_disk[name].st_ctime).isoformat(),
+                  datetime.fromtimestamp(on_disk[name].st_mtime).isoformat()) for name in added])
+            self.conn.executemany('DELETE FROM recordings WHERE filename = ?', [(name,) for name in removed])
+            if added or removed:
+                self._bump()
+        return len(added), len(removed)
+
+def ingest_sidecars(catalog, paths):
+    """把已有的元数据 JSON 文件（或目录中的所有 .json）写入目录，返回写入的数量"""
+    count = 0
+    for path in paths:
+        files = ([os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith('.json')]
+                 if os.path.isdir(path) else [path])
+        for file_path in files:
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"⚠️  跳过 {file_path}: {e}")
+                continue
+            if not isinstance(metadata, dict) or 'fileName' not in metadata:
+                continue
+            catalog.add_metadata(metadata['fileName'], metadata)
+            count += 1
+    return count
+
+
+def main():
+    args = sys.argv[1:]
+    options = {'--db': os.path.join('uploads', 'catalog.db')}
+    for name in options:
+        if name in args:
+            i = args.index(name)
+            options[name] = args[i + 1]
+            del args[i:i + 2]
+    command = args.pop(0) if args else 'stats'
+    catalog = RecordingCatalog(options['--db'])
+
+    if command == 'ingest':
+        print(f"✅ {ingest_sidecars(catalog, args)} 个元数据文件已写入 {options['--db']}")
+        return
+
+    print("\n📊 削波率（按会话）:")
+    for row in catalog.clipping_by_session():
+        mean = row['mean_clipping_rate']
+        print(f"   {str(row['session']):20s} {row['clips']:5d} clips  "
+              f"mean {mean if mean is not None else float('nan'):.5f}  over threshold {row['over_threshold'] or 0:4d}  "
+              f"{row['distribution']}")
+    print("\n📊 每个句子的视频数:")
+    for row in catalog.clips_by_sentence():
+        print(f"   {str(row['sentence_set']):12s} #{str(row['sentence_index']):>4s} {row['clips']:4d} clips "
+              f"{row['redos'] or 0:3d} redo {row['warnings'] or 0:3d} warn  {(row['sentence'] or '')[:40]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ import re
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
 from collections import defaultdict, Counter
+from word_tokenizer import clean_sentence
 import nltk
 try:
     from nltk.corpus import cmudict
@@ -55,10 +56,7 @@ class SentenceAnalysisVisualizer:
     
     def clean_sentence(self, sentence):
         """清理句子"""
-        sentence = sentence.lower()
-        sentence = re.sub(r'[^\w\s]', '', sentence)
-        sentence = re.sub(r'\s+', ' ', sentence).strip()
-        return sentence
+        return clean_sentence(sentence)
     
     def get_word_phonemes(self, word):
         """获取词汇的音素"""
@@ -8,8 +8,8 @@ import nltk
 import re
 import json
 import os
-import string
 from collections import Counter
+from word_tokenizer import surface_words, tokenize
 
 # Download required NLTK data
 try:
@@ -36,6 +36,11 @@ class SentenceAnalyzer:
         # 加载目标词汇集
         self.pick_words = self.load_pick_words()
         
+        # 候选句子排序（首次使用 suggest 时构建）
+        self.candidate_file = "all_350_sentences.txt"
+        self.ranker = None
+        self.last_suggestions = []
+        
         self.load_selected_sentences()
     
     def load_pick_words(self):
@@ -82,23 +87,8 @@ class SentenceAnalyzer:
         return []
     
     def extract_words_from_sentence(self, sentence):
-        """从句子中提取单词"""
-        # 处理缩写
-        sentence = sentence.replace("'t", " not")
-        sentence = sentence.replace("'re", " are")  
-        sentence = sentence.replace("'ll", " will")
-        sentence = sentence.replace("'ve", " have")
-        sentence = sentence.replace("'d", " would")
-        sentence = sentence.replace("'m", " am")
-        sentence = sentence.replace("'s", " is")
-        
-        # 移除标点符号
-        translator = str.maketrans('', '', string.punctuation)
-        sentence = sentence.translate(translator)
-        
-        # 分割单词并转换为小写
-        words = sentence.lower().split()
-        return words
+        """从句子中提取单词（小写、展开缩写、去除标点）"""
+        return list(tokenize(sentence))
     
     def save_selected_sentences(self):
         """保存选中的句子到文件"""
@@ -120,38 +110,19 @@ class SentenceAnalyzer:
     
     def clean_sentence(self, sentence):
         """清理句子：去除标点符号，保留基本结构，还原大小写"""
-        # 去除多余空格
-        sentence = sentence.strip()
-        
-        # 保留缩写中的撇号，但去除其他标点符号
-        # 先处理常见缩写
-        sentence = re.sub(r'\b(don|won|can|isn|aren|wasn|weren|hasn|haven|hadn|shouldn|wouldn|couldn|didn)\'t\b', r'\1 not', sentence, flags=re.IGNORECASE)
-        sentence = re.sub(r'\b(I|you|we|they)\'re\b', r'\1 are', sentence, flags=re.IGNORECASE)
-        sentence = re.sub(r'\b(I|you|we|they|he|she|it)\'ll\b', r'\1 will', sentence, flags=re.IGNORECASE)
-        sentence = re.sub(r'\b(I|you|we|they|he|she|it)\'ve\b', r'\1 have', sentence, flags=re.IGNORECASE)
-        sentence = re.sub(r'\b(I|you|we|they|he|she|it)\'d\b', r'\1 would', sentence, flags=re.IGNORECASE)
-        sentence = re.sub(r'\bI\'m\b', 'I am', sentence, flags=re.IGNORECASE)
-        sentence = re.sub(r'\b(he|she|it)\'s\b', r'\1 is', sentence, flags=re.IGNORECASE)
-        
-        # 去除剩余的标点符号，但保留空格
-        sentence = re.sub(r'[^\w\s]', '', sentence)
-        
-        # 去除多余空格
-        sentence = re.sub(r'\s+', ' ', sentence).strip()
+        # 保存的是原句：只去除标点，保留缩写原样（展开只用于匹配单词）
+        words = [word.lower() for word in surface_words(sentence)]
         
         # 还原正确的大小写：句首字母大写，I 大写，其他小写
-        if sentence:
-            words = sentence.lower().split()
-            # 句首字母大写
-            if words:
-                words[0] = words[0].capitalize()
-            # I 总是大写
+        if words:
+            # I（以及 I'm, I'd've 等）总是大写
             for i, word in enumerate(words):
-                if word == 'i':
-                    words[i] = 'I'
-            sentence = ' '.join(words)
+                if word == 'i' or word.startswith("i'"):
+                    words[i] = 'I' + word[1:]
+            # 句首字母大写
+            words[0] = words[0].capitalize()
         
-        return sentence
+        return ' '.join(words)
     
     def add_sentence(self, sentence):
         """添加句子到选中列表"""
@@ -304,6 +275,50 @@ class SentenceAnalyzer:
         print(f"   总音素实例: {total_phonemes}")
         print(f"   不同音素数: {len(phoneme_freq)}")
     
+    def build_ranker(self):
+        """预计算 (候选句子 x (目标词汇 + 39音素)) 计数矩阵"""
+        from candidate_ranker import CandidateRanker, load_candidate_lines
+        
+        sentences = []
+        feature_lists = []
+        seen = set()
+        for line in load_candidate_lines(self.candidate_file):
+            sentence = self.clean_sentence(line)
+            if not sentence or sentence.lower() in seen:
+                continue
+            seen.add(sentence.lower())
+            words = self.extract_words_from_sentence(sentence)
+            features = list(words)
+            for word in words:
+                features.extend(self.get_word_phonemes(word))
+            sentences.append(sentence)
+            feature_lists.append(features)
+        
+        features = sorted(self.pick_words) + sorted(self.standard_phonemes)
+        self.ranker = CandidateRanker(sentences, feature_lists, features)
+        print(f"📚 候选句子矩阵: {len(sentences)} 个句子")
+    
+    def suggest_sentences(self, k=10):
+        """返回能新覆盖最多目标词汇和音素的前 k 个未选句子 [(句子, 新覆盖数), ...]"""
+        if self.ranker is None:
+            self.build_ranker()
+        word_freq, phoneme_freq, _, _ = self.analyze_sentences()
+        current = word_freq + phoneme_freq
+        target = {feature: 1 for feature in self.ranker.features}
+        gains = self.ranker.coverage_gain(current, target)
+        self.last_suggestions = self.ranker.top_k(gains, k, exclude=self.selected_sentences)
+        return self.last_suggestions
+    
+    def display_suggestions(self, k=10):
+        """显示推荐句子"""
+        suggestions = self.suggest_sentences(k)
+        print(f"\n💡 推荐句子 (新覆盖的目标词汇 + 音素数):")
+        if not suggestions:
+            print("   (无可推荐句子)")
+        for i, (sentence, gain) in enumerate(suggestions, 1):
+            print(f"   {i:2d}. +{gain:.0f}  {sentence}")
+        print("   💡 输入 'pick <编号>' 添加推荐句子")
+    
     def run_interactive(self):
         """运行交互界面"""
         print("🎯 交互式句子分析器")
@@ -314,6 +329,8 @@ class SentenceAnalyzer:
         print("   📊 show → 显示当前分析结果")
         print("   📋 list → 列出所有选中句子")
         print("   🧹 clear → 清空所有句子")
+        print("   💡 suggest [数量] → 推荐下一个句子")
+        print("   ➕ pick <编号> → 添加推荐列表中的句子")
         print("   👋 quit → 退出程序")
         print("   💡 删除例子: remove 1 或 remove This is a test")
         
@@ -341,6 +358,18 @@ class SentenceAnalyzer:
                 elif cmd == 'show':
                     self.display_analysis()
                 
+                elif cmd == 'suggest':
+                    k = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 10
+                    self.display_suggestions(k)
+                
+                elif cmd == 'pick' and len(parts) > 1 and parts[1].isdigit():
+                    index = int(parts[1]) - 1
+                    if 0 <= index < len(self.last_suggestions):
+                        self.add_sentence(self.last_suggestions[index][0])
+                        self.display_analysis()
+                    else:
+                        print(f"❌ 编号无效: {parts[1]}，请先运行 suggest")
+                
                 elif cmd == 'list':
                     print(f"\n📝 当前选中句子 ({len(self.selected_sentences)}):")
                     if self.selected_sentences:
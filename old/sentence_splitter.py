@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Sentence Splitter - 统一的分句工具
+快速路径：预编译正则，按 . ! ? 切分（保留句末标点和引号）。
+只有包含缩写（Mr. / Dr. / U.S. ...）或省略号的行才交给 NLTK Punkt 处理，
+大部分电影台词不需要调用 Punkt。
+
+    split_sentences("They do not! I hope so.")     -> ['They do not!', 'I hope so.']
+    split_sentences("Mr. Smith is here... Go.")    -> Punkt 处理
+    split_stage(lines)                             -> 生成器阶段，逐句输出
+
+分句器可以替换：split_stage(lines, splitter='fast' | 'punkt' | 'auto' | 任意函数)
+"""
+
+import re
+from collections import Counter
+
+# 一个句子：以非空白字符开始，直到句末标点（可跟引号、括号）或行尾
+_SENTENCE_RE = re.compile(r'\S[^.!?]*(?:[.!?]+["\'”’)\]]*|$)')
+
+# 需要 Punkt 的情况：省略号、常见缩写、U.S. 这类带点的首字母缩写
+ABBREVIATIONS = [
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'st', 'jr', 'sr', 'vs', 'etc', 'lt', 'col', 'gen',
+    'sgt', 'capt', 'mt', 'ft', 'no', 'inc', 'ltd', 'co', 'jan', 'feb', 'aug', 'sept', 'oct', 'nov', 'dec',
+]
+_NEEDS_PUNKT_RE = re.compile(
+    r'\.\.|…|\b(?:' + '|'.join(ABBREVIATIONS) + r')\.|\b[a-z]\.[a-z]\.',
+    re.IGNORECASE)
+
+# 各路径的调用次数
+stats = Counter()
+
+_punkt = None
+
+
+def _punkt_tokenizer():
+    """加载 Punkt；没有 punkt_tab 数据时使用带缩写表的未训练 Punkt"""
+    global _punkt
+    if _punkt is None:
+        import nltk
+        try:
+            nltk.data.find('tokenizers/punkt_tab')
+            _punkt = nltk.sent_tokenize
+        except LookupError:
+            from nltk.tokenize.punkt import PunktParameters, PunktSentenceTokenizer
+            params = PunktParameters()
+            params.abbrev_types = set(ABBREVIATIONS) | {'u.s', 'e.g', 'i.e', 'a.m', 'p.m'}
+            _punkt = PunktSentenceTokenizer(params).tokenize
+    return _punkt
+
+
+def split_fast(text):
+    """正则分句"""
+    stats['fast'] += 1
+    return [match.group().strip() for match in _SENTENCE_RE.finditer(text)]
+
+
+def split_punkt(text):
+    """NLTK Punkt 分句"""
+    stats['punkt'] += 1
+    return [s.strip() for s in _punkt_tokenizer()(text) if s.strip()]
+
+
+def needs_punkt(text):
+    return _NEEDS_PUNKT_RE.search(text) is not None
+
+
+def split_sentences(text):
+    """默认分句器：大部分行走快速路径，有缩写或省略号时使用 Punkt"""
+    if not text:
+        return []
+    if needs_punkt(text):
+        return split_punkt(text)
+    return split_fast(text)
+
+
+SPLITTERS = {
+    'auto': split_sentences,
+    'fast': split_fast,
+    'punkt': split_punkt,
+}
+
+
+def get_splitter(splitter='auto'):
+    """名称或函数 -> 分句函数"""
+    if callable(splitter):
+        return splitter
+    if splitter not in SPLITTERS:
+        raise ValueError(f"Unknown splitter: {splitter} (choose from {', '.join(SPLITTERS)})")
+    return SPLITTERS[splitter]
+
+
+def split_stage(items, splitter='auto'):
+    """
+    生成器阶段：逐项分句
+    items 为字符串时输出句子；为元组时（如 (line_id, speaker, text)）文本在最后一列，
+    每个句子输出一条替换了文本的记录
+    """
+    split = get_splitter(splitter)
+    for item in items:
+        if isinstance(item, str):
+            yield from split(item)
+        else:
+            *fields, text = item
+            for sentence in split(text):
+                yield (*fields, sentence)
+
+
+if __name__ == "__main__":
+    for example in ["They do not! I hope so.", "Wait... what did you say?",
+                    "Mr. Smith went to Washington. He stayed.", "\"Go!\" she said. Then nothing",
+                    "I live in the U.S. now."]:
+        print(f"{example:45s} -> {split_sentences(example)}")
+    print(dict(stats))
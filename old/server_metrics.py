@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Server Metrics - 上传服务器的请求指标
+按接口统计请求数（方法、状态码）和延迟直方图，记录上传字节数与吞吐量，
+连同正在处理的请求、正在传输的上传和磁盘用量一起输出为 Prometheus 文本格式或 JSON：
+
+    metrics = ServerMetrics()
+    metrics.observe('/upload', 'POST', 200, seconds, upload_bytes=length)
+    metrics.render_prometheus(gauges, counters)      GET /metrics
+    metrics.as_dict(gauges, counters)                GET /metrics?format=json
+
+标签值都来自固定集合（接口名、方法名、状态码），客户端发送的任意路径或方法不会增加新的时间序列。
+"""
+
+import threading
+import time
+from collections import deque
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+THROUGHPUT_WINDOW = 60      # 上传吞吐量按最近多少秒计算
+METHODS = frozenset({'GET', 'HEAD', 'POST', 'PUT', 'DELETE', 'OPTIONS', 'PATCH'})
+
+
+def endpoint_name(path):
+    """路径 -> 接口名；带参数的路径归为同一个接口，避免标签数量无限增长"""
+    path = path.split('?', 1)[0]
+    if path in ('/upload', '/upload/init', '/videos', '/export', '/stats', '/health', '/metrics'):
+        return path
+    if path.startswith('/upload/'):
+        if '/chunks/' in path:
+            return '/upload/{id}/chunks/{n}'
+        if path.endswith('/finalize'):
+            return '/upload/{id}/finalize'
+        return '/upload/{id}'
+    if path.startswith('/videos/'):
+        return '/videos/{filename}'
+    return 'other'
+
+
+def method_name(method):
+    """请求方法 -> 方法标签；不认识的方法归为 OTHER"""
+    return method if method in METHODS else 'OTHER'
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)     # 最后一项为 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """[(上界, 累计数), ...]，最后一项上界为 '+Inf'"""
+        total, result = 0, []
+        for bound, count in zip(list(self.buckets) + ['+Inf'], self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+def _escape(value):
+    """Prometheus 标签值转义：反斜杠、双引号、换行"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+class ServerMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.requests = {}          # (接口, 方法, 状态码) -> 次数
+        self.latency = {}           # 接口 -> Histogram
+        self.in_progress = 0
+        self.upload_bytes = 0
+        self.upload_seconds = 0.0
+        self.recent_uploads = deque()   # (完成时间, 字节数)
+
+    def start_request(self):
+        with self.lock:
+            self.in_progress += 1
+
+    def observe(self, endpoint, method, status, seconds, upload_bytes=0):
+        """记录一次完成的请求；upload_bytes 为成功接收的上传字节数"""
+        now = time.time()
+        with self.lock:
+            self.in_progress -= 1
+            key = (endpoint, method_name(method), status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.latency.setdefault(endpoint, Histogram()).observe(seconds)
+            if upload_bytes:
+                self.upload_bytes += upload_bytes
+                self.upload_seconds += seconds
+                self.recent_uploads.append((now, upload_bytes))
+            self._trim(now)
+
+    def _trim(self, now):
+        while self.recent_uploads and self.recent_uploads[0][0] < now - THROUGHPUT_WINDOW:
+            self.recent_uploads.popleft()
+
+    def throughput(self):
+        """最近 THROUGHPUT_WINDOW 秒内完成的上传的平均字节/秒"""
+        now = time.time()
+        with self.lock:
+            self._trim(now)
+            window = min(THROUGHPUT_WINDOW, max(now - self.started, 1e-9))
+            return sum(nbytes for _, nbytes in self.recent_uploads) / window
+
+    def as_dict(self, gauges=None, counters=None):
+        """
+        JSON 形式；gauges 为额外的 {指标名: (说明, 值)}，
+        counters 为额外的带一个标签的计数器 {指标名: (说明, 标签名, {标签值: 次数})}
+        """
+        throughput = self.throughput()
+        with self.lock:
+            return {
+                'uptime_seconds': time.time() - self.started,
+                'in_progress_requests': self.in_progress,
+                'requests': [{'endpoint': endpoint, 'method': method, 'status': status, 'count': count}
+                             for (endpoint, method, status), count in sorted(self.requests.items())],
+                'latency': {endpoint: {
+                    'count': histogram.count,
+                    'sum': histogram.sum,
+                    'mean': histogram.sum / histogram.count if histogram.count else None,
+                    'buckets': {str(bound): count for bound, count in histogram.cumulative()},
+                } for endpoint, histogram in sorted(self.latency.items())},
+                'upload': {
+                    'bytes_total': self.upload_bytes,
+                    'seconds_total': self.upload_seconds,
+                    'bytes_per_second': throughput,
+                    'mean_bytes_per_second': self.upload_bytes / self.upload_seconds if self.upload_seconds else None,
+                },
+                'gauges': {name: value for name, (_, value) in (gauges or {}).items()},
+                'counters': {name: dict(values) for name, (_, _, values) in (counters or {}).items()},
+            }
+
+    def render_prometheus(self, gauges=None, counters=None):
+        """Prometheus 文本格式；gauges、counters 的格式同 as_dict"""
+        data = self.as_dict()
+        lines = [
+            '# HELP upload_server_uptime_seconds Seconds since the server started.',
+            '# TYPE upload_server_uptime_seconds gauge',
+            f"upload_server_uptime_seconds {data['uptime_seconds']:.3f}",
+            '# HELP upload_server_requests_total Completed HTTP requests.',
+            '# TYPE upload_server_requests_total counter',
+        ]
+        for row in data['requests']:
+            labels = _labels(endpoint=row['endpoint'], method=row['method'], status=row['status'])
+            lines.append(f"upload_server_requests_total{labels} {row['count']}")
+
+        lines += ['# HELP upload_server_request_duration_seconds Request latency by endpoint.',
+                  '# TYPE upload_server_request_duration_seconds histogram']
+        with self.lock:
+            histograms = sorted((endpoint, histogram.cumulative(), histogram.sum, histogram.count)
+                                for endpoint, histogram in self.latency.items())
+        for endpoint, cumulative, total, count in histograms:
+            for bound, value in cumulative:
+                lines.append(f'upload_server_request_duration_seconds_bucket'
+                             f'{_labels(endpoint=endpoint, le=bound)} {value}')
+            lines.append(f'upload_server_request_duration_seconds_sum{_labels(endpoint=endpoint)} {total:.6f}')
+            lines.append(f'upload_server_request_duration_seconds_count{_labels(endpoint=endpoint)} {count}')
+
+        upload = data['upload']
+        lines += [
+            '# HELP upload_server_upload_bytes_total Bytes received by successful uploads.',
+            '# TYPE upload_server_upload_bytes_total counter',
+            f"upload_server_upload_bytes_total {upload['bytes_total']}",
+            '# HELP upload_server_upload_seconds_total Time spent receiving successful uploads.',
+            '# TYPE upload_server_upload_seconds_total counter',
+            f"upload_server_upload_seconds_total {upload['seconds_total']:.6f}",
+            f'# HELP upload_server_upload_throughput_bytes_per_second Upload bytes/sec over the last {THROUGHPUT_WINDOW}s.',
+            '# TYPE upload_server_upload_throughput_bytes_per_second gauge',
+            f"upload_server_upload_throughput_bytes_per_second {upload['bytes_per_second']:.3f}",
+            '# HELP upload_server_in_progress_requests Requests currently being handled.',
+            '# TYPE upload_server_in_progress_requests gauge',
+            f"upload_server_in_progress_requests {data['in_progress_requests']}",
+        ]
+        for name, (help_text, value) in (gauges or {}).items():
+            lines += [f'# HELP upload_server_{name} {help_text}',
+                      f'# TYPE upload_server_{name} gauge',
+                      f'upload_server_{name} {value}']
+        for name, (help_text, label, values) in (counters or {}).items():
+            lines += [f'# HELP upload_server_{name} {help_text}',
+                      f'# TYPE upload_server_{name} counter']
+            lines += [f'upload_server_{name}{_labels(**{label: key})} {count}' for key, count in values.items()]
+        return '\n'.join(lines) + '\n'
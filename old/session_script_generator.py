@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Session Script Generator - 批量生成录制脚本
+从大规模候选句子池中生成 N 个不重复句子 + M 个重复句子的录制脚本，满足：
+  - 每个目标词汇的最少覆盖次数
+  - 每个音素的目标出现次数
+  - 不允许近似重复的句子（词汇 Jaccard 相似度过高）
+使用惰性贪心 (lazy greedy)：覆盖收益是次模的，过期的收益只会偏高，
+因此大部分候选项不需要重新计算，整体接近候选池大小的线性时间。
+"""
+
+import heapq
+import json
+import os
+import random
+import re
+from collections import Counter, defaultdict
+from word_tokenizer import clean_sentence
+import nltk
+try:
+    from nltk.corpus import cmudict
+    cmu_dict = cmudict.dict()
+except:
+    print("Downloading CMU dictionary...")
+    nltk.download('cmudict')
+    from nltk.corpus import cmudict
+    cmu_dict = cmudict.dict()
+
+# CMU phoneme set (39 phonemes)
+CMU_PHONEMES = {
+    # Vowels (15)
+    'AA', 'AE', 'AH', 'AO', 'AW', 'AY', 'EH', 'ER', 'EY', 'IH', 'IY', 'OW', 'OY', 'UH', 'UW',
+    # Consonants (24)
+    'B', 'CH', 'D', 'DH', 'F', 'G', 'HH', 'JH', 'K', 'L', 'M', 'N', 'NG', 'P', 'R', 'S', 'SH', 'T', 'TH', 'V', 'W', 'Y', 'Z', 'ZH'
+}
+
+WORD_WEIGHT = 10.0     # 每个未达最少覆盖的目标词汇
+PHONEME_WEIGHT = 1.0   # 每个填补音素缺口的实例
+
+
+def get_word_phonemes(word):
+    """Get phonemes of a word"""
+    if word in cmu_dict:
+        phonemes = [re.sub(r'\d', '', p) for p in cmu_dict[word][0]]
+        return [p for p in phonemes if p in CMU_PHONEMES]
+    return []
+
+
+def default_phoneme_targets(num_sentences, min_count=2, per_sentences=20):
+    """默认音素目标：每个音素至少出现 max(min_count, 句子数 / per_sentences) 次"""
+    target = max(min_count, num_sentences // per_sentences)
+    return {p: target for p in CMU_PHONEMES}
+
+
+class SessionScriptGenerator:
+    def __init__(self, sentences, target_words, similarity_threshold=0.8, min_words=3, max_words=12):
+        self.target_words = set(w.lower() for w in target_words)
+        self.similarity_threshold = similarity_threshold
+
+        # 预处理候选池：每个句子只分词、查音素一次
+        self.sentences = []
+        self.word_sets = []
+        self.target_sets = []
+        self.phoneme_counts = []
+        phoneme_cache = {}
+        seen = set()
+
+        for sentence in sentences:
+            sentence = sentence.strip()
+            key = clean_sentence(sentence)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+
+            words = key.split()
+            if not min_words <= len(words) <= max_words:
+                continue
+            phonemes = Counter()
+            for word in words:
+                if word not in phoneme_cache:
+                    phoneme_cache[word] = get_word_phonemes(word)
+                phonemes.update(phoneme_cache[word])
+
+            word_set = frozenset(words)
+            self.sentences.append(sentence)
+            self.word_sets.append(word_set)
+            self.target_sets.append(word_set & self.target_words)
+            self.phoneme_counts.append(phonemes)
+
+        print(f"📁 Candidate pool: {len(self.sentences)} unique sentences")
+
+    def marginal_gain(self, idx, word_coverage, phoneme_coverage, min_word_coverage, phoneme_targets):
+        """句子 idx 在当前覆盖状态下的收益"""
+        gain = 0.0
+        for word in self.target_sets[idx]:
+            if word_coverage[word] < min_word_coverage:
+                gain += WORD_WEIGHT
+        for phoneme, count in self.phoneme_counts[idx].items():
+            deficit = phoneme_targets.get(phoneme, 0) - phoneme_coverage[phoneme]
+            if deficit > 0:
+                gain += PHONEME_WEIGHT * min(count, deficit)
+        return gain
+
+    def is_near_duplicate(self, idx, selected_index):
+        """与已选句子的词汇 Jaccard 相似度是否超过阈值（只比较有共同词汇的句子）"""
+        words = self.word_sets[idx]
+        overlap = Counter()
+        for word in words:
+            for other in selected_index.get(word, ()):
+                overlap[other] += 1
+        for other, shared in overlap.items():
+            union = len(words) + len(self.word_sets[other]) - shared
+            if union and shared / union >= self.similarity_threshold:
+                return True
+        return False
+
+    def select(self, count, excluded=(), min_word_coverage=2, phoneme_targets=None, seed=0):
+        """
+        惰性贪心选择 count 个句子，返回 (句子下标列表, 词汇覆盖, 音素覆盖)
+        excluded: 已在其他集合中使用的句子，不会再被选择，并参与近似重复检查
+        """
+        if phoneme_targets is None:
+            phoneme_targets = default_phoneme_targets(count)
+
+        rng = random.Random(seed)
+        excluded = set(excluded)
+        word_coverage = Counter()
+        phoneme_coverage = Counter()
+        selected = []
+        selected_index = defaultdict(list)
+        for idx in excluded:
+            for word in self.word_sets[idx]:
+                selected_index[word].append(idx)
+
+        # 初始收益；随机打破平局，使不同种子生成不同脚本
+        heap = []
+        for idx in range(len(self.sentences)):
+            if idx in excluded:
+                continue
+            gain = self.marginal_gain(idx, word_coverage, phoneme_coverage,
+                                      min_word_coverage, phoneme_targets)
+            heap.append((-gain, rng.random(), idx))
+        heapq.heapify(heap)
+
+        while heap and len(selected) < count:
+            neg_gain, tiebreak, idx = heapq.heappop(heap)
+            gain = self.marginal_gain(idx, word_coverage, phoneme_coverage,
+                                      min_word_coverage, phoneme_targets)
+
+            # 收益已下降且不再是最优：放回堆中
+            if gain < -neg_gain and heap and gain < -heap[0][0]:
+                heapq.heappush(heap, (-gain, tiebreak, idx))
+                continue
+
+            if self.is_near_duplicate(idx, selected_index):
+                continue
+
+            selected.append(idx)
+            for word in self.word_sets[idx]:
+                selected_index[word].append(idx)
+            for word in self.target_sets[idx]:
+                word_coverage[word] += 1
+            phoneme_coverage.update(self.phoneme_counts[idx])
+
+        return selected, word_coverage, phoneme_coverage
+
+    def report_coverage(self, title, selected, word_coverage, phoneme_coverage,
+                        min_word_coverage, phoneme_targets):
+        """打印覆盖情况，返回未达标的词汇和音素"""
+        weak_words = sorted(w for w in self.target_words if word_coverage[w] < min_word_coverage)
+        weak_phonemes = sorted(p for p, t in phoneme_targets.items() if phoneme_coverage[p] < t)
+
+        print(f"\n📊 {title}: {len(selected)} sentences")
+        print(f"   Target words ≥{min_word_coverage}x: {len(self.target_words) - len(weak_words)}/{len(self.target_words)}")
+        print(f"   Phonemes on target: {len(phoneme_targets) - len(weak_phonemes)}/{len(phoneme_targets)}")
+        if weak_words:
+            print(f"   🟡 Under-covered words: {', '.join(weak_words)}")
+        if weak_phonemes:
+            print(f"   🟡 Under-covered phonemes: {', '.join('/' + p + '/' for p in weak_phonemes)}")
+        return weak_words, weak_phonemes
+
+    def generate(self, num_unique=350, num_repeat=50, min_word_coverage=2, seed=0,
+                 unique_phoneme_targets=None, repeat_phoneme_targets=None):
+        """生成一份脚本：先选 M 个重复句子，再从剩余候选中选 N 个不重复句子"""
+        if repeat_phoneme_targets is None:
+            repeat_phoneme_targets = default_phoneme_targets(num_repeat)
+        if unique_phoneme_targets is None:
+            unique_phoneme_targets = default_phoneme_targets(num_unique)
+
+        repeat, repeat_words, repeat_phonemes = self.select(
+            num_repeat, min_word_coverage=min_word_coverage,
+            phoneme_targets=repeat_phoneme_targets, seed=seed)
+        unique, unique_words, unique_phonemes = self.select(
+            num_unique, excluded=repeat, min_word_coverage=min_word_coverage,
+            phoneme_targets=unique_phoneme_targets, seed=seed)
+
+        repeat_weak = self.report_coverage("Repeated set", repeat, repeat_words, repeat_phonemes,
+                                           min_word_coverage, repeat_phoneme_targets)
+        unique_weak = self.report_coverage("Non-repeating set", unique, unique_words, unique_phonemes,
+                                           min_word_coverage, unique_phoneme_targets)
+
+        return {
+            'seed': seed,
+            'repeat_sentences': [self.sentences[i] for i in repeat],
+            'unique_sentences': [self.sentences[i] for i in unique],
+            'repeat_word_coverage': dict(repeat_words),
+            'unique_word_coverage': dict(unique_words),
+            'repeat_phoneme_coverage': dict(repeat_phonemes),
+            'unique_phoneme_coverage': dict(unique_phonemes),
+            'under_covered': {
+                'repeat_words': repeat_weak[0],
+                'repeat_phonemes': repeat_weak[1],
+                'unique_words': unique_weak[0],
+                'unique_phonemes': unique_weak[1],
+            }
+        }
+
+    def save_script(self, script, output_dir, repeat_times=6, shuffle=True):
+        """保存脚本：重复句子、不重复句子和 JSON 报告"""
+        os.makedirs(output_dir, exist_ok=True)
+        rng = random.Random(script['seed'])
+
+        unique = list(script['unique_sentences'])
+        repeat = list(script['repeat_sentences'])
+        if shuffle:
+            rng.shuffle(unique)
+            rng.shuffle(repeat)
+
+        unique_file = os.path.join(output_dir, f"{len(unique)}_nonrepeating_sentences.txt")
+        repeat_file = os.path.join(output_dir, f"{len(repeat)}_repeat{repeat_times}_sentences.txt")
+        with open(unique_file, 'w', encoding='utf-8') as f:
+            for sentence in unique:
+                f.write(sentence + '\n')
+        with open(repeat_file, 'w', encoding='utf-8') as f:
+            for sentence in repeat:
+                f.write(sentence + '\n')
+        with open(os.path.join(output_dir, 'session_script.json'), 'w', encoding='utf-8') as f:
+            json.dump(dict(script, repeat_times=repeat_times), f, ensure_ascii=False, indent=2)
+
+        print(f"✅ Script saved to: {output_dir}")
+
+
+def load_sentence_pool(path):
+    """读取候选句子（.txt 每行一句，或 .json 句子列表）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.json'):
+            return json.load(f)
+        return [line.strip() for line in f if line.strip()]
+
+
+def main():
+    print("🎯 Session Script Generator")
+    print("=" * 80)
+
+    try:
+        sentences = load_sentence_pool('selected_sentences.txt')
+        with open('selected_words.json', 'r', encoding='utf-8') as f:
+            target_words = [w.strip() for w in json.load(f) if w.strip()]
+    except Exception as e:
+        print(f"❌ Failed to load inputs: {e}")
+        return
+
+    generator = SessionScriptGenerator(sentences, target_words)
+
+    num_scripts = input("Number of participant scripts to generate (default 1): ").strip()
+    num_scripts = int(num_scripts) if num_scripts.isdigit() else 1
+
+    for i in range(num_scripts):
+        print("\n" + "=" * 80)
+        print(f"📝 Participant script {i + 1}/{num_scripts}")
+        script = generator.generate(num_unique=350, num_repeat=50, seed=i)
+        generator.save_script(script, os.path.join('newset', f'participant_{i + 1:02d}'))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,779 @@
+#!/usr/bin/env python3
+"""
+简单的视频上传测试服务器
+用于测试视频录制工具的服务器上传功能
+请求由有界线程池并发处理，慢速上传不会阻塞其他请求（包括 /health）
+上传的视频按块流式写入磁盘，内存占用与文件大小无关
+视频按SHA-256内容寻址保存（uploads/objects），重复上传的相同内容只保存一份
+"""
+
+import os
+import re
+import shutil
+import sys
+import json
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs, quote, unquote, urlparse
+
+from archive_export import WRITERS as ARCHIVE_WRITERS, ArchiveEntry
+from content_store import ContentStore
+from multipart_stream import MultipartError, UploadTooLarge, parse_multipart
+from recording_catalog import RecordingCatalog
+from server_metrics import ServerMetrics, endpoint_name
+from upload_admission import Rejected, UploadAdmission
+from upload_sessions import ChunkError, SessionBusy, UploadSessions
+
+MAX_WORKERS = 32        # 同时处理的请求数，超出的连接排队等待
+REQUEST_TIMEOUT = 120   # 连接空闲超过该秒数时断开，避免卡住工作线程
+MAX_UPLOAD_BYTES = 2 << 30      # 单个视频文件的大小上限
+MAX_FORM_OVERHEAD = 1 << 20     # 表单字段和multipart头允许的额外字节
+MAX_JSON_BYTES = 64 * 1024      # JSON请求体的大小上限
+MAX_UPLOADS = 8                 # 同时进行的上传数（须小于 MAX_WORKERS，保证其他接口仍可响应）
+MAX_INFLIGHT_BYTES = 8 << 30    # 正在传输的上传字节总数上限
+MIN_FREE_BYTES = 2 << 30        # 磁盘至少保留的剩余空间
+RETRY_AFTER = 5                 # 429 响应建议的重试秒数
+FORM_FIELDS = ('sentence', 'timestamp', 'index', 'sentence_set', 'participant', 'metadata')
+PAGE_SIZE = 100                 # /videos 默认每页条数
+MAX_PAGE_SIZE = 1000
+
+# /upload/<id>、/upload/<id>/chunks/<n>、/upload/<id>/finalize
+SESSION_PATH = re.compile(r'^/upload/([0-9a-f]{32})(?:/chunks/(\d+)|/(finalize))?$')
+# 成功时按 Content-Length 计入上传吞吐量的接口
+UPLOAD_ENDPOINTS = ('/upload', '/upload/{id}/chunks/{n}')
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CONTENT_TYPES = {'.webm': 'video/webm', '.mp4': 'video/mp4', '.json': 'application/json'}
+
+def parse_range(header, size):
+    """
+    解析单个 Range（bytes=a-b / a- / -n），返回 (起点, 终点含)；
+    没有 Range 或为多段时返回 None（发送完整文件），无法满足时抛出 ValueError
+    """
+    match = RANGE.match((header or '').replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    else:
+        start, end = max(size - int(last), 0), size - 1
+    if start > end or start >= size:
+        raise ValueError('Range无法满足')
+    return start, end
+
+def query_filters(query):
+    """查询参数 -> 目录过滤条件（sentence_set / participant / index）"""
+    index = query.get('index', [None])[0]
+    return {
+        'sentence_set': query.get('sentence_set', [None])[0],
+        'participant': query.get('participant', [None])[0],
+        'sentence_index': int(index) if index is not None else None,
+    }
+
+def form_fields(data):
+    """分块上传的JSON请求体 -> 与multipart表单相同的字段"""
+    return {key: (json.dumps(data[key], ensure_ascii=False) if isinstance(data[key], dict) else str(data[key]))
+            for key in FORM_FIELDS if data.get(key) is not None}
+
+def parse_metadata(fields):
+    """表单中的 metadata 字段（录制工具生成的元数据JSON）-> dict；没有或无效时返回 None"""
+    try:
+        metadata = json.loads(fields['metadata']) if fields.get('metadata') else None
+    except json.JSONDecodeError:
+        return None
+    return metadata if isinstance(metadata, dict) else None
+
+class VideoUploadHandler(BaseHTTPRequestHandler):
+    timeout = REQUEST_TIMEOUT
+
+    def handle_one_request(self):
+        """处理一个请求，并记录其接口、状态码、延迟和上传字节数"""
+        self.request_start = None
+        self.status = None
+        try:
+            super().handle_one_request()
+        finally:
+            if self.request_start is not None:
+                endpoint = endpoint_name(self.path)
+                length = self.headers.get('Content-Length', '0') if self.headers else '0'
+                upload_bytes = (int(length) if endpoint in UPLOAD_ENDPOINTS and self.status == 200
+                                and length.isdigit() else 0)
+                self.server.metrics.observe(endpoint, self.command, self.status or 0,
+                                            time.time() - self.request_start, upload_bytes)
+
+    def parse_request(self):
+        # 从读到请求行开始计时（不包括等待连接上下一个请求的空闲时间）
+        if not super().parse_request():
+            return False
+        self.request_start = time.time()
+        self.server.metrics.start_request()
+        return True
+
+    def send_response(self, code, message=None):
+        self.status = code
+        super().send_response(code, message)
+
+    def do_OPTIONS(self):
+        """处理预检请求"""
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'POST, GET, HEAD, PUT, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Range, If-None-Match, If-Range, X-Chunk-Offset, X-Chunk-SHA256')
+        self.end_headers()
+
+    def do_POST(self):
+        """处理POST请求 - 视频上传"""
+        path = urlparse(self.path).path
+        match = SESSION_PATH.match(path)
+        if path == '/upload':
+            self.handle_upload()
+        elif path == '/upload/init':
+            self.handle_upload_init()
+        elif match and match.group(3):
+            self.handle_upload_finalize(match.group(1))
+        else:
+            self.send_error(404, "Not Found")
+
+    def do_HEAD(self):
+        """处理HEAD请求 - 只返回下载的响应头"""
+        path = urlparse(self.path).path
+        if path.startswith('/videos/'):
+            self.handle_download(unquote(path[len('/videos/'):]), head_only=True)
+        else:
+            self.send_error(404, "Not Found")
+
+    def do_PUT(self):
+        """处理PUT请求 - 分块上传"""
+        match = SESSION_PATH.match(urlparse(self.path).path)
+        if match and match.group(2) is not None:
+            self.handle_upload_chunk(match.group(1), int(match.group(2)))
+        else:
+            self.send_error(404, "Not Found")
+
+    def do_GET(self):
+        """处理GET请求"""
+        path = urlparse(self.path).path
+        match = SESSION_PATH.match(path)
+        if path == '/health':
+            self.handle_health()
+        elif path == '/videos':
+            self.handle_list_videos()
+        elif path.startswith('/videos/'):
+            self.handle_download(unquote(path[len('/videos/'):]))
+        elif path == '/stats':
+            self.handle_stats()
+        elif path == '/metrics':
+            self.handle_metrics()
+        elif path == '/export':
+            self.handle_export()
+        elif match and match.group(2) is None and not match.group(3):
+            self.handle_upload_status(match.group(1))
+        else:
+            self.send_error(404, "Not Found")
+
+    def send_json(self, status, payload):
+        """发送JSON响应（带CORS头）"""
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_rejected(self, rejected):
+        """准入控制拒绝：请求体未读取，响应后关闭连接"""
+        self.close_connection = True
+        body = json.dumps({'error': str(rejected), 'retry_after': rejected.retry_after},
+                          ensure_ascii=False).encode('utf-8')
+        self.send_response(rejected.status)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Expose-Headers', 'Retry-After')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if rejected.retry_after is not None:
+            self.send_header('Retry-After', str(rejected.retry_after))
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self):
+        """读取JSON请求体"""
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_JSON_BYTES:
+            raise ValueError('请求体过大')
+        data = json.loads(self.rfile.read(length) or b'{}')
+        if not isinstance(data, dict):
+            raise ValueError('需要JSON对象')
+        return data
+
+    def save_video(self, temp_path, filename, size, sha256, fields):
+        """
+        把已写完的临时文件按SHA-256放入内容存储，并在目录中登记文件名，返回成功响应
+        相同内容只保存一份；temp_path 为 None 表示内容已在存储中（只登记文件名）
+        """
+        previous = self.server.catalog.get(filename)
+        if temp_path is None:
+            file_path, created = self.server.store.path(sha256), False
+        else:
+            file_path, created = self.server.store.put(temp_path, sha256)
+
+        # 获取其他表单字段；metadata 字段为录制工具生成的元数据JSON，表单中缺少的字段从中补全
+        metadata = parse_metadata(fields)
+        row = self.server.catalog.add(filename, size, sha256, fields, metadata)
+        if metadata is not None:
+            self.server.catalog.add_metadata(filename, metadata, fields)
+        sentence = row['sentence'] or '未知句子'
+        timestamp = row['timestamp']
+        index = fields.get('index', str(row['sentence_index'] if row['sentence_index'] is not None else 0))
+
+        print(f"\n✅ 收到视频上传:")
+        print(f"   文件名: {filename}")
+        print(f"   大小: {size / 1024 / 1024:.2f} MB")
+        print(f"   SHA-256: {sha256}")
+        print(f"   句子: {sentence}")
+        print(f"   时间: {timestamp}")
+        print(f"   序号: {index}")
+        print(f"   保存路径: {file_path}{'' if created else ' (内容已存在，未重复保存)'}")
+        replaced = previous['sha256'] if previous and previous['sha256'] not in (None, sha256) else None
+        if replaced:
+            print(f"   ⚠️  同名文件已指向新内容 (原SHA-256: {replaced})")
+
+        return {
+            'success': True,
+            'message': '视频上传成功',
+            'filename': filename,
+            'size': size,
+            'sha256': sha256,
+            'deduplicated': not created,
+            'replaced': replaced,
+            'sentence': sentence,
+            'timestamp': timestamp,
+            'index': index
+        }
+
+    def save_sidecar(self, fields):
+        """单独上传的元数据JSON：按其中的 fileName 关联到视频"""
+        metadata = parse_metadata(fields)
+        if metadata is None or not metadata.get('fileName'):
+            raise ValueError('元数据JSON无效或缺少fileName')
+        filename = os.path.basename(metadata['fileName'])
+        self.server.catalog.add_metadata(filename, metadata, fields)
+        print(f"📝 收到元数据: {filename}")
+        return {'success': True, 'message': '元数据已保存', 'filename': filename}
+
+    def handle_upload(self):
+        """处理视频上传：请求体按块流式写入磁盘，同时计算SHA-256"""
+        uploads_dir = os.path.join(os.getcwd(), 'uploads')
+        files = {}
+        try:
+            content_type = self.headers.get('Content-Type', '')
+            if not content_type.startswith('multipart/form-data'):
+                self.send_json(400, {'error': '需要multipart/form-data格式'})
+                return
+
+            length = self.headers.get('Content-Length')
+            if length is None:
+                self.send_json(411, {'error': '缺少Content-Length'})
+                return
+            if int(length) > MAX_UPLOAD_BYTES + MAX_FORM_OVERHEAD:
+                self.close_connection = True
+                self.send_json(413, {'error': f'上传超过大小限制 ({MAX_UPLOAD_BYTES} 字节)'})
+                return
+
+            # 准入控制通过后才读取请求体；解析multipart/form-data（文件部分写入uploads下的临时文件）
+            with self.server.admission.admit(int(length)):
+                fields, files = parse_multipart(self.rfile, content_type, int(length), uploads_dir,
+                                                max_size=MAX_UPLOAD_BYTES)
+
+            # 元数据JSON可以作为 sidecar 文件部分随视频上传，也可以单独上传
+            if 'sidecar' in files:
+                if files['sidecar'].size > MAX_FORM_OVERHEAD:
+                    raise ValueError('元数据文件过大')
+                with open(files['sidecar'].path, 'r', encoding='utf-8', errors='replace') as f:
+                    fields['metadata'] = f.read()
+
+            # 检查是否有视频文件
+            video = files.get('video')
+            if video is None and 'sidecar' in files:
+                self.send_json(200, self.save_sidecar(fields))
+                return
+            if video is None:
+                self.send_json(400, {'error': '没有收到视频文件'})
+                return
+            filename = os.path.basename(video.filename)
+            if not filename or video.size == 0:
+                self.send_json(400, {'error': '视频文件为空'})
+                return
+
+            # 保存视频文件并返回成功响应
+            self.send_json(200, self.save_video(video.path, filename, video.size, video.sha256, fields))
+
+        except Rejected as e:
+            self.send_rejected(e)
+        except UploadTooLarge as e:
+            # 请求体未读完，不能继续复用连接
+            self.close_connection = True
+            self.send_json(413, {'error': str(e)})
+        except (MultipartError, ValueError) as e:
+            self.close_connection = True
+            self.send_json(400, {'error': str(e)})
+        except Exception as e:
+            print(f"❌ 上传处理错误: {e}")
+            self.close_connection = True
+            self.send_json(500, {'error': f'服务器内部错误: {str(e)}'})
+        finally:
+            # 未被移走的临时文件（例如多余的文件字段）
+            for upload in files.values():
+                if os.path.exists(upload.path):
+                    os.remove(upload.path)
+
+    def handle_upload_init(self):
+        """分块上传：创建会话"""
+        try:
+            data = self.read_json()
+            fields = form_fields(data)
+            size = data.get('size')
+            if not isinstance(size, int) or isinstance(size, bool) or size <= 0:
+                raise ValueError('size 必须是正整数')
+            for key in ('filename', 'sha256'):
+                if data.get(key) is not None and not isinstance(data[key], str):
+                    raise ValueError(f'{key} 必须是字符串')
+            # 内容已在存储中：直接登记文件名，不需要上传任何块
+            sha256 = (data.get('sha256') or '').lower()
+            if sha256 and self.server.store.exists(sha256, size=size):
+                filename = os.path.basename(data.get('filename') or '')
+                if not filename:
+                    raise ValueError('缺少文件名')
+                response = self.save_video(None, filename, size, sha256, fields)
+                self.send_json(200, dict(response, upload_id=None, complete=True))
+                return
+            # 数据文件按完整大小预分配：在准入锁内预留磁盘空间，会话保存或过期时释放
+            upload_id = uuid.uuid4().hex
+            self.server.admission.reserve(upload_id, size)
+            try:
+                session = self.server.sessions.create(data.get('filename'), size,
+                                                      sha256=data.get('sha256'),
+                                                      chunk_size=data.get('chunk_size'), fields=fields,
+                                                      upload_id=upload_id)
+            except BaseException:
+                self.server.admission.release_session(upload_id)
+                raise
+            if session.meta['preallocated']:
+                self.server.admission.mark_allocated(upload_id)
+        except Rejected as e:
+            self.send_rejected(e)
+            return
+        except ValueError as e:
+            self.send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            # 例如预分配数据文件时磁盘已满 (OSError)
+            print(f"❌ 分块上传初始化错误: {e}")
+            self.send_json(500, {'error': f'服务器内部错误: {str(e)}'})
+            return
+        print(f"📦 分块上传开始: {session.meta['filename']} ({session.num_chunks} 块) id={session.id}")
+        self.send_json(200, dict(session.status(), success=True))
+
+    def handle_upload_chunk(self, upload_id, n):
+        """分块上传：写入第 n 块"""
+        session = self.server.sessions.get(upload_id)
+        if session is None:
+            self.close_connection = True
+            self.send_json(404, {'error': '上传会话不存在'})
+            return
+        try:
+            length = self.headers.get('Content-Length')
+            if length is None:
+                self.close_connection = True
+                self.send_json(411, {'error': '缺少Content-Length'})
+                return
+            offset = self.headers.get('X-Chunk-Offset')
+            # 块写入初始化时已预留（预分配）的空间，不再检查磁盘
+            with self.server.sessions.writing(upload_id), \
+                    self.server.admission.admit(int(length), check_disk=False):
+                sha256 = session.write_chunk(n, self.rfile, int(length),
+                                             offset=int(offset) if offset is not None else None,
+                                             sha256=self.headers.get('X-Chunk-SHA256'))
+        except Rejected as e:
+            self.send_rejected(e)
+            return
+        except SessionBusy as e:
+            self.close_connection = True
+            self.send_json(409, {'error': str(e)})
+            return
+        except ValueError as e:
+            self.close_connection = True
+            self.send_json(400, {'error': str(e)})
+            return
+        except FileNotFoundError:
+            # 会话在写入前已被保存或清理
+            self.close_connection = True
+            self.send_json(404, {'error': '上传会话不存在'})
+            return
+        except OSError as e:
+            self.close_connection = True
+            print(f"❌ 分块写入错误 ({upload_id}/{n}): {e}")
+            self.send_json(500, {'error': f'服务器内部错误: {str(e)}'})
+            return
+        self.send_json(200, {'success': True, 'upload_id': upload_id, 'chunk': n, 'sha256': sha256})
+
+    def handle_upload_status(self, upload_id):
+        """分块上传：查询已收到的块"""
+        session = self.server.sessions.get(upload_id)
+        if session is None:
+            self.send_json(404, {'error': '上传会话不存在'})
+            return
+        self.send_json(200, session.status())
+
+    def handle_upload_finalize(self, upload_id):
+        """分块上传：校验SHA-256并保存"""
+        try:
+            data = self.read_json()
+        except ValueError as e:
+            self.send_json(400, {'error': str(e)})
+            return
+        try:
+            with self.server.sessions.finalizing(upload_id):
+                session = self.server.sessions.get(upload_id)
+                if session is None:
+                    self.send_json(404, {'error': '上传会话不存在'})
+                    return
+                try:
+                    sha256 = session.verify(data.get('sha256'))
+                except ChunkError as e:
+                    self.send_json(409, dict(session.status(), error=str(e)))
+                    return
+                fields = dict(session.meta['fields'])
+                fields.update(form_fields(data))
+                response = self.save_video(session.data_path, session.meta['filename'],
+                                           session.meta['size'], sha256, fields)
+                self.server.sessions.remove(upload_id)
+        except SessionBusy as e:
+            self.send_json(409, {'error': str(e)})
+            return
+        except ValueError as e:
+            self.send_json(400, {'error': str(e)})
+            return
+        except FileNotFoundError:
+            self.send_json(404, {'error': '上传会话不存在'})
+            return
+        except Exception as e:
+            print(f"❌ 分块上传保存错误 ({upload_id}): {e}")
+            self.send_json(500, {'error': f'服务器内部错误: {str(e)}'})
+            return
+        self.send_json(200, response)
+
+    def handle_health(self):
+        """健康检查"""
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        
+        response = json.dumps({
+            'status': 'ok',
+            'timestamp': datetime.now().isoformat(),
+            'server': 'Python Simple Video Upload Server'
+        })
+        self.wfile.write(response.encode())
+
+    def handle_list_videos(self):
+        """列出已上传的视频（查询目录数据库，支持分页、过滤和ETag）"""
+        query = parse_qs(urlparse(self.path).query)
+        try:
+            # SQLite 把负数 LIMIT 当作不限制：限制在 1..MAX_PAGE_SIZE
+            limit = max(1, min(int(query.get('limit', [PAGE_SIZE])[0]), MAX_PAGE_SIZE))
+            offset = max(int(query.get('offset', [0])[0]), 0)
+            filters = query_filters(query)
+        except ValueError:
+            self.send_json(400, {'error': '无效的查询参数'})
+            return
+
+        # ETag：目录的写入次数 + 查询参数，目录未变化时返回304
+        etag = f'"{self.server.catalog.generation()}-{zlib.crc32(self.path.encode()):08x}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        total, videos = self.server.catalog.list(limit=limit, offset=offset, **filters)
+        body = json.dumps({
+            'success': True,
+            'count': len(videos),
+            'total': total,
+            'limit': limit,
+            'offset': offset,
+            'videos': videos
+        }, ensure_ascii=False).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def video_path(self, row):
+        """视频文件的位置：内容存储中的对象，旧版视频为 uploads/<文件名>"""
+        if row['sha256'] and self.server.store.exists(row['sha256']):
+            return self.server.store.path(row['sha256'])
+        return os.path.join(os.getcwd(), 'uploads', row['filename'])
+
+    def handle_download(self, filename, head_only=False):
+        """下载视频：支持 Range 和 ETag/If-None-Match，文件内容用 sendfile 直接从内核发送"""
+        row = self.server.catalog.get(os.path.basename(filename))
+        if row is None:
+            self.send_json(404, {'error': '视频不存在'})
+            return
+        try:
+            f = open(self.video_path(row), 'rb')
+        except FileNotFoundError:
+            self.send_json(404, {'error': '视频文件不存在'})
+            return
+
+        with f:
+            stat = os.fstat(f.fileno())
+            size = stat.st_size
+            etag = f'"{row["sha256"]}"' if row['sha256'] else f'"{size:x}-{stat.st_mtime_ns:x}"'
+
+            if_none_match = self.headers.get('If-None-Match')
+            if if_none_match and (if_none_match.strip() == '*' or etag in [t.strip() for t in if_none_match.split(',')]):
+                self.send_response(304)
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+
+            # If-Range 与当前ETag不一致时忽略 Range，发送完整文件
+            byte_range = None
+            if self.headers.get('If-Range') in (None, etag):
+                try:
+                    byte_range = parse_range(self.headers.get('Range'), size)
+                except ValueError:
+                    self.send_response(416)
+                    self.send_header('Access-Control-Allow-Origin', '*')
+                    self.send_header('Content-Range', f'bytes */{size}')
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+            start, end = byte_range or (0, size - 1)
+            length = end - start + 1 if size else 0
+
+            self.send_response(206 if byte_range else 200)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Expose-Headers', 'Content-Range, Content-Length, ETag, Accept-Ranges')
+            self.send_header('Content-Type', CONTENT_TYPES.get(os.path.splitext(row['filename'])[1].lower(),
+                                                               'application/octet-stream'))
+            self.send_header('Content-Length', str(length))
+            self.send_header('Accept-Ranges', 'bytes')
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+            if byte_range:
+                self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+            self.end_headers()
+            if head_only or not length:
+                return
+
+            # socket.sendfile 内部使用 os.sendfile（零拷贝），并处理连接的超时设置
+            sent = self.connection.sendfile(f, offset=start, count=length)
+            if sent != length:
+                self.close_connection = True
+
+    def export_entries(self, filters, manifest):
+        """导出包的条目：每个视频及其元数据JSON（<视频文件名>.json，例如 a.webm.json），最后是 manifest.json"""
+        for row in self.server.catalog.iter_recordings(**filters):
+            path = self.video_path(row)
+            if not os.path.exists(path):
+                continue
+            yield ArchiveEntry(row['filename'], path=path)
+            metadata = self.server.catalog.get_metadata(row['filename']) or row
+            # 保留视频扩展名，a.webm 和 a.mp4 的元数据不会同名
+            sidecar = row['filename'] + '.json'
+            yield ArchiveEntry(sidecar, data=json.dumps(metadata, ensure_ascii=False, indent=2).encode('utf-8'))
+            manifest.append({'fileName': row['filename'], 'sidecarFileName': sidecar,
+                             'size': row['size'], 'sha256': row['sha256']})
+        yield ArchiveEntry('manifest.json', data=json.dumps({
+            'exportedAt': datetime.now().isoformat(),
+            'filters': {key: value for key, value in filters.items() if value is not None},
+            'count': len(manifest),
+            'videos': manifest
+        }, ensure_ascii=False, indent=2).encode('utf-8'))
+
+    def handle_export(self):
+        """流式导出：?format=zip|tar 以及与 /videos 相同的过滤参数"""
+        query = parse_qs(urlparse(self.path).query)
+        archive_format = query.get('format', ['zip'])[0]
+        try:
+            filters = query_filters(query)
+        except ValueError:
+            self.send_json(400, {'error': '无效的查询参数'})
+            return
+        if archive_format not in ARCHIVE_WRITERS:
+            self.send_json(400, {'error': 'format 应为 zip 或 tar'})
+            return
+        write, content_type = ARCHIVE_WRITERS[archive_format]
+        name = '_'.join(['export'] + [str(value) for value in filters.values() if value is not None]
+                        + [datetime.now().strftime('%Y%m%d_%H%M%S')])
+
+        # 长度事先未知：不发送 Content-Length，写完后关闭连接
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Disposition', f'attachment; filename="{quote(name)}.{archive_format}"')
+        self.end_headers()
+        self.close_connection = True
+
+        manifest = []
+        start = time.time()
+        try:
+            size = write(self.wfile, self.export_entries(filters, manifest))
+        except (BrokenPipeError, ConnectionResetError):
+            print(f"⚠️  导出中断：客户端已断开 ({len(manifest)} 个视频已发送)")
+            return
+        print(f"📦 导出 {len(manifest)} 个视频 ({size / 1024 / 1024:.2f} MB, {archive_format}) "
+              f"用时 {time.time() - start:.1f}s")
+
+    def metric_gauges(self):
+        """/metrics 的额外指标：正在传输的上传、磁盘用量、视频数"""
+        admission = self.server.admission.stats()
+        disk = shutil.disk_usage(self.server.admission.disk_path)
+        gauges = {
+            'uploads_in_flight': ('Uploads currently being received.', admission['uploads']),
+            'uploads_in_flight_max': ('Configured concurrent upload limit.', admission['max_uploads']),
+            'upload_bytes_in_flight': ('Bytes reserved by uploads being received.', admission['inflight_bytes']),
+            'upload_bytes_in_flight_max': ('Configured in-flight byte budget.', admission['max_inflight_bytes']),
+            'upload_bytes_reserved': ('Disk bytes reserved by open chunked upload sessions.',
+                                      admission['reserved_bytes']),
+        }
+        gauges.update({
+            'disk_total_bytes': ('Total size of the uploads filesystem.', disk.total),
+            'disk_used_bytes': ('Used bytes on the uploads filesystem.', disk.used),
+            'disk_free_bytes': ('Free bytes on the uploads filesystem.', disk.free),
+            'videos': ('Videos in the catalog.', self.server.catalog.count()),
+        })
+        return gauges
+
+    def metric_counters(self):
+        """/metrics 的额外计数器：按原因统计的准入拒绝次数"""
+        rejected = self.server.admission.stats()['rejected']
+        return {'uploads_rejected_total': ('Uploads rejected by admission control.', 'reason', rejected)}
+
+    def handle_metrics(self):
+        """请求指标：Prometheus 文本格式，?format=json 时返回JSON"""
+        query = parse_qs(urlparse(self.path).query)
+        gauges = self.metric_gauges()
+        counters = self.metric_counters()
+        if query.get('format', [''])[0] == 'json':
+            self.send_json(200, self.server.metrics.as_dict(gauges, counters))
+            return
+        body = self.server.metrics.render_prometheus(gauges, counters).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def handle_stats(self):
+        """元数据聚合查询：?by=session（削波率分布）或 ?by=sentence（每个句子的视频数）"""
+        query = parse_qs(urlparse(self.path).query)
+        by = query.get('by', ['session'])[0]
+        if by == 'session':
+            rows = self.server.catalog.clipping_by_session()
+        elif by == 'sentence':
+            rows = self.server.catalog.clips_by_sentence(query.get('sentence_set', [None])[0])
+        else:
+            self.send_json(400, {'error': 'by 应为 session 或 sentence'})
+            return
+        self.send_json(200, {'success': True, 'by': by, 'count': len(rows), 'rows': rows})
+
+class PooledHTTPServer(HTTPServer):
+    """在固定大小的线程池中处理请求的 HTTPServer"""
+
+    def __init__(self, server_address, handler_class, max_workers=MAX_WORKERS):
+        super().__init__(server_address, handler_class)
+        self.max_workers = max_workers
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='request')
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+def run_server(port=3000, max_workers=MAX_WORKERS, max_uploads=MAX_UPLOADS,
+               max_inflight_bytes=MAX_INFLIGHT_BYTES, min_free_bytes=MIN_FREE_BYTES):
+    """启动服务器"""
+    server_address = ('', port)
+    httpd = PooledHTTPServer(server_address, VideoUploadHandler, max_workers)
+    uploads_dir = os.path.join(os.getcwd(), 'uploads')
+    os.makedirs(uploads_dir, exist_ok=True)
+    httpd.metrics = ServerMetrics()
+    httpd.admission = UploadAdmission(uploads_dir, max_uploads, max_inflight_bytes, min_free_bytes, RETRY_AFTER)
+    httpd.sessions = UploadSessions(os.path.join(uploads_dir, '.sessions'), max_size=MAX_UPLOAD_BYTES,
+                                    on_remove=httpd.admission.release_session)
+    httpd.catalog = RecordingCatalog(os.path.join(uploads_dir, 'catalog.db'))
+    httpd.store = ContentStore(os.path.join(uploads_dir, 'objects'))
+    added, removed = httpd.catalog.sync_directory(uploads_dir, httpd.store)
+    
+    print(f"\n🎥 Python视频上传服务器已启动")
+    print(f"📡 服务地址: http://localhost:{port}")
+    print(f"📁 上传目录: {uploads_dir}")
+    print(f"🗂️  视频目录: {added} 个补录, {removed} 个已删除")
+    print(f"🧵 工作线程: {max_workers}")
+    print(f"🚦 准入控制: 最多 {max_uploads} 个同时上传, 传输中 ≤ {max_inflight_bytes / 1024 / 1024:.0f} MB, "
+          f"磁盘保留 {min_free_bytes / 1024 / 1024:.0f} MB")
+    print(f"\n可用接口:")
+    print(f"  POST /upload        - 上传视频")
+    print(f"  POST /upload/init   - 分块上传: 创建会话")
+    print(f"  PUT  /upload/<id>/chunks/<n> - 分块上传: 上传第n块")
+    print(f"  GET  /upload/<id>   - 分块上传: 查询已收到的块")
+    print(f"  POST /upload/<id>/finalize   - 分块上传: 校验并保存")
+    print(f"  GET  /videos        - 获取视频列表 (?limit&offset&sentence_set&participant&index)")
+    print(f"  GET  /videos/<文件名> - 下载视频 (支持Range)")
+    print(f"  GET  /export        - 导出视频和元数据 (?format=zip|tar 及过滤参数)")
+    print(f"  GET  /stats         - 元数据统计 (?by=session|sentence)")
+    print(f"  GET  /metrics       - 请求指标 (Prometheus格式, ?format=json)")
+    print(f"  GET  /health        - 健康检查")
+    print(f"\n在录制工具中使用: http://localhost:{port}/upload")
+    print(f"\n按 Ctrl+C 停止服务器\n")
+    
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n\n🛑 服务器已停止")
+    finally:
+        httpd.server_close()
+        httpd.catalog.close()
+
+if __name__ == '__main__':
+    # python simple_server.py [端口] [--max-uploads N] [--max-inflight-mb N] [--min-free-mb N]
+    args = sys.argv[1:]
+    options = {'--max-uploads': str(MAX_UPLOADS), '--max-inflight-mb': str(MAX_INFLIGHT_BYTES >> 20),
+               '--min-free-mb': str(MIN_FREE_BYTES >> 20)}
+    for name in options:
+        if name in args:
+            i = args.index(name)
+            options[name] = args[i + 1]
+            del args[i:i + 2]
+    port = int(args[0]) if args else 3000
+    run_server(port, max_uploads=int(options['--max-uploads']),
+               max_inflight_bytes=int(options['--max-inflight-mb']) << 20,
+               min_free_bytes=int(options['--min-free-mb']) << 20)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Token Corpus - 预编译的 token ID 语料格式
+把句子文件分词一次，保存为：
+    vocab.json        词汇表（token ID -> 词）
+    tokens.npy        int32 扁平 token ID 数组
+    offsets.npy       int64 句子偏移量，第 i 句为 tokens[offsets[i]:offsets[i+1]]
+    text.bin          原句 UTF-8 字节
+    text_offsets.npy  原句字节偏移量
+    meta.json         源文件信息（大小、修改时间），用于判断是否需要重建
+数组均以 mmap 方式加载；频率、覆盖、相似度、选择等工具可以直接使用，不再重复分词。
+
+分词模式（每种模式单独编译一份语料）:
+    expand    展开缩写、去掉所有格 's（默认，用于与词表匹配）   <源文件>.corpus
+    split     Treebank 风格拆分: do n't, dog 's                  <源文件>.split.corpus
+    surface   只小写、去除标点: don't, dog's（实际说出的词，用于音素统计）  <源文件>.surface.corpus
+
+用法:
+    python token_corpus.py selected_sentences.txt [--split | --surface]
+    from token_corpus import load_corpus
+    corpus = load_corpus('selected_sentences.txt', mode='surface')
+"""
+
+import json
+import os
+import re
+import sys
+import numpy as np
+
+from word_tokenizer import surface_tokens, tokenize
+
+CORPUS_VERSION = 2
+
+TOKENIZERS = {
+    'expand': tokenize,
+    'split': lambda text: tokenize(text, expand=False),
+    'surface': surface_tokens,
+}
+
+_NUMBERED_LINE = re.compile(r'^\d+\.\s+')
+
+
+def read_sentence_file(path):
+    """读取句子文件：.json 句子列表，或 .txt 每行一句（跳过 # 注释行，去掉 "N. " 编号）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.json'):
+            data = json.load(f)
+            if isinstance(data, dict):
+                data = data.get('selected_sentences', [])
+            for sentence in data:
+                if sentence.strip():
+                    yield sentence.strip()
+            return
+
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            yield _NUMBERED_LINE.sub('', line)
+
+
+def corpus_dir_for(path, mode='expand'):
+    """语料目录：<源文件>.corpus（展开缩写），其他模式为 <源文件>.<模式>.corpus"""
+    return f"{path}.corpus" if mode == 'expand' else f"{path}.{mode}.corpus"
+
+
+def build_corpus(path, out_dir=None, mode='expand'):
+    """按 mode 分词并保存 token ID 语料"""
+    tokenize_text = TOKENIZERS[mode]
+    out_dir = out_dir or corpus_dir_for(path, mode)
+    print(f"🔄 Compiling {path} -> {out_dir} ...")
+
+    vocab = {}
+    tokens = []
+    offsets = [0]
+    text = bytearray()
+    text_offsets = [0]
+
+    for sentence in read_sentence_file(path):
+        for token in tokenize_text(sentence):
+            token_id = vocab.get(token)
+            if token_id is None:
+                token_id = vocab[token] = len(vocab)
+            tokens.append(token_id)
+        offsets.append(len(tokens))
+        text.extend(sentence.encode('utf-8'))
+        text_offsets.append(len(text))
+
+    os.makedirs(out_dir, exist_ok=True)
+    np.save(os.path.join(out_dir, 'tokens.npy'), np.array(tokens, dtype=np.int32))
+    np.save(os.path.join(out_dir, 'offsets.npy'), np.array(offsets, dtype=np.int64))
+    np.save(os.path.join(out_dir, 'text_offsets.npy'), np.array(text_offsets, dtype=np.int64))
+    with open(os.path.join(out_dir, 'text.bin'), 'wb') as f:
+        f.write(text)
+    with open(os.path.join(out_dir, 'vocab.json'), 'w', encoding='utf-8') as f:
+        json.dump(list(vocab), f, ensure_ascii=False)
+
+    stat = os.stat(path)
+    meta = {
+        'version': CORPUS_VERSION,
+        'source': os.path.abspath(path),
+        'source_size': stat.st_size,
+        'source_mtime': stat.st_mtime,
+        'mode': mode,
+        'num_sentences': len(offsets) - 1,
+        'num_tokens': len(tokens),
+        'vocab_size': len(vocab),
+    }
+    with open(os.path.join(out_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+    print(f"✅ {meta['num_sentences']} sentences, {meta['num_tokens']} tokens, {meta['vocab_size']} types")
+    return out_dir
+
+
+def is_corpus_stale(path, out_dir):
+    """语料不存在、版本不同或源文件已修改时返回 True"""
+    meta_path = os.path.join(out_dir, 'meta.json')
+    if not os.path.exists(meta_path):
+        return True
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('version') != CORPUS_VERSION:
+        return True
+    if not os.path.exists(path):
+        return False
+    stat = os.stat(path)
+    return meta['source_size'] != stat.st_size or meta['source_mtime'] != stat.st_mtime
+
+
+class TokenCorpus:
+    def __init__(self, corpus_dir):
+        self.corpus_dir = corpus_dir
+        with open(os.path.join(corpus_dir, 'meta.json'), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        with open(os.path.join(corpus_dir, 'vocab.json'), 'r', encoding='utf-8') as f:
+            self.vocab = json.load(f)
+        self.word_to_id = {word: i for i, word in enumerate(self.vocab)}
+        self.tokens = np.load(os.path.join(corpus_dir, 'tokens.npy'), mmap_mode='r')
+        self.offsets = np.load(os.path.join(corpus_dir, 'offsets.npy'), mmap_mode='r')
+        self.text_offsets = np.load(os.path.join(corpus_dir, 'text_offsets.npy'), mmap_mode='r')
+        self.text = np.memmap(os.path.join(corpus_dir, 'text.bin'), dtype=np.uint8, mode='r') \
+            if self.text_offsets[-1] > 0 else np.zeros(0, dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def sentence_ids(self, i):
+        """第 i 句的 token ID 数组"""
+        return self.tokens[self.offsets[i]:self.offsets[i + 1]]
+
+    def sentence_words(self, i):
+        """第 i 句的 token 列表"""
+        return [self.vocab[t] for t in self.sentence_ids(i)]
+
+    def sentence_text(self, i):
+        """第 i 句原文"""
+        return bytes(self.text[self.text_offsets[i]:self.text_offsets[i + 1]]).decode('utf-8')
+
+    def sentences(self):
+        for i in range(len(self)):
+            yield self.sentence_text(i)
+
+    def sentence_lengths(self):
+        return np.diff(self.offsets)
+
+    def sentence_index(self):
+        """每个 token 所属的句子编号（与 tokens 等长）"""
+        return np.repeat(np.arange(len(self), dtype=np.int32), self.sentence_lengths())
+
+    def word_counts(self):
+        """每个 token ID 的出现次数"""
+        return np.bincount(self.tokens, minlength=len(self.vocab))
+
+    def counter(self):
+        """{词: 次数}，用于替换逐行 Counter 统计"""
+        counts = self.word_counts()
+        return {self.vocab[i]: int(counts[i]) for i in np.flatnonzero(counts)}
+
+    def ids(self, words):
+        """词汇列表 -> token ID 数组（不在词汇表中的词被忽略）"""
+        return np.array([self.word_to_id[w] for w in words if w in self.word_to_id], dtype=np.int32)
+
+
+def load_corpus(path, mode='expand', out_dir=None):
+    """加载语料；不存在或源文件已更新时先编译"""
+    out_dir = out_dir or corpus_dir_for(path, mode)
+    if is_corpus_stale(path, out_dir):
+        build_corpus(path, out_dir, mode)
+    return TokenCorpus(out_dir)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python token_corpus.py <sentence_file> [--split | --surface]")
+        return
+    mode = 'split' if '--split' in sys.argv[2:] else 'surface' if '--surface' in sys.argv[2:] else 'expand'
+    corpus = load_corpus(sys.argv[1], mode=mode)
+    counts = corpus.word_counts()
+    print(f"\n📊 Top 10 tokens:")
+    for i in np.argsort(-counts, kind='stable')[:10]:
+        print(f"   {corpus.vocab[i]:10s} {int(counts[i]):8d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ import re
 import random
 import matplotlib.pyplot as plt
 from collections import defaultdict, Counter
+from word_tokenizer import clean_sentence
 import nltk
 try:
     from nltk.corpus import cmudict
@@ -43,10 +44,7 @@ class UpdatedSentenceProcessor:
         
     def clean_sentence(self, sentence):
         """Clean sentence"""
-        sentence = sentence.lower()
-        sentence = re.sub(r'[^\w\s]', '', sentence)
-        sentence = re.sub(r'\s+', ' ', sentence).strip()
-        return sentence
+        return clean_sentence(sentence)
     
     def get_word_phonemes(self, word):
         """Get phonemes of a word"""
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Upload Admission - 上传准入控制
+在读取请求体之前决定是否接收一次上传，突发的大量上传时服务器平稳降级，而不是耗尽磁盘：
+
+    - 同时进行的上传数不超过 max_uploads
+    - 正在传输的字节总数（按 Content-Length 预留）不超过 max_inflight_bytes
+    - 磁盘剩余空间扣除已预留的字节后，仍不少于 min_free_bytes
+
+超出并发或字节预算时返回 429 + Retry-After；磁盘空间不足时返回 507。
+
+    with admission.admit(content_length):
+        ...读取并保存请求体...
+
+分块上传在初始化时按完整大小预留磁盘空间（reserve），会话保存或过期时释放（release_session）；
+数据文件预分配之后这部分空间已反映在磁盘剩余空间中（mark_allocated），不再重复扣除，
+各块写入预分配的空间，不再检查磁盘（admit(..., check_disk=False)）。
+"""
+
+import shutil
+import threading
+
+
+class Rejected(Exception):
+    """上传被拒绝：status 为 HTTP 状态码，retry_after 为建议的重试秒数（None 表示重试无意义）"""
+
+    def __init__(self, status, message, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class _Ticket:
+    def __init__(self, admission, nbytes):
+        self.admission = admission
+        self.nbytes = nbytes
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.admission.release(self.nbytes)
+
+
+class UploadAdmission:
+    def __init__(self, disk_path, max_uploads=8, max_inflight_bytes=8 << 30, min_free_bytes=2 << 30,
+                 retry_after=5):
+        self.disk_path = disk_path
+        self.max_uploads = max_uploads
+        self.max_inflight_bytes = max_inflight_bytes
+        self.min_free_bytes = min_free_bytes
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.uploads = 0
+        self.inflight_bytes = 0
+        self.reservations = {}      # 分块上传会话 -> [预留字节数, 是否已预分配]
+        self.rejected = {'concurrency': 0, 'bytes': 0, 'disk': 0, 'too_large': 0}
+
+    def _check_disk(self, nbytes):
+        """磁盘剩余空间（扣除正在传输和尚未预分配的预留）不足以再写入 nbytes 时抛出 Rejected(507)"""
+        pending = sum(size for size, allocated in self.reservations.values() if not allocated)
+        free = shutil.disk_usage(self.disk_path).free - self.inflight_bytes - pending
+        if free - nbytes < self.min_free_bytes:
+            self.rejected['disk'] += 1
+            raise Rejected(507, f'服务器磁盘空间不足 (剩余 {max(free, 0) / 1024 / 1024:.0f} MB)',
+                           retry_after=self.retry_after * 12)
+
+    def admit(self, nbytes, check_disk=True):
+        """
+        预留一次上传；不能接收时抛出 Rejected。返回的对象在 with 结束时释放预留
+        写入已预留空间的分块上传传 check_disk=False
+        """
+        with self.lock:
+            if nbytes > self.max_inflight_bytes:
+                self.rejected['too_large'] += 1
+                raise Rejected(413, f'上传超过服务器的传输预算 ({self.max_inflight_bytes} 字节)')
+            if self.uploads >= self.max_uploads:
+                self.rejected['concurrency'] += 1
+                raise Rejected(429, f'同时上传数已达上限 ({self.max_uploads})，请稍后重试',
+                               retry_after=self.retry_after)
+            if self.inflight_bytes + nbytes > self.max_inflight_bytes:
+                self.rejected['bytes'] += 1
+                raise Rejected(429, '正在传输的数据量已达上限，请稍后重试', retry_after=self.retry_after)
+            if check_disk:
+                self._check_disk(nbytes)
+            self.uploads += 1
+            self.inflight_bytes += nbytes
+        return _Ticket(self, nbytes)
+
+    def reserve(self, key, nbytes):
+        """为分块上传会话预留 nbytes 磁盘空间；空间不足时抛出 Rejected(507)"""
+        with self.lock:
+            self._check_disk(nbytes)
+            self.reservations[key] = [nbytes, False]
+
+    def mark_allocated(self, key):
+        """会话的数据文件已预分配，预留的空间已计入磁盘用量"""
+        with self.lock:
+            if key in self.reservations:
+                self.reservations[key][1] = True
+
+    def release_session(self, key):
+        with self.lock:
+            self.reservations.pop(key, None)
+
+    def release(self, nbytes):
+        with self.lock:
+            self.uploads -= 1
+            self.inflight_bytes -= nbytes
+
+    def stats(self):
+        with self.lock:
+            return {
+                'uploads': self.uploads,
+                'max_uploads': self.max_uploads,
+                'inflight_bytes': self.inflight_bytes,
+                'max_inflight_bytes': self.max_inflight_bytes,
+                'reserved_sessions': len(self.reservations),
+                'reserved_bytes': sum(size for size, _ in self.reservations.values()),
+                'rejected': dict(self.rejected),
+            }
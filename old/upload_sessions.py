@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Upload Sessions - 可续传的分块上传
+大视频分成固定大小的块上传，网络中断后只需重传缺失的块：
+
+    POST /upload/init                 {filename, size, sha256?, chunk_size?, sentence, index, timestamp}
+    PUT  /upload/<id>/chunks/<n>      请求体为第 n 块（可带 X-Chunk-Offset / X-Chunk-SHA256 校验）
+    GET  /upload/<id>                 已收到和缺失的块
+    POST /upload/<id>/finalize        所有块到齐后校验 SHA-256，移动到 uploads/
+
+每个会话保存在 <root>/<id>/：meta.json、预分配大小的 data 文件（各块按偏移写入）、
+received 位图（每块一个字节），服务器重启后会话仍可继续。
+
+同一会话的多个块可以并行写入；finalize 等正在写入的块完成后才移动数据文件，
+开始 finalize 之后到达的块返回 SessionBusy：
+
+    with sessions.writing(upload_id):       session.write_chunk(...)
+    with sessions.finalizing(upload_id):    session.verify(); ...; sessions.remove(upload_id)
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+DEFAULT_CHUNK_SIZE = 8 << 20
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 64 << 20
+READ_SIZE = 64 * 1024
+SESSION_TTL = 24 * 3600     # 超过该秒数未活动的会话被清理
+
+_UPLOAD_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+class ChunkError(ValueError):
+    """块或会话参数错误"""
+
+
+class SessionBusy(ChunkError):
+    """会话正在 finalize，不能再写入块或重复 finalize"""
+
+
+class UploadSession:
+    def __init__(self, directory, meta):
+        self.directory = directory
+        self.meta = meta
+        self.id = meta['upload_id']
+        self.data_path = os.path.join(directory, 'data')
+        self.bitmap_path = os.path.join(directory, 'received')
+
+    @property
+    def num_chunks(self):
+        return self.meta['num_chunks']
+
+    def chunk_range(self, n):
+        """第 n 块的 (偏移, 长度)"""
+        if not 0 <= n < self.num_chunks:
+            raise ChunkError(f'块序号超出范围: {n} (共 {self.num_chunks} 块)')
+        offset = n * self.meta['chunk_size']
+        return offset, min(self.meta['chunk_size'], self.meta['size'] - offset)
+
+    def _bitmap(self):
+        with open(self.bitmap_path, 'rb') as f:
+            return f.read()
+
+    def received(self):
+        return [n for n, flag in enumerate(self._bitmap()) if flag]
+
+    def missing(self):
+        return [n for n, flag in enumerate(self._bitmap()) if not flag]
+
+    def status(self):
+        bitmap = self._bitmap()
+        received = [n for n, flag in enumerate(bitmap) if flag]
+        return {
+            'upload_id': self.id,
+            'filename': self.meta['filename'],
+            'size': self.meta['size'],
+            'chunk_size': self.meta['chunk_size'],
+            'num_chunks': self.num_chunks,
+            'received': received,
+            'missing': [n for n, flag in enumerate(bitmap) if not flag],
+            'complete': len(received) == self.num_chunks,
+        }
+
+    def write_chunk(self, n, rfile, length, offset=None, sha256=None):
+        """从 rfile 流式读取第 n 块并写入对应偏移；校验通过后在位图中标记"""
+        start, expected = self.chunk_range(n)
+        if offset is not None and offset != start:
+            raise ChunkError(f'块 {n} 的偏移应为 {start}，收到 {offset}')
+        if length != expected:
+            raise ChunkError(f'块 {n} 的长度应为 {expected}，收到 {length}')
+
+        digest = hashlib.sha256()
+        fd = os.open(self.data_path, os.O_WRONLY)
+        try:
+            position = start
+            remaining = length
+            while remaining > 0:
+                data = rfile.read(min(READ_SIZE, remaining))
+                if not data:
+                    raise ChunkError(f'块 {n} 不完整')
+                os.pwrite(fd, data, position)
+                digest.update(data)
+                position += len(data)
+                remaining -= len(data)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+        if sha256 is not None and digest.hexdigest() != sha256.lower():
+            raise ChunkError(f'块 {n} 的SHA-256不匹配')
+        self._mark(n)
+        return digest.hexdigest()
+
+    def _mark(self, n):
+        fd = os.open(self.bitmap_path, os.O_WRONLY)
+        try:
+            os.pwrite(fd, b'\x01', n)
+        finally:
+            os.close(fd)
+        os.utime(self.directory)
+
+    def verify(self, sha256=None):
+        """所有块到齐后计算整个文件的 SHA-256，与初始化（或 finalize）时给出的值比较"""
+        missing = self.missing()
+        if missing:
+            raise ChunkError(f'还缺少 {len(missing)} 个块: {missing[:20]}')
+        digest = hashlib.sha256()
+        with open(self.data_path, 'rb') as f:
+            for data in iter(lambda: f.read(1 << 20), b''):
+                digest.update(data)
+        expected = sha256 or self.meta.get('sha256')
+        if expected and digest.hexdigest() != expected.lower():
+            raise ChunkError('文件SHA-256不匹配')
+        return digest.hexdigest()
+
+
+class UploadSessions:
+    def __init__(self, root, chunk_size=DEFAULT_CHUNK_SIZE, max_size=None, ttl=SESSION_TTL, on_remove=None):
+        """on_remove(upload_id): 会话被删除（保存后或过期）时调用，例如释放预留的磁盘空间"""
+        self.root = root
+        self.on_remove = on_remove
+        self.chunk_size = chunk_size
+        self.max_size = max_size
+        self.ttl = ttl
+        self.lock = threading.Condition()
+        self._writers = {}          # upload_id -> 正在写入的块数
+        self._finalizing = set()    # 正在 finalize 的 upload_id
+        os.makedirs(root, exist_ok=True)
+
+    @contextmanager
+    def writing(self, upload_id):
+        """写入一个块期间持有；会话正在 finalize 时抛出 SessionBusy"""
+        with self.lock:
+            if upload_id in self._finalizing:
+                raise SessionBusy('上传会话正在保存，不能再写入块')
+            self._writers[upload_id] = self._writers.get(upload_id, 0) + 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                self._writers[upload_id] -= 1
+                if not self._writers[upload_id]:
+                    del self._writers[upload_id]
+                self.lock.notify_all()
+
+    @contextmanager
+    def finalizing(self, upload_id):
+        """finalize 期间持有：等待正在写入的块完成，并拒绝新的写入和重复的 finalize"""
+        with self.lock:
+            if upload_id in self._finalizing:
+                raise SessionBusy('上传会话正在保存')
+            self._finalizing.add(upload_id)
+            self.lock.wait_for(lambda: upload_id not in self._writers)
+        try:
+            yield
+        finally:
+            with self.lock:
+                self._finalizing.discard(upload_id)
+
+    def create(self, filename, size, sha256=None, chunk_size=None, fields=None, upload_id=None):
+        """新建会话并预分配数据文件；meta['preallocated'] 表示数据文件已实际占用磁盘空间"""
+        if not isinstance(size, int) or isinstance(size, bool) or size <= 0:
+            raise ChunkError('size 必须是正整数')
+        if self.max_size is not None and size > self.max_size:
+            raise ChunkError(f'文件超过大小限制 ({self.max_size} 字节)')
+        chunk_size = chunk_size or self.chunk_size
+        if not isinstance(chunk_size, int) or isinstance(chunk_size, bool) \
+                or not MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE:
+            raise ChunkError(f'chunk_size 应为 {MIN_CHUNK_SIZE} 到 {MAX_CHUNK_SIZE} 之间的整数')
+        if filename is not None and not isinstance(filename, str):
+            raise ChunkError('文件名必须是字符串')
+        if sha256 is not None and not isinstance(sha256, str):
+            raise ChunkError('sha256 必须是字符串')
+        filename = os.path.basename(filename or '')
+        if not filename:
+            raise ChunkError('缺少文件名')
+
+        self.expire()
+        upload_id = upload_id or uuid.uuid4().hex
+        directory = os.path.join(self.root, upload_id)
+        os.makedirs(directory)
+        meta = {
+            'upload_id': upload_id,
+            'filename': filename,
+            'size': size,
+            'sha256': sha256,
+            'chunk_size': chunk_size,
+            'num_chunks': (size + chunk_size - 1) // chunk_size,
+            'fields': fields or {},
+            'created': time.time(),
+            'preallocated': hasattr(os, 'posix_fallocate'),
+        }
+        session = UploadSession(directory, meta)
+        try:
+            with open(session.data_path, 'wb') as f:
+                if hasattr(os, 'posix_fallocate'):
+                    os.posix_fallocate(f.fileno(), 0, size)
+                else:
+                    f.truncate(size)
+            with open(session.bitmap_path, 'wb') as f:
+                f.write(bytes(meta['num_chunks']))
+            with open(os.path.join(directory, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+        except OSError:
+            # 例如预分配时磁盘已满：不留下不完整的会话
+            shutil.rmtree(directory, ignore_errors=True)
+            raise
+        return session
+
+    def get(self, upload_id):
+        """已有会话；不存在时返回 None"""
+        if not _UPLOAD_ID.match(upload_id or ''):
+            return None
+        directory = os.path.join(self.root, upload_id)
+        try:
+            with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+                return UploadSession(directory, json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def remove(self, upload_id):
+        if _UPLOAD_ID.match(upload_id or ''):
+            shutil.rmtree(os.path.join(self.root, upload_id), ignore_errors=True)
+            if self.on_remove:
+                self.on_remove(upload_id)
+
+    def expire(self):
+        """清理长时间没有活动的会话"""
+        cutoff = time.time() - self.ttl
+        for name in os.listdir(self.root):
+            directory = os.path.join(self.root, name)
+            with self.lock:
+                if name in self._writers or name in self._finalizing:
+                    continue
+            try:
+                expired = _UPLOAD_ID.match(name) and os.path.getmtime(directory) < cutoff
+            except FileNotFoundError:
+                continue
+            if expired:
+                self.remove(name)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Vocabulary Filter Store - 词汇表过滤结果存储
+针对一个基础词汇表，记录每个句子的词汇表外 (OOV) token 集合，以及每个词出现在哪些句子中。
+词汇表改变时，过滤结果变成集合查询，不需要重新读取或分词整个语料：
+  - 新增词汇 A：OOV 集合非空且是 A 的子集的句子变为有效
+  - 删除词汇 R：包含 R 中任意词的句子变为无效
+
+用法:
+    python vocab_filter_store.py                   # 交互式：+词 / -词 查看影响
+    store = load_filter_store('selected_sentences.txt', 'final_word_list.txt')
+    mask = store.valid_mask(new_vocabulary)
+"""
+
+import hashlib
+import json
+import os
+import numpy as np
+
+from token_corpus import load_corpus
+
+STORE_VERSION = 1
+
+
+def load_vocabulary(vocab_file):
+    """加载词汇表（每行一个词，统一小写）"""
+    with open(vocab_file, 'r', encoding='utf-8') as f:
+        return set(line.strip().lower() for line in f if line.strip())
+
+
+def vocabulary_hash(vocab):
+    return hashlib.sha256('\n'.join(sorted(vocab)).encode('utf-8')).hexdigest()
+
+
+def build_filter_store(corpus, base_vocab, store_dir):
+    """从 token 语料和基础词汇表构建 OOV 集合与倒排索引"""
+    print(f"🔄 Building filter store -> {store_dir} ...")
+    vocab_size = len(corpus.vocab)
+    tokens = np.asarray(corpus.tokens)
+    sentence_index = corpus.sentence_index()
+
+    in_base = np.zeros(vocab_size, dtype=bool)
+    in_base[corpus.ids(base_vocab)] = True
+
+    # 每个句子的 OOV token 集合（去重后按句子排列的 CSR）
+    oov_pairs = np.unique(np.stack([sentence_index[~in_base[tokens]],
+                                    tokens[~in_base[tokens]]], axis=1), axis=0) \
+        if (~in_base[tokens]).any() else np.zeros((0, 2), dtype=np.int64)
+    oov_offsets = np.zeros(len(corpus) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(oov_pairs[:, 0], minlength=len(corpus)), out=oov_offsets[1:])
+
+    # 倒排索引：token ID -> 包含该词的句子（去重）
+    word_pairs = np.unique(np.stack([tokens, sentence_index], axis=1), axis=0) \
+        if len(tokens) else np.zeros((0, 2), dtype=np.int64)
+    posting_offsets = np.zeros(vocab_size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(word_pairs[:, 0], minlength=vocab_size), out=posting_offsets[1:])
+
+    os.makedirs(store_dir, exist_ok=True)
+    np.save(os.path.join(store_dir, 'oov_ids.npy'), oov_pairs[:, 1].astype(np.int32))
+    np.save(os.path.join(store_dir, 'oov_offsets.npy'), oov_offsets)
+    np.save(os.path.join(store_dir, 'postings.npy'), word_pairs[:, 1].astype(np.int32))
+    np.save(os.path.join(store_dir, 'posting_offsets.npy'), posting_offsets)
+    np.save(os.path.join(store_dir, 'word_counts.npy'),
+            corpus.sentence_lengths().astype(np.int32))
+
+    meta = {
+        'version': STORE_VERSION,
+        'corpus_dir': os.path.abspath(corpus.corpus_dir),
+        'corpus_source_mtime': corpus.meta['source_mtime'],
+        'base_vocab_hash': vocabulary_hash(base_vocab),
+        'base_vocab_size': len(base_vocab),
+    }
+    with open(os.path.join(store_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    with open(os.path.join(store_dir, 'base_vocab.json'), 'w', encoding='utf-8') as f:
+        json.dump(sorted(base_vocab), f, ensure_ascii=False)
+
+
+class FilterStore:
+    def __init__(self, corpus, store_dir):
+        self.corpus = corpus
+        with open(os.path.join(store_dir, 'meta.json'), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        with open(os.path.join(store_dir, 'base_vocab.json'), 'r', encoding='utf-8') as f:
+            self.base_vocab = set(json.load(f))
+        for name in ['oov_ids', 'oov_offsets', 'postings', 'posting_offsets', 'word_counts']:
+            setattr(self, name, np.load(os.path.join(store_dir, f'{name}.npy'), mmap_mode='r'))
+        self.oov_sizes = np.diff(self.oov_offsets)
+        self.oov_sentence = np.repeat(np.arange(len(corpus), dtype=np.int32), self.oov_sizes)
+
+    def oov_words(self, i):
+        """第 i 句相对基础词汇表的 OOV 词汇"""
+        return [self.corpus.vocab[t] for t in self.oov_ids[self.oov_offsets[i]:self.oov_offsets[i + 1]]]
+
+    def sentences_with(self, words):
+        """包含任意给定词汇的句子编号"""
+        ids = self.corpus.ids(words)
+        if not len(ids):
+            return np.zeros(0, dtype=np.int32)
+        return np.unique(np.concatenate([self.postings[self.posting_offsets[t]:self.posting_offsets[t + 1]]
+                                         for t in ids]))
+
+    def base_valid_mask(self, min_words=3):
+        """基础词汇表下的有效句子"""
+        return (self.oov_sizes == 0) & (self.word_counts >= min_words)
+
+    def newly_valid(self, added_words, min_words=3):
+        """OOV 集合非空且是 added_words 子集的句子"""
+        added = np.zeros(len(self.corpus.vocab), dtype=bool)
+        added[self.corpus.ids(set(w.lower() for w in added_words))] = True
+        missing = np.bincount(self.oov_sentence, weights=~added[self.oov_ids], minlength=len(self.corpus))
+        return np.flatnonzero((self.oov_sizes > 0) & (missing == 0) & (self.word_counts >= min_words))
+
+    def valid_mask(self, vocab, min_words=3):
+        """任意新词汇表下的有效句子：OOV ⊆ 新增词汇，且不包含被删除的词汇"""
+        vocab = set(w.lower() for w in vocab)
+        added = vocab - self.base_vocab
+        removed = self.base_vocab - vocab
+
+        mask = self.base_valid_mask(min_words)
+        if added:
+            mask[self.newly_valid(added, min_words)] = True
+        if removed:
+            mask[self.sentences_with(removed)] = False
+        return mask
+
+    def blocking_words(self, k=20):
+        """只因一个 OOV 词而被过滤的句子最多的前 k 个词 [(词, 句子数), ...]"""
+        single = np.flatnonzero((self.oov_sizes == 1) & (self.word_counts >= 3))
+        counts = np.bincount(np.asarray(self.oov_ids)[self.oov_offsets[single]],
+                             minlength=len(self.corpus.vocab))
+        top = np.argsort(-counts, kind='stable')[:k]
+        return [(self.corpus.vocab[t], int(counts[t])) for t in top if counts[t] > 0]
+
+
+def load_filter_store(sentence_file, vocab_file, store_dir=None):
+    """加载过滤存储；语料或基础词汇表改变时重新构建"""
+    corpus = load_corpus(sentence_file)
+    base_vocab = load_vocabulary(vocab_file)
+    store_dir = store_dir or os.path.join(corpus.corpus_dir, 'filter_store')
+
+    meta_path = os.path.join(store_dir, 'meta.json')
+    stale = True
+    if os.path.exists(meta_path):
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        stale = (meta.get('version') != STORE_VERSION
+                 or meta.get('corpus_source_mtime') != corpus.meta['source_mtime']
+                 or meta.get('base_vocab_hash') != vocabulary_hash(base_vocab))
+    if stale:
+        build_filter_store(corpus, base_vocab, store_dir)
+    return FilterStore(corpus, store_dir)
+
+
+def main():
+    sentence_file = "selected_sentences.txt"
+    vocab_file = "final_word_list.txt"
+
+    store = load_filter_store(sentence_file, vocab_file)
+    vocab = set(store.base_vocab)
+    base_count = int(store.base_valid_mask().sum())
+
+    print(f"\n📊 {len(store.corpus)} sentences, base vocabulary {len(vocab)} words")
+    print(f"   Valid sentences (≥3 words): {base_count}")
+    print(f"\n🔒 Words blocking the most sentences:")
+    for word, count in store.blocking_words(10):
+        print(f"   {word:15s} {count:6d}")
+
+    print("\n💡 输入 '+词' 添加词汇, '-词' 删除词汇, 'show' 查看示例, 'quit' 退出")
+    while True:
+        try:
+            command = input("\n🎮 输入命令: ").strip()
+        except (KeyboardInterrupt, EOFError):
+            print("\n👋 再见!")
+            break
+        if command in ['quit', 'exit', 'q']:
+            print("👋 再见!")
+            break
+        if command.startswith('+'):
+            vocab.update(w.lower() for w in command[1:].split())
+        elif command.startswith('-'):
+            vocab.difference_update(w.lower() for w in command[1:].split())
+
+        mask = store.valid_mask(vocab)
+        print(f"   词汇表: {len(vocab)} 词 | 有效句子: {int(mask.sum())} ({int(mask.sum()) - base_count:+d})")
+        if command == 'show':
+            for i in np.flatnonzero(mask)[:10]:
+                print(f"   {store.corpus.sentence_text(i)}")
+
+
+if __name__ == "__main__":
+    main()
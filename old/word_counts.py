@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Word Counts - 可合并的词频统计引擎
+每个语料文件按字节范围分块，在进程池中分别统计后合并；
+结果按源文件分别保存（文件大小、修改时间、计数），新增或修改的文件只统计变化的部分，
+其余文件直接复用已保存的计数。
+
+用法:
+    python word_counts.py 文件 [文件 ...] [--store word_counts.json] [--workers N] [--top 50]
+    counts = WordCounts.load('word_counts.json')
+    counts.update(['materials/movie_lines.tsv', 'extra.srt'], workers=4)
+    counts.top(50); counts.coverage_curve()
+"""
+
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from dialogue_readers import CHUNK_BYTES, LINE_PARSERS, READERS, chunk_ranges, read_chunk, read_lines, read_records
+from word_tokenizer import tokenize
+
+STORE_FILE = 'word_counts.json'
+
+
+def count_texts(texts, expand=True):
+    counts = Counter()
+    for text in texts:
+        counts.update(tokenize(text, expand))
+    return counts
+
+
+def _count_task(task):
+    """工作进程：统计一个分块或一个文件"""
+    kind, args, expand = task
+    if kind == 'chunk':
+        _, records = read_chunk(args)
+        return count_texts((record[-1] for record in records), expand)
+    path, options = args
+    return count_texts((text for _, _, text in read_records(path, **options)), expand)
+
+
+def _tasks(path, chunk_bytes, expand, options):
+    extension = os.path.splitext(path)[1].lower()
+    if READERS.get(extension) is read_lines and extension in LINE_PARSERS:
+        return [('chunk', (path, start, end, options), expand) for start, end in chunk_ranges(path, chunk_bytes)]
+    return [('file', (path, options), expand)]
+
+
+def count_file(path, workers=0, chunk_bytes=CHUNK_BYTES, expand=True, **options):
+    """统计一个文件的词频；workers > 0 时分块并行"""
+    tasks = _tasks(path, chunk_bytes, expand, options)
+    total = Counter()
+    if workers and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for partial in pool.map(_count_task, tasks):
+                total.update(partial)
+    else:
+        for task in tasks:
+            total.update(_count_task(task))
+    return total
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+class WordCounts:
+    def __init__(self, expand=True):
+        self.expand = expand
+        self.sources = {}    # 绝对路径 -> {'size', 'mtime', 'counts'}
+        self._total = None
+
+    @classmethod
+    def load(cls, path=STORE_FILE):
+        """加载已保存的计数；文件不存在时返回空计数"""
+        counts = cls()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            counts.expand = data.get('expand', True)
+            counts.sources = data['sources']
+        return counts
+
+    def save(self, path=STORE_FILE):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'expand': self.expand, 'sources': self.sources}, f, ensure_ascii=False)
+
+    def is_current(self, path):
+        """源文件已统计且未修改（文件不存在时返回 False）"""
+        entry = self.sources.get(os.path.abspath(path))
+        if entry is None or not os.path.exists(path):
+            return False
+        signature = file_signature(path)
+        return entry['size'] == signature['size'] and entry['mtime'] == signature['mtime']
+
+    def update(self, paths, workers=0, chunk_bytes=CHUNK_BYTES, **options):
+        """统计新增或已修改的源文件，返回实际统计的文件列表；不存在的文件跳过并给出提示"""
+        counted = []
+        for path in paths:
+            if not os.path.exists(path):
+                print(f"⚠️  Skipping missing file {path}")
+                continue
+            if self.is_current(path):
+                continue
+            print(f"🔄 Counting {path} ...")
+            counts = count_file(path, workers, chunk_bytes, self.expand, **options)
+            self.sources[os.path.abspath(path)] = dict(file_signature(path), counts=dict(counts))
+            counted.append(path)
+        if counted:
+            self._total = None
+        return counted
+
+    def remove(self, path):
+        if self.sources.pop(os.path.abspath(path), None) is not None:
+            self._total = None
+
+    def merge(self, other):
+        """合并另一个 WordCounts（同一源文件以 other 为准）"""
+        self.sources.update(other.sources)
+        self._total = None
+        return self
+
+    def total(self):
+        """所有源文件合并后的 Counter"""
+        if self._total is None:
+            self._total = Counter()
+            for entry in self.sources.values():
+                self._total.update(entry['counts'])
+        return self._total
+
+    def ranked(self):
+        """按频率降序 (词汇数组, 频率数组)；同频时按词排序，保证结果稳定"""
+        items = sorted(self.total().items(), key=lambda item: (-item[1], item[0]))
+        words = np.array([word for word, _ in items], dtype=object)
+        freqs = np.array([count for _, count in items], dtype=np.int64)
+        return words, freqs
+
+    def top(self, n=50):
+        words, freqs = self.ranked()
+        return [(str(w), int(c)) for w, c in zip(words[:n], freqs[:n])]
+
+    def coverage_curve(self):
+        """覆盖率曲线：第 k 项为前 k+1 个高频词覆盖的 token 比例"""
+        _, freqs = self.ranked()
+        if not len(freqs):
+            return np.zeros(0)
+        return np.cumsum(freqs) / freqs.sum()
+
+    def coverage_at(self, sizes=(50, 150, 500, 1000)):
+        """前 k 个高频词覆盖的 token 比例；k <= 0 时为 0"""
+        curve = self.coverage_curve()
+        return {k: float(curve[min(k, len(curve)) - 1]) if k > 0 and len(curve) else 0.0 for k in sizes}
+
+    def words_for_coverage(self, fraction):
+        """达到给定 token 覆盖率所需的最少词汇数"""
+        curve = self.coverage_curve()
+        return int(np.searchsorted(curve, fraction) + 1) if len(curve) else 0
+
+
+def main():
+    args = sys.argv[1:]
+    options = {'--store': STORE_FILE, '--workers': '0', '--top': '50'}
+    for name in options:
+        if name in args:
+            i = args.index(name)
+            options[name] = args[i + 1]
+            del args[i:i + 2]
+
+    counts = WordCounts.load(options['--store'])
+    counted = counts.update(args, workers=int(options['--workers']))
+    if counted:
+        counts.save(options['--store'])
+    missing = sum(1 for path in args if not os.path.exists(path))
+    print(f"📁 {len(counts.sources)} sources ({len(counted)} counted, "
+          f"{len(args) - len(counted) - missing} reused, {missing} missing)")
+
+    total = counts.total()
+    print(f"📊 {sum(total.values()):,} tokens, {len(total):,} types")
+    print(f"\n🔝 Top {options['--top']} words:")
+    for rank, (word, count) in enumerate(counts.top(int(options['--top'])), 1):
+        print(f"   {rank:4d}. {word:15s} {count:10,d}")
+
+    print("\n📈 Token coverage:")
+    for k, coverage in counts.coverage_at().items():
+        print(f"   top {k:5d}: {coverage * 100:6.2f}%")
+    for fraction in (0.8, 0.9, 0.95):
+        print(f"   {fraction * 100:.0f}% coverage needs {counts.words_for_coverage(fraction)} words")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Word Table - 预计算的词汇列式表
+把 materials/2_2_spokenvwritten.txt 一次性解析为按列存储的 numpy 数组：
+频率、音素 ID（扁平数组 + 偏移量）、39 位音素掩码、音节数、是否在 CMU 词典中。
+所有列保存为 .npy 文件，加载时使用 mmap，无需重新解析或查询 CMU 词典。
+
+用法:
+    python word_table.py            # 构建 materials/word_table/
+    from word_table import load_word_table
+    table = load_word_table()
+"""
+
+import json
+import os
+import re
+import numpy as np
+import nltk
+
+# Download required NLTK data
+try:
+    nltk.data.find('corpora/cmudict')
+except LookupError:
+    print("Downloading CMUdict...")
+    nltk.download('cmudict')
+
+from nltk.corpus import cmudict
+
+FREQUENCY_FILE = 'materials/2_2_spokenvwritten.txt'
+TABLE_DIR = 'materials/word_table'
+TABLE_VERSION = 1
+
+# 固定的音素顺序，音素 ID 即下标（掩码第 i 位对应 PHONEMES[i]）
+PHONEMES = [
+    # Vowels (15)
+    'AA', 'AE', 'AH', 'AO', 'AW', 'AY', 'EH', 'ER', 'EY', 'IH', 'IY', 'OW', 'OY', 'UH', 'UW',
+    # Consonants (24)
+    'B', 'CH', 'D', 'DH', 'F', 'G', 'HH', 'JH', 'K', 'L', 'M', 'N', 'NG', 'P', 'R', 'S', 'SH', 'T', 'TH', 'V', 'W', 'Y', 'Z', 'ZH'
+]
+PHONEME_ID = {p: i for i, p in enumerate(PHONEMES)}
+VOWELS = set(PHONEMES[:15])
+
+COLUMNS = ['freq_spoken', 'freq_written', 'freq_total', 'phoneme_offsets', 'phoneme_ids',
+           'phoneme_mask', 'syllables', 'in_cmu']
+
+
+def approximate_phonemes(word):
+    """Simple phoneme approximation for unknown words."""
+    phonemes = []
+    i = 0
+    while i < len(word):
+        char = word[i]
+
+        # Handle common letter combinations
+        if i < len(word) - 1:
+            two_char = word[i:i+2]
+            if two_char == 'th':
+                phonemes.append('TH' if i == 0 or word[i-1] in 'aeiou' else 'DH')
+                i += 2
+                continue
+            elif two_char == 'sh':
+                phonemes.append('SH')
+                i += 2
+                continue
+            elif two_char == 'ch':
+                phonemes.append('CH')
+                i += 2
+                continue
+            elif two_char == 'ng':
+                phonemes.append('NG')
+                i += 2
+                continue
+
+        # Single character mappings (simplified)
+        char_to_phoneme = {
+            'a': 'AE', 'e': 'EH', 'i': 'IH', 'o': 'AO', 'u': 'AH',
+            'b': 'B', 'c': 'K', 'd': 'D', 'f': 'F', 'g': 'G',
+            'h': 'HH', 'j': 'JH', 'k': 'K', 'l': 'L', 'm': 'M',
+            'n': 'N', 'p': 'P', 'r': 'R', 's': 'S', 't': 'T',
+            'v': 'V', 'w': 'W', 'y': 'Y', 'z': 'Z'
+        }
+
+        if char in char_to_phoneme:
+            phonemes.append(char_to_phoneme[char])
+
+        i += 1
+
+    return phonemes
+
+
+def parse_frequency_file(filename=FREQUENCY_FILE):
+    """解析频率表，同一个词的不同词性合并计数。返回 {词: [口语频率, 书面频率]}，保持首次出现顺序"""
+    freqs = {}
+    with open(filename, 'r', encoding='utf-8') as f:
+        for line in f:
+            # Format: <tab>Word<tab>PoS<tab>FrSp<tab>+/-<tab>LL<tab>FrWr
+            parts = line.rstrip('\n').split('\t')
+            if len(parts) < 7:
+                continue
+            word = parts[1].strip().lower()
+            try:
+                spoken = int(parts[3])
+                written = int(parts[6])
+            except ValueError:
+                continue  # header
+            if not word:
+                continue
+            entry = freqs.setdefault(word, [0, 0])
+            entry[0] += spoken
+            entry[1] += written
+    return freqs
+
+
+def build_word_table(freq_file=FREQUENCY_FILE, table_dir=TABLE_DIR):
+    """构建列式词汇表并保存到 table_dir"""
+    print(f"🔄 Building word table from {freq_file}...")
+    freqs = parse_frequency_file(freq_file)
+    cmu_dict = cmudict.dict()
+
+    words = list(freqs)
+    n = len(words)
+    freq_spoken = np.zeros(n, dtype=np.int32)
+    freq_written = np.zeros(n, dtype=np.int32)
+    phoneme_offsets = np.zeros(n + 1, dtype=np.int32)
+    phoneme_mask = np.zeros(n, dtype=np.uint64)
+    syllables = np.zeros(n, dtype=np.uint8)
+    in_cmu = np.zeros(n, dtype=bool)
+    phoneme_ids = []
+
+    for i, word in enumerate(words):
+        freq_spoken[i], freq_written[i] = freqs[word]
+        if word in cmu_dict:
+            in_cmu[i] = True
+            phonemes = [re.sub(r'\d', '', p) for p in cmu_dict[word][0]]
+        else:
+            phonemes = approximate_phonemes(re.sub(r'[^a-z]', '', word))
+        ids = [PHONEME_ID[p] for p in phonemes if p in PHONEME_ID]
+
+        mask = 0
+        for pid in ids:
+            mask |= 1 << pid
+        phoneme_mask[i] = mask
+        syllables[i] = sum(1 for pid in ids if PHONEMES[pid] in VOWELS)
+        phoneme_ids.extend(ids)
+        phoneme_offsets[i + 1] = len(phoneme_ids)
+
+    os.makedirs(table_dir, exist_ok=True)
+    columns = {
+        'freq_spoken': freq_spoken,
+        'freq_written': freq_written,
+        'freq_total': freq_spoken + freq_written,
+        'phoneme_offsets': phoneme_offsets,
+        'phoneme_ids': np.array(phoneme_ids, dtype=np.uint8),
+        'phoneme_mask': phoneme_mask,
+        'syllables': syllables,
+        'in_cmu': in_cmu,
+    }
+    for name, array in columns.items():
+        np.save(os.path.join(table_dir, f'{name}.npy'), array)
+    np.save(os.path.join(table_dir, 'words.npy'), np.array(words, dtype=str))
+
+    stat = os.stat(freq_file)
+    meta = {
+        'version': TABLE_VERSION,
+        'source': os.path.abspath(freq_file),
+        'source_size': stat.st_size,
+        'source_mtime': stat.st_mtime,
+        'num_words': n,
+        'phonemes': PHONEMES,
+    }
+    with open(os.path.join(table_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+    print(f"✅ Word table saved to {table_dir}: {n} words, {int(in_cmu.sum())} in CMUdict")
+
+
+def is_table_stale(table_dir=TABLE_DIR, freq_file=FREQUENCY_FILE):
+    """表不存在、版本不同或源文件已修改时返回 True"""
+    meta_path = os.path.join(table_dir, 'meta.json')
+    if not os.path.exists(meta_path):
+        return True
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('version') != TABLE_VERSION:
+        return True
+    if os.path.exists(freq_file):
+        stat = os.stat(freq_file)
+        return meta['source_size'] != stat.st_size or meta['source_mtime'] != stat.st_mtime
+    return False
+
+
+class WordTable:
+    def __init__(self, table_dir=TABLE_DIR):
+        with open(os.path.join(table_dir, 'meta.json'), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.words = np.load(os.path.join(table_dir, 'words.npy'), mmap_mode='r')
+        for name in COLUMNS:
+            setattr(self, name, np.load(os.path.join(table_dir, f'{name}.npy'), mmap_mode='r'))
+        self._index = None
+
+    def __len__(self):
+        return len(self.words)
+
+    def index(self, word):
+        """词汇在表中的下标，不存在时返回 None"""
+        if self._index is None:
+            self._index = {w: i for i, w in enumerate(self.words.tolist())}
+        return self._index.get(word.lower())
+
+    def phonemes_at(self, i):
+        """第 i 个词汇的音素列表"""
+        start, end = self.phoneme_offsets[i], self.phoneme_offsets[i + 1]
+        return [PHONEMES[pid] for pid in self.phoneme_ids[start:end]]
+
+    def phonemes(self, word):
+        i = self.index(word)
+        return self.phonemes_at(i) if i is not None else None
+
+    def phoneme_set_at(self, i):
+        """由掩码还原第 i 个词汇的音素集合"""
+        mask = int(self.phoneme_mask[i])
+        return {p for bit, p in enumerate(PHONEMES) if mask >> bit & 1}
+
+    def by_frequency(self, column='freq_total'):
+        """按频率降序排列的词汇下标"""
+        return np.argsort(-np.asarray(getattr(self, column)), kind='stable')
+
+
+def load_word_table(table_dir=TABLE_DIR, freq_file=FREQUENCY_FILE):
+    """加载词汇表；表不存在或源文件已更新时先重新构建"""
+    if is_table_stale(table_dir, freq_file):
+        build_word_table(freq_file, table_dir)
+    return WordTable(table_dir)
+
+
+def main():
+    build_word_table()
+    table = WordTable()
+    print(f"\n📊 Top 10 words by total frequency:")
+    for i in table.by_frequency()[:10]:
+        print(f"   {table.words[i]:10s} {int(table.freq_total[i]):6d}  "
+              f"/{' '.join(table.phonemes_at(i))}/  syllables: {int(table.syllables[i])}")
+
+
+if __name__ == "__main__":
+    main()
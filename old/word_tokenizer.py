@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Word Tokenizer - 统一的分词工具
+所有脚本共用的分词规则：小写、缩写展开、去除标点、分词，一次正则扫描完成。
+
+    tokenize("I don't know, it's fine.")              -> ('i', 'do', 'not', 'know', 'it', 'is', 'fine')
+    tokenize("I don't know", expand=False)            -> ('i', 'do', "n't", 'know')   # Treebank 风格
+    tokenize("The dog's bone, I'd've gone.")          -> ('the', 'dog', 'bone', 'i', 'would', 'have', 'gone')
+    tokenize_batch(sentences)                         -> [tuple, ...]
+    clean_sentence("Don't stop!")                     -> 'do not stop'
+    surface_words("Don't stop, O'Brien!")             -> ["Don't", 'stop', "O'Brien"]
+    surface_tokens("The dog's bone.")                 -> ('the', "dog's", 'bone')
+
+tokenize / clean_sentence 的结果只用于匹配和统计；要显示或保存的句子文本用 surface_words，
+不展开缩写，保留原词。
+
+结果按 (文本, expand) 缓存，重复句子不会重复分词。
+"""
+
+import re
+from functools import lru_cache
+
+# 统一各种撇号
+_APOSTROPHES = str.maketrans({'’': "'", '‘': "'", '`': "'", 'ʼ': "'"})
+
+# 单词（可带多个撇号段：o'brien's, i'd've），或以撇号开头的口语缩写
+_TOKEN_RE = re.compile(r"'(?:em|cause|til)\b|[^\W_]+(?:'[^\W_]+)*", re.IGNORECASE)
+
+# 撇号后缀 -> 展开形式
+SUFFIX_EXPANSIONS = {
+    "s": "is", "re": "are", "ll": "will", "ve": "have", "d": "would", "m": "am",
+}
+
+# 只有这些词后面的 's 是 is 的缩写；其他词后面的 's 按所有格处理，只保留原词
+S_IS_WORDS = frozenset({
+    "he", "she", "it", "that", "this", "there", "here",
+    "what", "who", "where", "when", "why", "how",
+})
+
+# 不规则缩写: 展开形式, Treebank 拆分形式
+IRREGULAR = {
+    "won't": (("will", "not"), ("wo", "n't")),
+    "can't": (("can", "not"), ("ca", "n't")),
+    "shan't": (("shall", "not"), ("sha", "n't")),
+    "ain't": (("is", "not"), ("ai", "n't")),
+    "let's": (("let", "us"), ("let", "'s")),
+    "'em": (("them",), ("'em",)),
+    "'cause": (("because",), ("'cause",)),
+    "'til": (("until",), ("'til",)),
+}
+
+
+def _split_token(token, expand):
+    """处理单个带撇号的 token：从末尾逐个剥离缩写后缀（i'd've -> i would have）"""
+    suffixes = []
+    while "'" in token:
+        if token in IRREGULAR:
+            return IRREGULAR[token][0 if expand else 1] + tuple(reversed(suffixes))
+
+        base, _, suffix = token.rpartition("'")
+        if suffix == "t" and base.endswith("n") and len(base) > 1:
+            suffixes.append("not" if expand else "n't")
+            token = base[:-1]
+        elif suffix == "s" and base and base not in S_IS_WORDS:
+            # 所有格: dog's -> dog, o'brien's -> o'brien
+            if not expand:
+                suffixes.append("'s")
+            token = base
+        elif suffix in SUFFIX_EXPANSIONS and base:
+            suffixes.append(SUFFIX_EXPANSIONS[suffix] if expand else "'" + suffix)
+            token = base
+        else:
+            # o'clock, y'all, o'brien 等保持原样
+            break
+    return (token,) + tuple(reversed(suffixes))
+
+
+@lru_cache(maxsize=200000)
+def tokenize(text, expand=True):
+    """把文本转换为小写 token 元组；expand=False 时保留 n't / 's 等 Treebank 风格的拆分"""
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower().translate(_APOSTROPHES)):
+        if "'" in token:
+            tokens.extend(_split_token(token, expand))
+        else:
+            tokens.append(token)
+    return tuple(tokens)
+
+
+def tokenize_batch(texts, expand=True):
+    """批量分词，结果与 texts 一一对应"""
+    return [tokenize(text, expand) for text in texts]
+
+
+def clean_sentence(text):
+    """小写、展开缩写、去除标点后的句子文本（用于匹配和去重，不要拿来显示或保存）"""
+    return ' '.join(tokenize(text))
+
+
+def surface_words(text):
+    """去除标点后的原词列表：保留大小写和缩写（don't, o'clock），不做展开"""
+    return _TOKEN_RE.findall(text.translate(_APOSTROPHES))
+
+
+@lru_cache(maxsize=200000)
+def surface_tokens(text):
+    """实际说出的词：只小写、去除标点，不展开缩写也不去掉所有格（用于音素统计）"""
+    return tuple(word.lower() for word in surface_words(text))
+
+
+def cache_info():
+    """分词缓存的命中统计"""
+    return tokenize.cache_info()
+
+
+if __name__ == "__main__":
+    for example in ["I don't know, it's fine.", "We can't -- won't -- go.",
+                    "Let's get 'em at five o'clock!", "The \"\"real you\"\".",
+                    "The dog's bone, I'd've gone.", "O'Brien's shouldn't've."]:
+        print(f"{example:35s} -> {' '.join(tokenize(example))}")
+        print(f"{'':35s}    {' '.join(tokenize(example, expand=False))}")